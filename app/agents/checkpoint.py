@@ -0,0 +1,345 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+
+Typed = Tuple[str, bytes]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+class _Thread:
+    """Resident state of one conversation thread."""
+
+    __slots__ = ("checkpoints", "writes", "nbytes", "last_access")
+
+    def __init__(self):
+        # checkpoint_ns -> checkpoint_id -> (checkpoint, metadata, parent_id)
+        self.checkpoints: Dict[str, Dict[str, Tuple[Typed, Typed, Optional[str]]]] = {}
+        # (checkpoint_ns, checkpoint_id) -> (task_id, idx) -> (task_id, channel, value, task_path)
+        self.writes: Dict[Tuple[str, str], Dict[Tuple[str, int], Tuple[str, str, Typed, str]]] = {}
+        self.nbytes = 0
+        self.last_access = time.monotonic()
+
+class BoundedCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer with bounded memory use.
+
+    Threads are kept in an LRU cache that evicts the least recently used thread
+    beyond `max_threads` and any thread idle for longer than `thread_ttl`
+    seconds. Only the newest `max_checkpoints` checkpoints of a thread are
+    retained. With `db_path` set, every write also goes to a SQLite database in
+    WAL mode, so evicted threads are reloaded on demand and survive restarts.
+    With `max_threads=0` nothing stays resident and every read goes to SQLite,
+    which is how several worker processes share one database.
+    """
+
+    def __init__(self, *, db_path: Optional[str] = None, max_threads: int = 1000,
+                 thread_ttl: float = 3600, max_checkpoints: int = 20, serde=None):
+        super().__init__(serde=serde)
+        self.db_path = db_path
+        self.max_threads = max_threads
+        self.thread_ttl = thread_ttl
+        self.max_checkpoints = max_checkpoints
+        self.evictions = 0
+        self._threads: "OrderedDict[str, _Thread]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    # --- Cache management ---
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "sqlite" if self._db else "memory",
+                "resident_threads": len(self._threads),
+                "resident_bytes": sum(t.nbytes for t in self._threads.values()),
+                "evictions": self.evictions,
+            }
+
+    def _thread(self, thread_id: str, create: bool = False) -> Optional[_Thread]:
+        """Returns a resident thread, loading it from disk on a cache miss."""
+        thread = self._threads.get(thread_id)
+        if thread is None:
+            thread = self._load_thread(thread_id)
+            if thread is None and create:
+                thread = _Thread()
+            if thread is None:
+                return None
+            self._threads[thread_id] = thread
+        else:
+            self._threads.move_to_end(thread_id)
+        thread.last_access = time.monotonic()
+        self._evict()
+        return thread
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.thread_ttl
+        while self._threads:
+            thread_id, oldest = next(iter(self._threads.items()))
+            if len(self._threads) <= self.max_threads and oldest.last_access >= cutoff:
+                break
+            del self._threads[thread_id]
+            self.evictions += 1
+
+    def _prune(self, thread_id: str, thread: _Thread, checkpoint_ns: str):
+        checkpoints = thread.checkpoints[checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints:
+            return
+        ordered = sorted(checkpoints)
+        for checkpoint_id in ordered[:-self.max_checkpoints]:
+            checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+            thread.nbytes -= len(checkpoint[1]) + len(metadata[1])
+            for _, _, value, _ in thread.writes.pop((checkpoint_ns, checkpoint_id), {}).values():
+                thread.nbytes -= len(value[1])
+        if self._db:
+            oldest_kept = ordered[-self.max_checkpoints]
+            with self._db:
+                for table in ("checkpoints", "writes"):
+                    self._db.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                        (thread_id, checkpoint_ns, oldest_kept),
+                    )
+
+    # --- SQLite tier ---
+
+    def _load_thread(self, thread_id: str) -> Optional[_Thread]:
+        if not self._db:
+            return None
+        rows = self._db.execute(
+            "SELECT checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata "
+            "FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_id DESC",
+            (thread_id,),
+        ).fetchall()
+        if not rows:
+            return None
+        thread = _Thread()
+        for ns, checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata in rows:
+            checkpoints = thread.checkpoints.setdefault(ns, {})
+            if len(checkpoints) < self.max_checkpoints:
+                checkpoints[checkpoint_id] = ((type_, checkpoint), (metadata_type, metadata), parent_id)
+                thread.nbytes += len(checkpoint) + len(metadata)
+        for ns, checkpoint_id, task_id, idx, channel, type_, value, task_path in self._db.execute(
+            "SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path "
+            "FROM writes WHERE thread_id = ?",
+            (thread_id,),
+        ):
+            if checkpoint_id in thread.checkpoints.get(ns, {}):
+                thread.writes.setdefault((ns, checkpoint_id), {})[(task_id, idx)] = (
+                    task_id, channel, (type_, value), task_path)
+                thread.nbytes += len(value)
+        return thread
+
+    # --- BaseCheckpointSaver API ---
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            thread = self._thread(thread_id)
+            if thread is None:
+                return None
+            checkpoints = thread.checkpoints.get(checkpoint_ns, {})
+            checkpoint_id = get_checkpoint_id(config) or max(checkpoints, default=None)
+            if checkpoint_id not in checkpoints:
+                return None
+            return self._tuple(thread, thread_id, checkpoint_ns, checkpoint_id)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config:
+                thread_ids = [config["configurable"]["thread_id"]]
+            elif self._db:
+                thread_ids = [row[0] for row in self._db.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+            else:
+                thread_ids = list(self._threads)
+            config_ns = config["configurable"].get("checkpoint_ns") if config else None
+            config_checkpoint_id = get_checkpoint_id(config) if config else None
+            before_id = get_checkpoint_id(before) if before else None
+
+            results = []
+            for thread_id in thread_ids:
+                thread = self._thread(thread_id)
+                if thread is None:
+                    continue
+                for checkpoint_ns, checkpoints in thread.checkpoints.items():
+                    if config_ns is not None and checkpoint_ns != config_ns:
+                        continue
+                    for checkpoint_id in sorted(checkpoints, reverse=True):
+                        if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                            continue
+                        if before_id and checkpoint_id >= before_id:
+                            continue
+                        item = self._tuple(thread, thread_id, checkpoint_ns, checkpoint_id)
+                        if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                            continue
+                        if limit is not None and len(results) >= limit:
+                            return iter(results)
+                        results.append(item)
+            return iter(results)
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        checkpoint_b = self.serde.dumps_typed(checkpoint)
+        metadata_b = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            thread = self._thread(thread_id, create=True)
+            thread.checkpoints.setdefault(checkpoint_ns, {})[checkpoint["id"]] = (checkpoint_b, metadata_b, parent_id)
+            thread.nbytes += len(checkpoint_b[1]) + len(metadata_b[1])
+            if self._db:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (thread_id, checkpoint_ns, checkpoint["id"], parent_id,
+                         checkpoint_b[0], checkpoint_b[1], metadata_b[0], metadata_b[1]),
+                    )
+            self._prune(thread_id, thread, checkpoint_ns)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            thread = self._thread(thread_id, create=True)
+            stored = thread.writes.setdefault((checkpoint_ns, checkpoint_id), {})
+            rows = []
+            for idx, (channel, value) in enumerate(writes):
+                key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                if key[1] >= 0 and key in stored:
+                    continue
+                value_b = self.serde.dumps_typed(value)
+                stored[key] = (task_id, channel, value_b, task_path)
+                thread.nbytes += len(value_b[1])
+                rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, key[1],
+                             channel, value_b[0], value_b[1], task_path))
+            if self._db and rows:
+                with self._db:
+                    self._db.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._threads.pop(thread_id, None)
+            if self._db:
+                with self._db:
+                    self._db.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                    self._db.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    # Async variants: memory-only operations are cheap and run inline; SQLite
+    # I/O is offloaded so it never blocks the event loop.
+
+    async def _call(self, func, *args, **kwargs):
+        if self._db is None:
+            return func(*args, **kwargs)
+        return await run_blocking(func, *args, **kwargs)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._call(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        items = await self._call(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await self._call(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        return await self._call(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await self._call(self.delete_thread, thread_id)
+
+    def _tuple(self, thread: _Thread, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> CheckpointTuple:
+        checkpoint, metadata, parent_id = thread.checkpoints[checkpoint_ns][checkpoint_id]
+        writes = thread.writes.get((checkpoint_ns, checkpoint_id), {})
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed(checkpoint),
+            metadata=self.serde.loads_typed(metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                  "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value))
+                for task_id, channel, value, _ in (
+                    writes[k] for k in sorted(writes, key=lambda k: writes_sort_key(writes[k][3], *k))
+                )
+            ],
+        )
+
+def build_checkpointer() -> BaseCheckpointSaver:
+    """Builds the checkpointer selected by the CHECKPOINTER setting."""
+    if settings.SHARED_STATE:
+        # Another worker may have advanced any thread, so none is cached
+        return BoundedCheckpointSaver(db_path=settings.SHARED_STATE_PATH, max_threads=0,
+                                      max_checkpoints=settings.CHECKPOINT_MAX_PER_THREAD)
+    backend = settings.CHECKPOINTER
+    if backend == "unbounded":
+        return MemorySaver()
+    if backend not in ("memory", "sqlite"):
+        raise ValueError(f"Unknown CHECKPOINTER '{backend}'. Use 'memory', 'sqlite' or 'unbounded'.")
+    return BoundedCheckpointSaver(
+        db_path=settings.CHECKPOINT_DB_PATH if backend == "sqlite" else None,
+        max_threads=settings.CHECKPOINT_MAX_THREADS,
+        thread_ttl=settings.CHECKPOINT_THREAD_TTL,
+        max_checkpoints=settings.CHECKPOINT_MAX_PER_THREAD,
+    )
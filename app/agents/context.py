@@ -0,0 +1,108 @@
+from typing import Dict, List, Sequence
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from app.agents.state import AgentState
+from app.core.config import settings
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+_SNIPPET_CHARS = 200
+
+def count_tokens(messages: Sequence[BaseMessage]) -> int:
+    return count_tokens_approximately(messages)
+
+def _turn_starts(messages: Sequence[BaseMessage]) -> List[int]:
+    """Indexes of the HumanMessages that open each turn."""
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)] or [0]
+
+def _snippet(text, limit: int = _SNIPPET_CHARS) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+def _summarize_turn(messages: Sequence[BaseMessage]) -> str:
+    """One-line extractive summary of a turn: request, tools used and final answer."""
+    request = next((m.content for m in messages if isinstance(m, HumanMessage)), "")
+    tools = [c["name"] for m in messages if isinstance(m, AIMessage) for c in m.tool_calls]
+    answer = next((m.content for m in reversed(messages) if isinstance(m, AIMessage) and m.content), "")
+    line = f"- User: {_snippet(request)}"
+    if tools:
+        line += f" | Tools: {', '.join(tools)}"
+    if answer:
+        line += f" | Assistant: {_snippet(answer)}"
+    return line
+
+def _trim_summary(summary: str, budget: int) -> str:
+    """Keeps the most recent summary lines that fit in the budget."""
+    kept: List[str] = []
+    for line in reversed(summary.splitlines()):
+        if count_tokens([HumanMessage(content="\n".join([line] + kept))]) > budget:
+            break
+        kept.insert(0, line)
+    return "\n".join(kept)
+
+def compact_tool_message(message: BaseMessage, budget: int) -> BaseMessage:
+    """Shortens a bulky tool output from an earlier turn."""
+    if not isinstance(message, ToolMessage) or count_tokens([message]) <= budget:
+        return message
+    # ~4 characters per token, matching the approximate counter
+    content = str(message.content)[:budget * 4]
+    return message.model_copy(update={"content": content + "\n... [output truncated]"})
+
+def context_node(state: AgentState) -> Dict:
+    """
+    Chooses which messages the next LLM call sees.
+
+    Keeps the most recent whole turns within CONTEXT_TOKEN_BUDGET (the current
+    turn is always kept) and folds turns that fall out of the window into a
+    rolling summary. The full history stays in the checkpoint; only the window
+    start, summary and token stats are written to state.
+    """
+    messages = [m for m in state["messages"] if not isinstance(m, SystemMessage)]
+    start = min(state.get("context_start") or 0, len(messages))
+    summary = state.get("summary") or ""
+    budget = settings.CONTEXT_TOKEN_BUDGET - settings.CONTEXT_SUMMARY_TOKENS
+    tool_budget = settings.CONTEXT_TOOL_MESSAGE_TOKENS
+
+    starts = [i for i in _turn_starts(messages) if i >= start] or [start]
+    current_turn = starts[-1]
+    new_start = current_turn
+    used = count_tokens(messages[current_turn:])
+    for turn_start, turn_end in reversed(list(zip(starts, starts[1:]))):
+        turn_tokens = count_tokens([compact_tool_message(m, tool_budget) for m in messages[turn_start:turn_end]])
+        if used + turn_tokens > budget:
+            break
+        used += turn_tokens
+        new_start = turn_start
+
+    dropped_starts = [i for i in starts if start <= i < new_start] + [new_start]
+    lines = [_summarize_turn(messages[a:b]) for a, b in zip(dropped_starts, dropped_starts[1:])]
+    if lines:
+        summary = _trim_summary("\n".join(filter(None, [summary] + lines)), settings.CONTEXT_SUMMARY_TOKENS)
+
+    sent = build_window(messages[new_start:], summary)
+    tokens_sent = count_tokens(sent)
+    history_sent = count_tokens(sent[1:] if summary else sent)
+    previous = state.get("context_stats") or {}
+    return {
+        "context_start": new_start,
+        "summary": summary,
+        "context_stats": {
+            "llm_calls": previous.get("llm_calls", 0) + 1,
+            "tokens_sent": previous.get("tokens_sent", 0) + tokens_sent,
+            "tokens_trimmed": previous.get("tokens_trimmed", 0) + max(count_tokens(messages) - history_sent, 0),
+        },
+    }
+
+def build_window(messages: Sequence[BaseMessage], summary: str) -> List[BaseMessage]:
+    """Messages sent to the LLM (before the system prompt): summary plus recent turns."""
+    window: List[BaseMessage] = []
+    if summary:
+        window.append(SystemMessage(content=SUMMARY_PREFIX + summary))
+    starts = _turn_starts(messages)
+    current_turn = starts[-1] if starts else 0
+    for i, message in enumerate(messages):
+        # Bulky tool outputs are only compacted in earlier turns; the model
+        # still sees full results for the question it is answering now.
+        if i < current_turn:
+            message = compact_tool_message(message, settings.CONTEXT_TOOL_MESSAGE_TOKENS)
+        window.append(message)
+    return window
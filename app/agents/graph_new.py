@@ -1,38 +1,70 @@
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
+from app.core import metrics
+from app.core.admission import llm_admission
 from app.core.config import settings
+from app.core.lazy import LazySingleton
 from app.agents.state import AgentState
-from app.agents.tools import assign_task, share_document, check_progress, get_performance_insights, set_reminder, create_team, add_team_member, research_technical_question, delete_team, remove_team_member, delete_task
+from app.agents.tools import assign_task, share_document, check_progress, get_performance_insights, update_task_status, set_reminder, create_team, add_team_member, research_technical_question, delete_team, remove_team_member, delete_task
 from langchain_core.messages import HumanMessage, SystemMessage
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import Runnable, RunnableConfig
+from app.agents.checkpoint import build_checkpointer
+from app.agents.context import build_window, context_node, count_tokens
+from app.agents.router import route_after_router, router_metrics, router_node
+from app.agents.tool_selection import ToolSelector
 from langgraph.prebuilt import ToolNode
 import datetime
+import inspect
+import time
 
-# Initialize the model
-# Note: For GitHub Models, you might need to adjust the base_url and api_key
-llm = ChatOpenAI(
-    model=settings.MODEL_NAME,
-    api_key=settings.OPENAI_API_KEY,
-    base_url=settings.OPENAI_API_BASE,
-    temperature=0
-)
+def _build_llm():
+    # Note: For GitHub Models, you might need to adjust the base_url and api_key
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=settings.MODEL_NAME,
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_API_BASE,
+        temperature=0,
+        # Retries go through llm_admission, which shares Retry-After across callers
+        max_retries=0,
+    )
 
-tools = [assign_task, share_document, check_progress, get_performance_insights, set_reminder, create_team, add_team_member, research_technical_question, delete_team, remove_team_member, delete_task]
-llm_with_tools = llm.bind_tools(tools)
+tools = [assign_task, share_document, check_progress, get_performance_insights, update_task_status, set_reminder, create_team, add_team_member, research_technical_question, delete_team, remove_team_member, delete_task]
 
-def agent_node(state: AgentState):
-    messages = state['messages']
-    # Inject current date into system prompt if not present
+# The model, checkpointer and compiled graph are built on first use (or by the
+# startup warm-up) so importing this module stays cheap.
+llm = LazySingleton(_build_llm, "llm")
+llm_with_tools = LazySingleton(lambda: llm.load().bind_tools(tools), "llm_with_tools")
+tool_selector = ToolSelector(tools, max_tools=settings.TOOL_SELECTION_MAX)
+
+async def agent_node(state: AgentState):
+    # Only the window chosen by the context node is sent, not the full history
+    history = [m for m in state['messages'] if not isinstance(m, SystemMessage)]
+    window = build_window(history[state.get('context_start') or 0:], state.get('summary') or "")
+    
+    # Inject current date into the system prompt
     current_date = datetime.datetime.now().strftime("%Y-%m-%d")
     system_prompt = f"You are TrackUp Buddy, an intelligent project management assistant. Today's date is {current_date}. When assigning tasks, use this date as reference. When asked about team status, provide detailed breakdowns."
-    
-    # Check if the first message is a SystemMessage, if so replace/update it, else prepend
-    if isinstance(messages[0], SystemMessage):
-        messages[0] = SystemMessage(content=system_prompt)
-    else:
-        messages.insert(0, SystemMessage(content=system_prompt))
+    messages = [SystemMessage(content=system_prompt)] + window
+
+    # A relevant subset of tools replaces the full bound set for this call
+    subset = tool_selector.select(window) if settings.TOOL_SELECTION else None
+    overrides = {"tools": tool_selector.schemas(subset)} if subset else {}
+    if metrics.enabled:
+        metrics.TOOL_SELECTIONS.inc("subset" if subset else "all")
         
-    response = llm_with_tools.invoke(messages)
+    async def call_llm():
+        started = time.perf_counter()
+        with metrics.timed(metrics.LLM_SECONDS):
+            response = await llm_with_tools.ainvoke(messages, **overrides)
+        router_metrics.record_llm_call(time.perf_counter() - started)
+        return response
+
+    # Prompt and tool schema tokens plus a typical reply; corrected below with the reported usage
+    estimated_tokens = count_tokens(messages) + tool_selector.schema_tokens(subset) + 500
+    response = await llm_admission.call(call_llm, estimated_tokens)
+    usage = getattr(response, "usage_metadata", None)
+    llm_admission.record_usage(estimated_tokens, usage.get("total_tokens") if usage else None)
+    metrics.record_llm_usage(usage)
     return {"messages": [response]}
 
 def should_continue(state: AgentState):
@@ -42,22 +74,40 @@ def should_continue(state: AgentState):
         return "tools"
     return END
 
-from langgraph.prebuilt import ToolNode
-tool_node = ToolNode(tools)
+def _timed_node(name: str, node):
+    """Wraps a node (function or runnable) so each run is timed and counted as a graph hop."""
+    async def run(state: AgentState, config: RunnableConfig):
+        metrics.record_hop()
+        with metrics.timed(metrics.NODE_SECONDS, name):
+            if isinstance(node, Runnable):
+                return await node.ainvoke(state, config)
+            result = node(state)
+            return await result if inspect.isawaitable(result) else result
+    return run
 
-workflow = StateGraph(AgentState)
+def build_graph():
+    workflow = StateGraph(AgentState)
 
-workflow.add_node("agent", agent_node)
-workflow.add_node("tools", tool_node)
+    workflow.add_node("context", _timed_node("context", context_node))
+    workflow.add_node("agent", _timed_node("agent", agent_node))
+    workflow.add_node("tools", _timed_node("tools", ToolNode(tools)))
+
+    if settings.FAST_PATH_ROUTER:
+        workflow.add_node("router", _timed_node("router", router_node))
+        workflow.set_entry_point("router")
+        workflow.add_conditional_edges("router", route_after_router)
+    else:
+        workflow.set_entry_point("context")
+    workflow.add_edge("context", "agent")
 
-workflow.set_entry_point("agent")
+    workflow.add_conditional_edges(
+        "agent",
+        should_continue,
+    )
 
-workflow.add_conditional_edges(
-    "agent",
-    should_continue,
-)
+    workflow.add_edge("tools", "context")
 
-workflow.add_edge("tools", "agent")
+    return workflow.compile(checkpointer=checkpointer.load())
 
-checkpointer = MemorySaver()
-app_graph = workflow.compile(checkpointer=checkpointer)
+checkpointer = LazySingleton(build_checkpointer, "checkpointer")
+app_graph = LazySingleton(build_graph, "app_graph")
@@ -0,0 +1,163 @@
+import re
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import BaseTool
+from langgraph.graph import END
+from app.agents.state import AgentState
+from app.agents.tools import (
+    add_team_member, check_progress, create_team, delete_task, delete_team,
+    get_performance_insights, remove_team_member, update_task_status,
+)
+from app.services.firebase import firebase_service
+
+# Words that refer to someone or something instead of naming it
+_NOT_NAMES = (
+    "me", "myself", "him", "her", "it", "them", "us", "you", "we", "they", "i",
+    "team", "teams", "task", "tasks", "everyone", "everybody", "someone", "somebody", "anyone",
+    "all", "the", "a", "an", "this", "that", "these", "those", "my", "our", "your", "his", "their",
+)
+
+# Single-token names only; anything fuzzier is left to the LLM.
+_NAME = rf"(?!(?:{'|'.join(_NOT_NAMES)})(?![\w\-]))[\w\-]+"
+_TEAM = rf"(?:the\s+)?(?:team\s+)?(?P<team_name>{_NAME})(?:\s+team)?"
+
+# Each pattern must match the whole message, and its named groups must be
+# exactly the arguments of the tool it routes to.
+ROUTES: List[Tuple[re.Pattern, BaseTool]] = [
+    (rf"mark\s+task\s+(?:id\s+)?(?P<task_id>{_NAME})\s+as\s+(?P<status>completed|in_progress|pending)", update_task_status),
+    (rf"(?:create|make)\s+(?:a\s+)?(?:new\s+)?team\s+(?:called\s+|named\s+)?(?P<team_name>{_NAME})", create_team),
+    (rf"add\s+(?P<user_name>{_NAME})\s+to\s+{_TEAM}", add_team_member),
+    (rf"remove\s+(?P<user_name>{_NAME})\s+from\s+{_TEAM}", remove_team_member),
+    (rf"delete\s+team\s+(?P<team_name>{_NAME})", delete_team),
+    (rf"delete\s+task\s+(?:id\s+)?(?P<task_id>{_NAME})", delete_task),
+    (rf"(?:show\s+|check\s+|what\s+is\s+|what's\s+)?(?:the\s+)?progress\s+(?:of|for|on)\s+{_TEAM}", check_progress),
+    (rf"how\s+is\s+{_TEAM}\s+doing", check_progress),
+    (rf"(?:show\s+)?(?:the\s+)?(?:performance|insights|performance\s+insights)\s+(?:of|for)\s+(?P<user_id>{_NAME})", get_performance_insights),
+]
+ROUTES = [(re.compile(rf"\s*{pattern}\s*[.!?]*\s*", re.IGNORECASE), tool) for pattern, tool in ROUTES]
+
+for _pattern, _tool in ROUTES:
+    assert set(_pattern.groupindex) == set(_tool.args), f"Route for {_tool.name} does not match its signature"
+
+async def _task_exists(args: Dict[str, str]) -> bool:
+    return await firebase_service.aget_task(args["task_id"]) is not None
+
+async def _team_exists(args: Dict[str, str]) -> bool:
+    return await firebase_service.aget_team_members(args["team_name"]) is not None
+
+async def _not_a_member(args: Dict[str, str]) -> bool:
+    members = await firebase_service.aget_team_members(args["team_name"])
+    return members is not None and args["user_name"] not in members
+
+async def _a_member(args: Dict[str, str]) -> bool:
+    members = await firebase_service.aget_team_members(args["team_name"])
+    return members is not None and args["user_name"] in members
+
+# What must hold before a matched command is run without the LLM: a phrase
+# like "how is Alice doing" or "add Bob to marketing" only fits its route if
+# the names refer to what the tool expects.
+CHECKS: Dict[str, Callable[[Dict[str, str]], Awaitable[bool]]] = {
+    update_task_status.name: _task_exists,
+    add_team_member.name: _not_a_member,
+    remove_team_member.name: _a_member,
+    delete_team.name: _team_exists,
+    delete_task.name: _task_exists,
+    check_progress.name: _team_exists,
+}
+
+class RouterMetrics:
+    """Hit rate of the fast path and the LLM time it saved."""
+
+    # A routed request skips at least two LLM calls: choosing the tool and
+    # phrasing the answer.
+    LLM_CALLS_SAVED_PER_HIT = 2
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.hits_by_tool: Dict[str, int] = {}
+        self.routed_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_hit(self, tool_name: str, seconds: float):
+        with self._lock:
+            self.hits += 1
+            self.hits_by_tool[tool_name] = self.hits_by_tool.get(tool_name, 0) + 1
+            self.routed_seconds += seconds
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_llm_call(self, seconds: float):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            avg_llm = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            saved = self.hits * self.LLM_CALLS_SAVED_PER_HIT * avg_llm - self.routed_seconds
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "hits_by_tool": dict(self.hits_by_tool),
+                "avg_llm_call_ms": avg_llm * 1000,
+                "avg_routed_ms": self.routed_seconds / self.hits * 1000 if self.hits else 0.0,
+                "estimated_saved_ms": max(saved, 0.0) * 1000,
+            }
+
+router_metrics = RouterMetrics()
+
+def match_route(text: str) -> Optional[Tuple[BaseTool, Dict[str, str]]]:
+    for pattern, tool in ROUTES:
+        match = pattern.fullmatch(text)
+        if match:
+            return tool, match.groupdict()
+    return None
+
+async def confident_route(text: str) -> Optional[Tuple[BaseTool, Dict[str, str]]]:
+    """The matching route, if the names in the request refer to existing teams, members and tasks."""
+    route = match_route(text)
+    if route is None:
+        return None
+    tool, args = route
+    check = CHECKS.get(tool.name)
+    if check is not None and not await check(args):
+        return None
+    return route
+
+async def router_node(state: AgentState) -> Dict:
+    """
+    Entry node: answers structurally trivial requests by calling the matching
+    tool directly. The call and its result are recorded as a normal
+    tool-call exchange so later LLM turns see a coherent history.
+    Returns no update when the request should go to the LLM.
+    """
+    last = state["messages"][-1]
+    route = await confident_route(last.content) \
+        if isinstance(last, HumanMessage) and isinstance(last.content, str) else None
+    if route is None:
+        router_metrics.record_miss()
+        return {}
+
+    tool, args = route
+    started = time.perf_counter()
+    call_id = f"route_{uuid.uuid4().hex[:12]}"
+    result = await tool.ainvoke(args)
+    router_metrics.record_hit(tool.name, time.perf_counter() - started)
+    return {"messages": [
+        AIMessage(content="", tool_calls=[{"name": tool.name, "args": args, "id": call_id}]),
+        ToolMessage(content=str(result), name=tool.name, tool_call_id=call_id),
+        AIMessage(content=str(result)),
+    ]}
+
+def route_after_router(state: AgentState) -> str:
+    return "context" if isinstance(state["messages"][-1], HumanMessage) else END
@@ -1,4 +1,4 @@
-from typing import TypedDict, Annotated, List, Union
+from typing import TypedDict, Annotated, Dict, List, Union
 from langchain_core.messages import BaseMessage
 import operator
 
@@ -6,3 +6,7 @@ class AgentState(TypedDict):
     messages: Annotated[List[BaseMessage], operator.add]
     next_step: str
     current_task: str
+    # Context window management (see app/agents/context.py)
+    summary: str
+    context_start: int
+    context_stats: Dict[str, int]
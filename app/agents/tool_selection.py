@@ -0,0 +1,122 @@
+import json
+import math
+import re
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# Words users reach for that the tools' short docstrings do not contain
+TOOL_KEYWORDS: Dict[str, str] = {
+    "research_technical_question": "why explain error bug library framework api docs search google code "
+                                   "python javascript install configure example tutorial compare",
+    "assign_task": "assign give delegate draft prepare write task todo ticket work job due deadline owner "
+                   "responsible",
+    "share_document": "share send document doc file spec slides report link recipients",
+    "check_progress": "progress status team squad doing going getting update overview summary breakdown behind track",
+    "get_performance_insights": "performance insights productivity velocity throughput overdue lead time "
+                                "well member person performing stats",
+    "update_task_status": "mark status complete completed done finished progress started pending reopen task",
+    "set_reminder": "remind reminder notify alert ping nudge before deadline task",
+    "create_team": "create new make start form set up team squad group",
+    "add_team_member": "add put join include onboard member user person team squad",
+    "delete_team": "delete remove disband drop team squad group",
+    "remove_team_member": "remove kick drop offboard leave member user person from team",
+    "delete_task": "delete remove drop cancel task ticket todo",
+}
+
+_STOPWORDS = frozenset(
+    "a an the and or of to for in on at by with from is are was be it this that these those i me my we our you "
+    "your he she they them his her its please can could would should will do does did what which who whom "
+    "there here about into as so if then than just also all any some has have had not no yes ok".split()
+)
+_WORD = re.compile(r"[a-z]+")
+
+def _stem(word: str) -> str:
+    # Crude suffix stripping; enough to make "deletes", "deleted" and "delete" meet
+    for suffix in ("ing", "ed", "es", "s", "e"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+def terms(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+class ToolSelector:
+    """
+    Picks the tools worth offering the LLM on one call.
+
+    Each tool is described by the words of its name, docstring and
+    TOOL_KEYWORDS entry, weighted by inverse document frequency across tools
+    (so "team", shared by many, counts for less than "disband"). The latest
+    user message is scored against every tool. The best-scoring tools (at most
+    `max_tools`, and within `relative_cutoff` of the best) are offered,
+    together with any tool already called in the current turn. When nothing
+    scores `min_score` the request is ambiguous and every tool is offered.
+
+    The OpenAI tool payload for each subset is built once and cached, so a
+    single bound model serves every subset through a call-time `tools`
+    override.
+    """
+
+    def __init__(self, tools: Sequence[BaseTool], max_tools: int = 4, min_score: float = 1.5,
+                 relative_cutoff: float = 0.5):
+        self.tools = list(tools)
+        self.max_tools = max_tools
+        self.min_score = min_score
+        self.relative_cutoff = relative_cutoff
+        self._by_name = {tool.name: tool for tool in self.tools}
+        self._terms = {
+            tool.name: set(terms(f"{tool.name.replace('_', ' ')} {tool.description} {TOOL_KEYWORDS.get(tool.name, '')}"))
+            for tool in self.tools
+        }
+        document_frequency: Dict[str, int] = {}
+        for tool_terms in self._terms.values():
+            for term in tool_terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        self._idf = {term: math.log(1 + len(self.tools) / df) for term, df in document_frequency.items()}
+        self._schemas: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+        self._schema_tokens: Dict[FrozenSet[str], int] = {}
+        self._lock = threading.Lock()
+
+    def scores(self, text: str) -> Dict[str, float]:
+        query = set(terms(text))
+        return {name: sum(self._idf[t] for t in query & tool_terms) for name, tool_terms in self._terms.items()}
+
+    def select(self, messages: Sequence[BaseMessage]) -> Optional[List[BaseTool]]:
+        """The tools to offer for the next LLM call, or None to offer all of them."""
+        last_human = next((i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)), None)
+        if last_human is None or not isinstance(messages[last_human].content, str):
+            return None
+        ranked = sorted(self.scores(messages[last_human].content).items(), key=lambda item: -item[1])
+        best = ranked[0][1] if ranked else 0.0
+        if best < self.min_score:
+            return None
+        names = [name for name, score in ranked[:self.max_tools] if score >= best * self.relative_cutoff]
+        # Keep offering what this turn already used, so follow-up calls can chain
+        for message in messages[last_human + 1:]:
+            if isinstance(message, AIMessage):
+                names.extend(call["name"] for call in message.tool_calls
+                             if call["name"] in self._by_name and call["name"] not in names)
+        if len(names) >= len(self.tools):
+            return None
+        return [self._by_name[name] for name in names]
+
+    def schemas(self, tools: Sequence[BaseTool]) -> List[Dict[str, Any]]:
+        """The OpenAI `tools` payload for a subset, built once per distinct subset."""
+        key = frozenset(tool.name for tool in tools)
+        cached = self._schemas.get(key)
+        if cached is None:
+            # Keep the registration order so identical subsets produce identical prompts
+            cached = [convert_to_openai_tool(tool) for tool in self.tools if tool.name in key]
+            with self._lock:
+                self._schemas[key] = cached
+                self._schema_tokens[key] = len(json.dumps(cached)) // 4
+        return cached
+
+    def schema_tokens(self, tools: Optional[Sequence[BaseTool]] = None) -> int:
+        """Approximate prompt tokens taken by the schemas of `tools` (all tools when None)."""
+        tools = tools or self.tools
+        self.schemas(tools)
+        return self._schema_tokens[frozenset(tool.name for tool in tools)]
@@ -1,76 +1,88 @@
-from langchain_core.tools import tool
+from langchain_core.tools import BaseTool, tool
 from typing import List
+import datetime
+import functools
+from app.core import metrics
+from app.core.cache import read_cache
 from app.services.firebase import firebase_service
 from app.services.calendar import calendar_service
-from langchain_community.utilities import SerpAPIWrapper
-from app.core.config import settings
+from app.services.documents import document_service
+from app.services.search import search_service
+from app.core.dates import parse_deadline
 
 @tool
-def research_technical_question(query: str) -> str:
+async def research_technical_question(query: str) -> str:
     """
     Researches a technical question or project-related topic using Google Search.
     Use this tool when the user asks for technical help, documentation, libraries, or best practices.
     """
     try:
-        if not settings.SERPAPI_API_KEY:
+        if not search_service.available:
             return "Error: SerpAPI Key is missing. Please add SERPAPI_API_KEY to the .env file."
         
-        search = SerpAPIWrapper(serpapi_api_key=settings.SERPAPI_API_KEY)
-        return search.run(query)
+        return await search_service.search(query)
     except Exception as e:
         return f"Error performing search: {str(e)}"
 
 @tool
-def assign_task(task_description: str, assignee: str, deadline: str) -> str:
+async def assign_task(task_description: str, assignee: str, deadline: str) -> str:
     """Assigns a task to a team member with a deadline and syncs to calendar."""
     task_data = {
         "title": task_description,
         "assignee": assignee,
         "deadline": deadline,
         "status": "pending",
-        "created_at": "now" # In real app use datetime
     }
     
     # Save to Firebase
-    db_result = firebase_service.add_task(task_data)
+    db_result = await firebase_service.aadd_task(task_data)
+    if "id" not in task_data:
+        return db_result
     
-    # Sync to Calendar (assuming deadline is a valid ISO string or we parse it)
-    # For demo, we just use the string as is or mock it
-    cal_result = calendar_service.create_event(
+    # Queue the calendar event; the outbox worker syncs it in the background
+    cal_result = await calendar_service.aenqueue_event(
+        task_data["id"],
         summary=f"Task: {task_description}",
-        start_time=deadline, # This needs proper formatting in real usage
+        start_time=deadline,
         end_time=deadline
     )
     
     return f"{db_result}. {cal_result}"
 
 @tool
-def share_document(document_name: str, recipients: List[str]) -> str:
-    """Shares a document with specified recipients."""
-    # In a real scenario, this would generate a signed URL from Firebase Storage
-    return f"Document '{document_name}' shared with {', '.join(recipients)} via Firebase Storage."
+async def share_document(document_name: str, recipients: List[str]) -> str:
+    """Shares an uploaded document with specified recipients through a time-limited download link."""
+    try:
+        link = await document_service.link(document_name)
+    except ValueError as e:
+        return f"Error: {e}"
+    if link is None:
+        return f"Document '{document_name}' not found. Upload it first (POST /api/documents?name=...)."
+    minutes = max(1, link["expires_in"] // 60)
+    return (f"Document '{document_name}' shared with {', '.join(recipients)}. "
+            f"Download link (valid for {minutes} minutes): {link['url']}")
 
 @tool
-def check_progress(team_name: str) -> str:
+async def check_progress(team_name: str) -> str:
     """
     Checks the progress of a team by listing tasks for all its members.
     Returns a detailed status including task assignment, completion status, and ratios.
     """
-    teams = firebase_service.get_all_teams()
-    if team_name not in teams:
+    members = await firebase_service.aget_team_members(team_name)
+    if members is None:
         return f"Team '{team_name}' not found."
     
-    members = teams[team_name]
     if not members:
         return f"Team '{team_name}' has no members."
     
     report = []
-    all_tasks = firebase_service.get_tasks() # Get all tasks to filter in memory
+    tasks_by_member = await firebase_service.aget_tasks_for_members(members)
     
     for member in members:
-        member_tasks = [t for t in all_tasks if t.get('assignee') == member]
+        member_tasks = tasks_by_member.get(member, [])
+        # Counted from the listed tasks so the ratio always matches the list
         total = len(member_tasks)
-        completed = len([t for t in member_tasks if t.get('status') == 'completed'])
+        completed = sum(1 for t in member_tasks if t.get('status') == 'completed')
         
         task_details = []
         for t in member_tasks:
@@ -82,50 +94,108 @@ def check_progress(team_name: str) -> str:
             report.extend(task_details)
         else:
             report.append(f"**{member}**: No tasks assigned (0/0)")
+
+    team = await firebase_service.aget_team_stats(team_name)
+    if team and team["total"]:
+        report.append(
+            f"**Team total**: {team['completed']}/{team['total']} tasks completed, {team['overdue']} overdue, "
+            f"{team['completed_last_7_days']} completed in the last 7 days"
+        )
             
     return "\n".join(report)
 
 @tool
-def delete_team(team_name: str) -> str:
+async def delete_team(team_name: str) -> str:
     """Deletes a team."""
-    return firebase_service.delete_team(team_name)
+    return await firebase_service.adelete_team(team_name)
 
 @tool
-def remove_team_member(team_name: str, user_name: str) -> str:
+async def remove_team_member(team_name: str, user_name: str) -> str:
     """Removes a user from a team."""
-    return firebase_service.remove_member(team_name, user_name)
+    return await firebase_service.aremove_member(team_name, user_name)
 
 @tool
-def delete_task(task_id: str) -> str:
+async def delete_task(task_id: str) -> str:
     """Deletes a task by its ID."""
     # Note: The user might not know the ID, so the agent might need to search first or the user provides context.
     # For now, we assume the agent can figure it out or asks for it.
-    return firebase_service.delete_task(task_id)
+    return await firebase_service.adelete_task(task_id)
 
 @tool
-def get_performance_insights(user_id: str) -> str:
-    """Retrieves performance insights for a user."""
-    tasks = firebase_service.get_tasks(user_id)
-    completed = len([t for t in tasks if t.get('status') == 'completed'])
-    total = len(tasks)
-    
-    if total == 0:
+async def get_performance_insights(user_id: str) -> str:
+    """
+    Retrieves performance insights for a user: completion ratio, overdue tasks,
+    throughput over the last 7 and 30 days and average lead time.
+    """
+    stats = await firebase_service.aget_member_stats(user_id)
+    if stats["total"] == 0:
         return f"No tasks found for user {user_id}."
-        
-    return f"User {user_id} has completed {completed} out of {total} tasks."
+
+    insights = [f"User {user_id} has completed {stats['completed']} out of {stats['total']} tasks."]
+    if stats["overdue"]:
+        insights.append(f"{stats['overdue']} open task(s) are overdue.")
+    insights.append(f"Completed in the last 7 days: {stats['completed_last_7_days']}, "
+                    f"last 30 days: {stats['completed_last_30_days']}.")
+    if stats["avg_lead_time_hours"] is not None:
+        insights.append(f"Average lead time: {stats['avg_lead_time_hours']} hours.")
+    return " ".join(insights)
 
 @tool
-def set_reminder(task_id: str, time: str) -> str:
-    """Sets a smart deadline reminder."""
-    # This would ideally interface with the Scheduler service dynamically
-    return f"Reminder set for task {task_id} at {time}."
+async def update_task_status(task_id: str, status: str) -> str:
+    """Updates a task's status, e.g. to 'completed', 'in_progress' or 'pending'."""
+    return await firebase_service.aupdate_task_status(task_id, status)
 
 @tool
-def create_team(team_name: str) -> str:
+async def set_reminder(task_id: str, time: str) -> str:
+    """Sets a smart deadline reminder. The time must be an ISO date/time such as 2025-05-01T09:00."""
+    when = parse_deadline(time)
+    if when is None:
+        return f"Could not understand reminder time '{time}'. Please use an ISO date/time like 2025-05-01T09:00."
+    
+    if when <= datetime.datetime.now(datetime.timezone.utc):
+        return f"Reminder time {when.isoformat()} is in the past."
+    
+    # Stored on the task, so whichever worker sends reminders sees it, and it survives restarts
+    return await firebase_service.aadd_reminder(task_id, when.isoformat())
+
+@tool
+async def create_team(team_name: str) -> str:
     """Creates a new team."""
-    return firebase_service.create_team(team_name)
+    return await firebase_service.acreate_team(team_name)
 
 @tool
-def add_team_member(team_name: str, user_name: str) -> str:
+async def add_team_member(team_name: str, user_name: str) -> str:
     """Adds a user to a team."""
-    return firebase_service.add_member(team_name, user_name)
+    return await firebase_service.aadd_member(team_name, user_name)
+
+def _instrument(tool: BaseTool):
+    """Times every call of a tool and records it as an action of the current request."""
+    coroutine = tool.coroutine
+
+    @functools.wraps(coroutine)
+    async def timed(*args, **kwargs):
+        metrics.record_action(tool.name)
+        with metrics.timed(metrics.TOOL_SECONDS, tool.name):
+            return await coroutine(*args, **kwargs)
+
+    tool.coroutine = timed
+
+def _cache(tool: BaseTool):
+    """Serves repeat calls of a read-only tool from read_cache until a team or task changes."""
+    coroutine = tool.coroutine
+
+    @functools.wraps(coroutine)
+    async def cached(*args, **kwargs):
+        version = await firebase_service.adata_version()
+        key = (tool.name, args, tuple(sorted(kwargs.items())))
+        return await read_cache.get_or_compute(key, version, lambda: coroutine(*args, **kwargs))
+
+    tool.coroutine = cached
+
+for _tool in (check_progress, get_performance_insights):
+    _cache(_tool)
+
+for _tool in (research_technical_question, assign_task, share_document, check_progress, delete_team,
+              remove_team_member, delete_task, get_performance_insights, update_task_status, set_reminder,
+              create_team, add_team_member):
+    _instrument(_tool)
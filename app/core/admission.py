@@ -0,0 +1,232 @@
+import asyncio
+import email.utils
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from app.core import metrics
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Upstream statuses worth retrying: rate limited, or a transient server failure
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class AdmissionRejected(Exception):
+    """
+    An LLM call that was not made (or kept failing upstream). Carries what the
+    API needs for a real error response: status, Retry-After and queue depth.
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: float, queue_depth: int):
+        super().__init__(f"LLM capacity exhausted ({reason}); retry in {math.ceil(retry_after)}s")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+
+class TokenBucket:
+    """Refills continuously at `rate` units per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (amounts above capacity wait for a full bucket)."""
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float, now: float):
+        # May go negative when a call used more than estimated; later callers wait it off
+        self._refill(now)
+        self.level -= amount
+
+class LLMAdmission:
+    """
+    Admission control in front of the LLM.
+
+    Calls wait in FIFO order for two token buckets sized from the upstream
+    quota: requests per minute and tokens per minute (estimated from the
+    prompt, corrected with reported usage afterwards). A caller is turned away
+    at once, instead of timing out later, when `max_queue` callers are
+    already waiting (503) or the projected wait exceeds `max_wait` seconds
+    (429); both carry a Retry-After. Upstream 429s pause every caller until
+    the Retry-After the API sent has passed, and 429/5xx responses are
+    retried with jittered exponential backoff.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_queue: int = 64, max_wait: float = 30.0,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.requests = TokenBucket(rpm / 60, rpm) if rpm else None
+        self.tokens = TokenBucket(tpm / 60, tpm) if tpm else None
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.waiting = 0
+        self._queued_tokens = 0
+        self._paused_until = 0.0
+        self._fifo_lock: Optional[asyncio.Lock] = None
+        self._fifo_loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "waiting": self.waiting,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "requests_available": round(self.requests.level, 1) if self.requests else None,
+            "tokens_available": round(self.tokens.level) if self.tokens else None,
+        }
+
+    def check(self, tokens: int = 0):
+        """Raises AdmissionRejected if a call arriving now would be turned away."""
+        now = time.monotonic()
+        if self.waiting >= self.max_queue:
+            self._reject(503, "queue_full", self._projected_wait(tokens, now))
+        projected = self._projected_wait(tokens, now)
+        if projected > self.max_wait:
+            self._reject(429, "wait_too_long", projected)
+
+    async def call(self, func: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """Runs `func` (an LLM call estimated at `tokens` tokens) once admitted, retrying upstream failures."""
+        attempt = 0
+        while True:
+            await self._admit(tokens)
+            try:
+                return await func()
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status not in RETRYABLE_STATUSES:
+                    raise
+                attempt += 1
+                retry_after = _retry_after(e)
+                backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                delay = (retry_after if retry_after is not None else backoff) * random.uniform(1.0, 1.2)
+                if metrics.enabled:
+                    metrics.LLM_RETRIES.inc(str(status))
+                if attempt > self.max_retries:
+                    self._reject(429 if status == 429 else 503, f"upstream_{status}", delay)
+                if status == 429:
+                    # The quota is shared, so everyone waits, not just this caller
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                else:
+                    await asyncio.sleep(delay)
+
+    def record_usage(self, estimated: int, actual: Optional[int]):
+        """Charges (or refunds) the difference between a call's estimated and reported tokens."""
+        if self.tokens is not None and actual is not None:
+            self.tokens.take(actual - estimated, time.monotonic())
+
+    async def _admit(self, tokens: int):
+        if self.requests is None and self.tokens is None and self._paused_until <= time.monotonic():
+            return
+        self.check(tokens)
+        self.waiting += 1
+        self._queued_tokens += tokens
+        try:
+            with metrics.timed(metrics.LLM_QUEUE_SECONDS):
+                async with self._fifo():
+                    while True:
+                        now = time.monotonic()
+                        delay = self._delay(tokens, now)
+                        if delay <= 0:
+                            break
+                        await asyncio.sleep(delay)
+                    if self.requests:
+                        self.requests.take(1, now)
+                    if self.tokens:
+                        self.tokens.take(tokens, now)
+        finally:
+            self.waiting -= 1
+            self._queued_tokens -= tokens
+
+    def _delay(self, tokens: int, now: float, queued_requests: int = 0, queued_tokens: int = 0) -> float:
+        delay = self._paused_until - now
+        if self.requests:
+            delay = max(delay, self.requests.delay(queued_requests + 1, now))
+        if self.tokens:
+            delay = max(delay, self.tokens.delay(queued_tokens + tokens, now))
+        return delay
+
+    def _projected_wait(self, tokens: int, now: float) -> float:
+        # Everyone already queued is served first
+        return max(0.0, self._delay(tokens, now, self.waiting, self._queued_tokens))
+
+    def _reject(self, status_code: int, reason: str, retry_after: float):
+        if metrics.enabled:
+            metrics.LLM_REJECTIONS.inc(reason)
+        raise AdmissionRejected(status_code, reason, max(retry_after, 1.0), self.waiting)
+
+    def _fifo(self) -> asyncio.Lock:
+        # asyncio.Lock wakes waiters in arrival order; one per event loop
+        loop = asyncio.get_running_loop()
+        if self._fifo_loop is not loop:
+            self._fifo_lock = asyncio.Lock()
+            self._fifo_loop = loop
+        return self._fifo_lock
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from an upstream error's Retry-After (or retry-after-ms) header, if it sent one."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class ConversationLocks:
+    """
+    One asyncio lock per conversation thread, so turns for the same thread
+    run one at a time instead of racing on its checkpoint. A lock is dropped
+    once nobody holds or waits for it. Locks are per process; with several
+    workers, route a user's requests to one worker to get the same guarantee.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str):
+        lock, users = self._locks.get(thread_id, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[thread_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[thread_id]
+            if users == 1:
+                del self._locks[thread_id]
+            else:
+                self._locks[thread_id] = (lock, users - 1)
+
+llm_admission = LLMAdmission(
+    rpm=settings.LLM_RPM,
+    tpm=settings.LLM_TPM,
+    max_queue=settings.LLM_MAX_QUEUE,
+    max_wait=settings.LLM_MAX_WAIT,
+    max_retries=settings.LLM_MAX_RETRIES,
+    base_delay=settings.LLM_RETRY_BASE_DELAY,
+    max_delay=settings.LLM_RETRY_MAX_DELAY,
+)
+conversation_locks = ConversationLocks()
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+from app.core import metrics
+from app.core.config import settings
+
+T = TypeVar("T")
+
+class ResultCache:
+    """
+    Results of read-only calls, keyed by name and arguments and tagged with
+    the data version they were computed at.
+
+    The version is a counter the caller reads from its data source before
+    computing (FirebaseService bumps it after every team/task write). An
+    entry is served only while that version is still current, so a write
+    invalidates everything computed before it; a result computed while a
+    write was landing is tagged with the older version and is never served.
+    A version of None means writes could happen unseen, and the cache is
+    bypassed. `ttl` bounds the age of results that also depend on the clock.
+    Least recently used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 60.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._counts = {"hit": 0, "miss": 0, "stale": 0, "expired": 0, "bypass": 0}
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counts["hit"] + self._counts["miss"] + self._counts["stale"] + self._counts["expired"]
+        return {
+            "entries": len(self._entries),
+            "hits": self._counts["hit"],
+            "misses": self._counts["miss"],
+            # Entries found superseded by a write, or older than ttl
+            "invalidations": self._counts["stale"],
+            "expirations": self._counts["expired"],
+            "bypassed": self._counts["bypass"],
+            "hit_ratio": round(self._counts["hit"] / lookups, 3) if lookups else None,
+        }
+
+    def get(self, key: Hashable, version: int) -> Tuple[bool, Any]:
+        """(True, value) if `key` was computed at `version` within ttl, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                outcome = "miss"
+            elif entry[0] != version:
+                outcome = "stale"
+            elif time.monotonic() - entry[1] > self.ttl:
+                outcome = "expired"
+            else:
+                outcome = "hit"
+                self._entries.move_to_end(key)
+            if outcome in ("stale", "expired"):
+                del self._entries[key]
+        self._count(outcome)
+        return (True, entry[2]) if outcome == "hit" else (False, None)
+
+    def put(self, key: Hashable, version: int, value: Any):
+        with self._lock:
+            current = self._entries.get(key)
+            # A slow reader must not replace what a later one computed from newer data
+            if current is not None and current[0] > version:
+                return
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: Hashable, version: Optional[int], compute: Callable[[], Awaitable[T]]) -> T:
+        """The cached result for `key` at `version`, or `compute()`'s, cached when `version` is known."""
+        if version is None or not self.enabled:
+            self._count("bypass")
+            return await compute()
+        found, value = self.get(key, version)
+        if found:
+            return value
+        value = await compute()
+        self.put(key, version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, outcome: str):
+        self._counts[outcome] += 1
+        if metrics.enabled:
+            metrics.RESULT_CACHE_LOOKUPS.inc(outcome)
+
+read_cache = ResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl=settings.RESULT_CACHE_TTL,
+    enabled=settings.RESULT_CACHE,
+)
@@ -0,0 +1,20 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Shared, bounded pool for SDK calls that have no async API (Firestore, Storage,
+# Google Calendar, SerpAPI). Keeping it bounded stops a burst of chats from
+# spawning an unbounded number of threads.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BLOCKING_IO_WORKERS,
+    thread_name_prefix="trackup-io",
+)
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs a blocking call on the shared I/O pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
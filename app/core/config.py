@@ -12,5 +12,80 @@ class Settings:
     SERPAPI_API_KEY: str = os.getenv("SERPAPI_API_KEY", "")
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", 8000))
+    # Max threads used to offload blocking SDK calls from the event loop
+    BLOCKING_IO_WORKERS: int = int(os.getenv("BLOCKING_IO_WORKERS", 16))
+    # Comma-separated lead times for deadline reminders (m/h/d units)
+    REMINDER_LEAD_TIMES: str = os.getenv("REMINDER_LEAD_TIMES", "24h,1h")
+    # Conversation checkpointer: "memory" (bounded), "sqlite" (bounded + on disk) or "unbounded"
+    CHECKPOINTER: str = os.getenv("CHECKPOINTER", "memory")
+    CHECKPOINT_DB_PATH: str = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.sqlite")
+    CHECKPOINT_MAX_THREADS: int = int(os.getenv("CHECKPOINT_MAX_THREADS", 1000))
+    CHECKPOINT_THREAD_TTL: float = float(os.getenv("CHECKPOINT_THREAD_TTL", 24 * 3600))
+    CHECKPOINT_MAX_PER_THREAD: int = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", 20))
+    # Approximate token budget for the history sent to the LLM on each hop
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", 8000))
+    CONTEXT_SUMMARY_TOKENS: int = int(os.getenv("CONTEXT_SUMMARY_TOKENS", 1000))
+    CONTEXT_TOOL_MESSAGE_TOKENS: int = int(os.getenv("CONTEXT_TOOL_MESSAGE_TOKENS", 500))
+    # Web search result cache; set SEARCH_CACHE_DB_PATH to keep results on disk
+    SEARCH_CACHE_TTL: float = float(os.getenv("SEARCH_CACHE_TTL", 24 * 3600))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1000))
+    SEARCH_CACHE_DB_PATH: str = os.getenv("SEARCH_CACHE_DB_PATH", "")
+    # Durable outbox for Google Calendar sync
+    CALENDAR_OUTBOX_PATH: str = os.getenv("CALENDAR_OUTBOX_PATH", "calendar_outbox.sqlite")
+    CALENDAR_SYNC_INTERVAL: float = float(os.getenv("CALENDAR_SYNC_INTERVAL", 5))
+    CALENDAR_SYNC_MAX_ATTEMPTS: int = int(os.getenv("CALENDAR_SYNC_MAX_ATTEMPTS", 8))
+    # Directory for the offline (mock mode) store's journal and snapshots; empty keeps it in memory only
+    MOCK_STORE_DIR: str = os.getenv("MOCK_STORE_DIR", "mock_data")
+    # Seconds between journal fsyncs, and journaled writes between snapshots
+    MOCK_STORE_FSYNC_INTERVAL: float = float(os.getenv("MOCK_STORE_FSYNC_INTERVAL", 0.05))
+    MOCK_STORE_SNAPSHOT_EVERY: int = int(os.getenv("MOCK_STORE_SNAPSHOT_EVERY", 10000))
+    # Share the offline store, conversations and the scheduler between worker
+    # processes on one host (uvicorn --workers N) through a SQLite file
+    SHARED_STATE: bool = os.getenv("SHARED_STATE", "false").lower() == "true"
+    SHARED_STATE_PATH: str = os.getenv("SHARED_STATE_PATH", "trackup_shared.sqlite")
+    # Seconds between a worker's polls for other workers' writes
+    SHARED_STATE_POLL_INTERVAL: float = float(os.getenv("SHARED_STATE_POLL_INTERVAL", 0.05))
+    # Seconds the scheduler leader's lease lasts without renewal
+    SCHEDULER_LEASE_TTL: float = float(os.getenv("SCHEDULER_LEASE_TTL", 15))
+    # Serve Firestore reads from a local mirror kept current by snapshot listeners
+    FIRESTORE_READ_REPLICA: bool = os.getenv("FIRESTORE_READ_REPLICA", "false").lower() == "true"
+    # Add assignee_key to Firestore tasks that lack it at startup (reads every task's assignee fields)
+    FIRESTORE_BACKFILL_ASSIGNEE_KEYS: bool = os.getenv("FIRESTORE_BACKFILL_ASSIGNEE_KEYS", "true").lower() == "true"
+    # Max tasks accepted by one POST /api/tasks/bulk request
+    BULK_MAX_TASKS: int = int(os.getenv("BULK_MAX_TASKS", 5000))
+    # Record latency histograms and token counters for /metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Upstream LLM quota in requests and tokens per minute (0 = unlimited)
+    LLM_RPM: int = int(os.getenv("LLM_RPM", 0))
+    LLM_TPM: int = int(os.getenv("LLM_TPM", 0))
+    # LLM calls allowed to wait for quota, and the longest projected wait accepted, before rejecting
+    LLM_MAX_QUEUE: int = int(os.getenv("LLM_MAX_QUEUE", 64))
+    LLM_MAX_WAIT: float = float(os.getenv("LLM_MAX_WAIT", 30))
+    # Retries of LLM calls that fail with 429 or 5xx, and their backoff in seconds
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 4))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0))
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", 30))
+    # Offer the LLM only the tools relevant to each request (at most TOOL_SELECTION_MAX), not all of them
+    TOOL_SELECTION: bool = os.getenv("TOOL_SELECTION", "true").lower() == "true"
+    TOOL_SELECTION_MAX: int = int(os.getenv("TOOL_SELECTION_MAX", 4))
+    # Cache read-only tool results and dashboard GETs until the next team/task write. Results that
+    # also depend on the clock (overdue counts) are recomputed after RESULT_CACHE_TTL seconds at most.
+    RESULT_CACHE: bool = os.getenv("RESULT_CACHE", "true").lower() == "true"
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 2048))
+    RESULT_CACHE_TTL: float = float(os.getenv("RESULT_CACHE_TTL", 60))
+    # Documents are streamed to Storage in DOCUMENT_CHUNK_SIZE pieces (rounded up to 256 KiB), with at
+    # most DOCUMENT_MAX_PENDING_CHUNKS read ahead of the upload, so memory stays flat for any file size
+    DOCUMENT_CHUNK_SIZE: int = int(os.getenv("DOCUMENT_CHUNK_SIZE", 8 * 1024 * 1024))
+    DOCUMENT_MAX_PENDING_CHUNKS: int = int(os.getenv("DOCUMENT_MAX_PENDING_CHUNKS", 2))
+    DOCUMENT_UPLOAD_RETRIES: int = int(os.getenv("DOCUMENT_UPLOAD_RETRIES", 5))
+    # Signed document links last DOCUMENT_URL_TTL seconds and are reused while they have at least
+    # DOCUMENT_URL_MIN_VALIDITY seconds left
+    DOCUMENT_URL_TTL: int = int(os.getenv("DOCUMENT_URL_TTL", 3600))
+    DOCUMENT_URL_MIN_VALIDITY: int = int(os.getenv("DOCUMENT_URL_MIN_VALIDITY", 600))
+    # Tasks per page of /api/tasks and /api/member (clients may ask for up to TASK_PAGE_MAX)
+    TASK_PAGE_SIZE: int = int(os.getenv("TASK_PAGE_SIZE", 100))
+    TASK_PAGE_MAX: int = int(os.getenv("TASK_PAGE_MAX", 1000))
+    # Answer simple commands ("create team X") without calling the LLM
+    FAST_PATH_ROUTER: bool = os.getenv("FAST_PATH_ROUTER", "true").lower() == "true"
 
 settings = Settings()
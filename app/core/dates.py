@@ -0,0 +1,18 @@
+import datetime
+from typing import Optional
+
+def parse_deadline(value: Optional[str]) -> Optional[datetime.datetime]:
+    """
+    Parses a task deadline into an aware UTC datetime.
+    Accepts ISO dates and datetimes (naive values are taken as UTC, matching the
+    calendar sync). Returns None for free-form text such as "next Friday".
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
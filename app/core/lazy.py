@@ -0,0 +1,57 @@
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+class LazySingleton(Generic[T]):
+    """
+    Module-level singleton that is only built on first use.
+
+    Attribute access is forwarded to the wrapped object, so call sites keep
+    using `firebase_service.get_tasks()` while importing the module stays
+    cheap. `load()` builds it explicitly (e.g. in a startup hook) and
+    `on_load()` registers setup that needs the built object.
+    """
+
+    def __init__(self, factory: Callable[[], T], name: str):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_hooks", [])
+        object.__setattr__(self, "_lock", threading.RLock())
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                instance = self._factory()
+                object.__setattr__(self, "_instance", instance)
+                for hook in self._hooks:
+                    hook(instance)
+            return self._instance
+
+    def on_load(self, hook: Callable[[T], Any]):
+        """Runs `hook(instance)` once the object is built (immediately if it already is)."""
+        with self._lock:
+            self._hooks.append(hook)
+            if self._instance is not None:
+                hook(self._instance)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self.load(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazySingleton {self._name} ({state})>"
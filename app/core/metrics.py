@@ -0,0 +1,208 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+
+# Seconds; tuned for spans from sub-millisecond store lookups to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+enabled: bool = settings.METRICS_ENABLED
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _labels(self, labelvalues: Tuple[str, ...]) -> str:
+        if not labelvalues:
+            return ""
+        pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labelvalues))
+        return "{" + pairs + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._labels(k)} {_number(v)}" for k, v in self._values.items()]
+
+class Histogram(_Metric):
+    """
+    Cumulative histogram in Prometheus' text format. `step` prefixes the
+    label values to name the span in per-request timings, e.g. "node:agent".
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 step: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.step = step
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                series = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._values.get(labelvalues)
+        return sum(series[:-1]) if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for labelvalues, series in self._values.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), series):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{self.name}_bucket{_with_le(self._labels(labelvalues), le)} {cumulative}")
+                lines.append(f"{self.name}_sum{self._labels(labelvalues)} {_number(series[-1])}")
+                lines.append(f"{self.name}_count{self._labels(labelvalues)} {cumulative}")
+        return lines
+
+REGISTRY: List[_Metric] = []
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+# --- Per-request traces ---
+
+class RequestTrace:
+    """Timings, tool calls and LLM usage collected while serving one chat request."""
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+        self.actions: List[str] = []
+        self.hops = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def add(self, step: str, seconds: float):
+        self.steps[step] = self.steps.get(step, 0.0) + seconds
+
+    def timings_ms(self) -> Dict[str, float]:
+        return {step: round(seconds * 1000, 3) for step, seconds in self.steps.items()}
+
+    def usage(self) -> Dict[str, int]:
+        return {"graph_hops": self.hops, "llm_input_tokens": self.input_tokens,
+                "llm_output_tokens": self.output_tokens}
+
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+@contextmanager
+def trace_request():
+    """Collects a RequestTrace for everything awaited inside the block, including graph nodes and tools."""
+    trace = RequestTrace()
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _trace.reset(token)
+        except ValueError:
+            # An abandoned streaming generator is finalized in another context
+            _trace.set(None)
+
+@contextmanager
+def timed(histogram: Histogram, *labelvalues: str):
+    """Times the block into `histogram` and the current request trace, if either is active."""
+    trace = _trace.get()
+    if not enabled and trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        if enabled:
+            histogram.observe(seconds, *labelvalues)
+        if trace is not None:
+            trace.add(":".join(filter(None, (histogram.step,) + labelvalues)), seconds)
+
+def record_hop():
+    trace = _trace.get()
+    if trace is not None:
+        trace.hops += 1
+
+def record_action(tool_name: str):
+    trace = _trace.get()
+    if trace is not None:
+        trace.actions.append(tool_name)
+
+def record_llm_usage(usage: Optional[Dict[str, int]]):
+    if not usage:
+        return
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    if enabled:
+        LLM_TOKENS.inc("input", amount=input_tokens)
+        LLM_TOKENS.inc("output", amount=output_tokens)
+    trace = _trace.get()
+    if trace is not None:
+        trace.input_tokens += input_tokens
+        trace.output_tokens += output_tokens
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def _with_le(labels: str, le: str) -> str:
+    return labels[:-1] + f',le="{le}"}}' if labels else f'{{le="{le}"}}'
+
+NODE_SECONDS = Histogram("trackup_node_seconds", "Wall time of each graph node run.", ["node"], step="node")
+TOOL_SECONDS = Histogram("trackup_tool_seconds", "Wall time of each tool call.", ["tool"], step="tool")
+LLM_SECONDS = Histogram("trackup_llm_seconds", "Wall time of each LLM call.", step="llm")
+SERVICE_SECONDS = Histogram("trackup_service_seconds", "Wall time of Firebase, Calendar and search calls.",
+                            ["service", "method"])
+GRAPH_HOPS = Histogram("trackup_graph_hops", "Graph nodes run per chat request.",
+                       buckets=(1, 2, 3, 4, 6, 8, 12, 16, 25))
+LLM_TOKENS = Counter("trackup_llm_tokens_total", "LLM tokens used, by direction.", ["type"])
+LLM_QUEUE_SECONDS = Histogram("trackup_llm_queue_seconds", "Time LLM calls waited for admission.", step="llm_queue")
+LLM_RETRIES = Counter("trackup_llm_retries_total", "LLM calls retried after an upstream error, by status.", ["status"])
+LLM_REJECTIONS = Counter("trackup_llm_rejections_total", "LLM calls turned away by admission control, by reason.",
+                         ["reason"])
+TOOL_SELECTIONS = Counter("trackup_tool_selections_total",
+                          "LLM calls by tools offered: a selected subset or all (low confidence).", ["outcome"])
+RESULT_CACHE_LOOKUPS = Counter("trackup_result_cache_lookups_total",
+                               "Result cache lookups by outcome: hit, miss, stale (a write invalidated it), "
+                               "expired or bypass.", ["outcome"])
+CHAT_ERRORS = Counter("trackup_chat_errors_total", "Chat requests that ended in an error, by kind.", ["kind"])
@@ -0,0 +1,112 @@
+import bisect
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+class SortedList:
+    """
+    Sorted sequence for indexes that change as often as they are read.
+
+    Items live in sorted buckets of at most 2 * `load` items, with each
+    bucket's largest item kept in a separate list for bisecting. An insert or
+    delete finds its bucket in O(log n) and shifts at most that bucket,
+    instead of the whole list as `bisect.insort`/`del` on a flat list do, so
+    writes stay cheap at any size. (The layout of the sortedcontainers
+    package, which is not a dependency here.)
+    """
+
+    def __init__(self, items: Iterable = (), load: int = 512):
+        self._load = load
+        self._lists: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._len = 0
+        self.update(items)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        for bucket in self._lists:
+            yield from bucket
+
+    def update(self, items: Iterable):
+        """Adds many items with a single sort, e.g. when loading a snapshot."""
+        values = list(self)
+        values.extend(items)
+        values.sort()
+        self._lists = [values[i:i + self._load] for i in range(0, len(values), self._load)]
+        self._maxes = [bucket[-1] for bucket in self._lists]
+        self._len = len(values)
+
+    def add(self, value: Any):
+        if not self._lists:
+            self._lists.append([value])
+            self._maxes.append(value)
+            self._len = 1
+            return
+        pos = bisect.bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._lists[pos].append(value)
+            self._maxes[pos] = value
+        else:
+            bisect.insort(self._lists[pos], value)
+        self._len += 1
+        bucket = self._lists[pos]
+        if len(bucket) > 2 * self._load:
+            self._lists[pos:pos + 1] = [bucket[:self._load], bucket[self._load:]]
+            self._maxes[pos:pos + 1] = [bucket[self._load - 1], bucket[-1]]
+
+    def discard(self, value: Any) -> bool:
+        """Removes `value` if present. Returns whether it was."""
+        pos = bisect.bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return False
+        bucket = self._lists[pos]
+        i = bisect.bisect_left(bucket, value)
+        if bucket[i] != value:
+            return False
+        del bucket[i]
+        self._len -= 1
+        if bucket:
+            self._maxes[pos] = bucket[-1]
+        else:
+            del self._lists[pos]
+            del self._maxes[pos]
+        return True
+
+    def irange(self, minimum: Any = None, maximum: Any = None,
+               inclusive: Tuple[bool, bool] = (True, False)) -> Iterator[Any]:
+        """
+        Items from `minimum` to `maximum` in order (None leaves that end
+        open); `inclusive` says whether each bound itself is included.
+        """
+        pos, i = self._locate(minimum, inclusive[0])
+        while pos < len(self._lists):
+            bucket = self._lists[pos]
+            for j in range(i, len(bucket)):
+                value = bucket[j]
+                if maximum is not None and (value > maximum or (value == maximum and not inclusive[1])):
+                    return
+                yield value
+            pos, i = pos + 1, 0
+
+    def bisect_left(self, value: Any) -> int:
+        """The position `value` would be inserted at, before any equal items."""
+        return self._position(*self._locate(value, True))
+
+    def bisect_right(self, value: Any) -> int:
+        """The position `value` would be inserted at, after any equal items."""
+        return self._position(*self._locate(value, False))
+
+    def _position(self, pos: int, i: int) -> int:
+        # Sums bucket sizes: O(n / load), which stays small next to the items a caller then reads
+        return sum(len(bucket) for bucket in self._lists[:pos]) + i
+
+    def _locate(self, value: Optional[Any], inclusive: bool) -> Tuple[int, int]:
+        # (bucket, offset) of the first item >= value (> value if not inclusive)
+        if value is None:
+            return 0, 0
+        find = bisect.bisect_left if inclusive else bisect.bisect_right
+        pos = find(self._maxes, value)
+        if pos == len(self._maxes):
+            return pos, 0
+        return pos, find(self._lists[pos], value)
@@ -1,79 +1,411 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from app.models.schemas import UserRequest, AgentResponse
-from app.agents.graph_new import app_graph
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from app.models.schemas import UserRequest, AgentResponse, BulkTaskResponse, BulkTaskResult, Task
+from app.agents.graph_new import app_graph, checkpointer
+from app.agents.router import router_metrics
 from langchain_core.messages import HumanMessage
+from app.core import metrics
+from app.core.admission import AdmissionRejected, conversation_locks, llm_admission
+from app.core.cache import read_cache
 from app.core.config import settings
-from app.services.scheduler import start_scheduler
+from app.core.concurrency import run_blocking
+from app.services.scheduler import start_scheduler, stop_scheduler
+import hashlib
 import os
+import json
+import math
+from typing import Any, Dict, List, Optional
+from pydantic import ValidationError
 
 from app.services.firebase import firebase_service
+from app.services.calendar import calendar_service
+from app.services.documents import StorageError, document_service
+from app.services.search import search_service
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+def _warm_up():
+    # Services are built lazily; build them now, off the event loop, so the
+    # first request does not pay for credential loading or graph compilation.
+    for singleton in (firebase_service, calendar_service, app_graph):
+        singleton.load()
+
 @app.on_event("startup")
 async def startup_event():
+    await run_blocking(_warm_up)
     start_scheduler()
+    calendar_service.outbox.start()
     print(f"Using Model: {settings.MODEL_NAME}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    calendar_service.outbox.stop()
+    stop_scheduler()
+    firebase_service.close()
+    await search_service.aclose()
+
+def _set_freshness_headers(response: Response):
+    """Tells dashboard clients whether data came from the replica and how old it may be."""
+    freshness = firebase_service.read_freshness()
+    response.headers["X-Data-Source"] = freshness["source"]
+    if freshness.get("seconds_since_update") is not None:
+        response.headers["X-Data-Age"] = str(freshness["seconds_since_update"])
+
+async def _cached_json(request: Request, compute) -> Response:
+    """
+    A read endpoint's JSON, served from read_cache (keyed by path and query)
+    until the next team/task write. The ETag is a hash of the body, so it
+    holds across workers and a poller whose If-None-Match still matches gets
+    an empty 304.
+    """
+    async def render():
+        body = JSONResponse(await compute()).body
+        return body, f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    body, etag = await read_cache.get_or_compute(key, await firebase_service.adata_version(), render)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        response = Response(status_code=304, headers=headers)
+    else:
+        response = Response(body, media_type="application/json", headers=headers)
+    _set_freshness_headers(response)
+    return response
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison, as If-None-Match calls for: a W/ prefix does not matter
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+@app.get("/ready")
+async def ready():
+    components = {
+        "firebase": firebase_service.loaded,
+        "calendar": calendar_service.loaded,
+        "graph": app_graph.loaded,
+    }
+    is_ready = all(components.values())
+    return JSONResponse({"ready": is_ready, "components": components}, status_code=200 if is_ready else 503)
+
 @app.get("/")
 async def root():
     return FileResponse("app/static/index.html")
 
 @app.get("/api/teams")
-async def get_teams():
-    return firebase_service.get_all_teams()
+async def get_teams(request: Request):
+    return await _cached_json(request, firebase_service.aget_all_teams)
 
 @app.delete("/api/teams/{team_name}")
 async def delete_team(team_name: str):
-    return {"message": firebase_service.delete_team(team_name)}
+    return {"message": await firebase_service.adelete_team(team_name)}
 
 @app.delete("/api/teams/{team_name}/members/{member_name}")
 async def remove_member(team_name: str, member_name: str):
-    return {"message": firebase_service.remove_member(team_name, member_name)}
+    return {"message": await firebase_service.aremove_member(team_name, member_name)}
+
+@app.post("/api/tasks/bulk", response_model=BulkTaskResponse)
+async def bulk_add_tasks(tasks: List[Dict[str, Any]] = Body(...)):
+    """
+    Imports a list of tasks. Each item is validated against the Task schema on
+    its own, so one bad row does not reject the rest; valid tasks are written
+    in batches.
+    """
+    if len(tasks) > settings.BULK_MAX_TASKS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_MAX_TASKS} tasks per request")
+
+    results: List[BulkTaskResult] = []
+    valid: List[Dict[str, Any]] = []
+    valid_indexes: List[int] = []
+    for index, item in enumerate(tasks):
+        try:
+            task = Task.model_validate(item)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results.append(BulkTaskResult(index=index, ok=False, error=errors))
+            continue
+        valid.append(task.model_dump(exclude_none=True))
+        valid_indexes.append(index)
+
+    stored = await firebase_service.aadd_tasks(valid)
+    results.extend(BulkTaskResult(index=index, **result) for index, result in zip(valid_indexes, stored))
+    results.sort(key=lambda r: r.index)
+    created = sum(r.ok for r in results)
+    return BulkTaskResponse(created=created, failed=len(results) - created, results=results)
+
+def _task_page_args(status: Optional[str] = None, due_after: Optional[str] = None, due_before: Optional[str] = None,
+                    fields: Optional[str] = None,
+                    limit: int = Query(settings.TASK_PAGE_SIZE, ge=1, le=settings.TASK_PAGE_MAX),
+                    cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Filters, projection (`fields=title,status`) and paging shared by the task list routes."""
+    return {
+        "status": status, "due_after": due_after, "due_before": due_before,
+        "fields": [f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        "limit": limit, "cursor": cursor,
+    }
+
+async def _page_chunks(page: Dict[str, Any], **extra):
+    # Serialized a batch of tasks at a time rather than as one big string
+    tasks = page["tasks"]
+    yield '{"tasks":['
+    for start in range(0, len(tasks), 100):
+        yield ("," if start else "") + ",".join(json.dumps(task, default=str) for task in tasks[start:start + 100])
+    yield "]," + json.dumps({"next_cursor": page["next_cursor"], **extra})[1:]
+
+@app.get("/api/tasks")
+async def list_tasks(assignee: Optional[str] = None, include_total: bool = False,
+                     page: Dict[str, Any] = Depends(_task_page_args)):
+    """
+    One page of tasks, filtered by assignee, status and deadline range
+    (due_after <= deadline < due_before). Follow next_cursor for more;
+    include_total=true adds the count of all matching tasks.
+    """
+    try:
+        result = await firebase_service.aquery_tasks(assignee=assignee, **page)
+        extra = {}
+        if include_total:
+            extra["total"] = await firebase_service.acount_tasks(assignee, page["status"], page["due_after"],
+                                                                 page["due_before"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(_page_chunks(result, **extra), media_type="application/json")
+
+@app.get("/api/tasks/count")
+async def count_tasks(assignee: Optional[str] = None, status: Optional[str] = None, due_after: Optional[str] = None,
+                      due_before: Optional[str] = None):
+    try:
+        return {"count": await firebase_service.acount_tasks(assignee, status, due_after, due_before)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _export_lines(assignee: Optional[str]):
+    for task in firebase_service.iter_tasks(assignee):
+        yield json.dumps(task, default=str) + "\n"
+
+@app.get("/api/tasks/export")
+async def export_tasks(assignee: Optional[str] = None):
+    # A sync generator: Starlette iterates it in a worker thread, so a
+    # Firestore stream never blocks the event loop.
+    return StreamingResponse(_export_lines(assignee), media_type="application/x-ndjson")
 
 @app.delete("/api/tasks/{task_id}")
 async def delete_task(task_id: str):
-    return {"message": firebase_service.delete_task(task_id)}
+    return {"message": await firebase_service.adelete_task(task_id)}
+
+@app.get("/api/tasks/{task_id}/calendar")
+async def get_calendar_sync_status(task_id: str):
+    status = calendar_service.sync_status(task_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"No calendar sync for task {task_id}")
+    return status
+
+@app.post("/api/documents")
+async def upload_document(name: str, request: Request):
+    """
+    Streams the raw request body to Storage as document `name`, chunk by
+    chunk, without buffering the file. Send an X-Upload-Id header to follow
+    the upload at /api/documents/uploads/{upload_id} while it runs.
+    """
+    size = request.headers.get("content-length")
+    try:
+        return await document_service.upload(
+            name,
+            request.stream(),
+            content_type=request.headers.get("content-type", "application/octet-stream"),
+            size=int(size) if size and size.isdigit() else None,
+            upload_id=request.headers.get("x-upload-id"),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+@app.get("/api/documents/uploads/{upload_id}")
+async def get_upload_progress(upload_id: str):
+    progress = document_service.progress(upload_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"No upload {upload_id}")
+    return progress
+
+@app.get("/api/documents/{name:path}")
+async def get_document_link(name: str):
+    try:
+        link = await document_service.link(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if link is None:
+        raise HTTPException(status_code=404, detail=f"Document '{name}' not found")
+    return {"name": name, **link}
 
 @app.get("/api/member/{member_name}")
-async def get_member_details(member_name: str):
-    tasks = firebase_service.get_tasks(member_name)
-    completed_count = len([t for t in tasks if t.get('status') == 'completed'])
-    total_count = len(tasks)
-    
-    return {
-        "name": member_name,
-        "completed_tasks": completed_count,
-        "total_tasks": total_count,
-        "tasks": tasks
-    }
+async def get_member_details(member_name: str, request: Request, page: Dict[str, Any] = Depends(_task_page_args)):
+    async def member_details():
+        try:
+            tasks = await firebase_service.aquery_tasks(assignee=member_name, **page)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        stats = await firebase_service.aget_member_stats(member_name)
+
+        return {
+            "name": member_name,
+            "completed_tasks": stats["completed"],
+            "total_tasks": stats["total"],
+            "stats": stats,
+            "tasks": tasks["tasks"],
+            "next_cursor": tasks["next_cursor"],
+        }
+
+    return await _cached_json(request, member_details)
+
+@app.get("/api/teams/{team_name}/stats")
+async def get_team_stats(team_name: str, request: Request):
+    async def team_stats():
+        stats = await firebase_service.aget_team_stats(team_name)
+        if stats is None:
+            raise HTTPException(status_code=404, detail=f"Team '{team_name}' not found")
+        return stats
+
+    return await _cached_json(request, team_stats)
+
+def _rejected(e: AdmissionRejected) -> JSONResponse:
+    """A real 429/503 for a chat turn that admission control turned away."""
+    metrics.CHAT_ERRORS.inc("rate_limited")
+    return JSONResponse(
+        {"detail": str(e), "reason": e.reason, "queue_depth": e.queue_depth, "retry_after": math.ceil(e.retry_after)},
+        status_code=e.status_code,
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+def _error_response(e: Exception) -> AgentResponse:
+    error_msg = str(e)
+    if isinstance(e, AdmissionRejected):
+        # Streaming responses have already sent their status line
+        metrics.CHAT_ERRORS.inc("rate_limited")
+        return AgentResponse(response=f"Error: The assistant is busy. Please try again in {math.ceil(e.retry_after)} seconds.")
+    if "401" in error_msg or "unauthorized" in error_msg.lower():
+        metrics.CHAT_ERRORS.inc("unauthorized")
+        return AgentResponse(response="Error: Unauthorized. Please check your API Key in the .env file.")
+    if "429" in error_msg or "rate limit" in error_msg.lower():
+        metrics.CHAT_ERRORS.inc("rate_limited")
+        return AgentResponse(response="Error: Rate limit exceeded. Please wait a moment before trying again.")
+    metrics.CHAT_ERRORS.inc("other")
+    print(f"Error processing request: {e}")
+    return AgentResponse(response=f"Sorry, I encountered an error: {str(e)}")
+
+@app.get("/api/stats/cache")
+async def get_cache_stats():
+    return {**read_cache.stats(), "data_version": firebase_service.version}
+
+@app.get("/api/stats/checkpointer")
+async def get_checkpointer_stats():
+    if not hasattr(checkpointer, "stats"):
+        return {"backend": type(checkpointer).__name__}
+    return checkpointer.stats()
+
+@app.get("/api/stats/documents")
+async def get_document_stats():
+    return document_service.stats()
+
+@app.get("/api/stats/llm")
+async def get_llm_stats():
+    return {**llm_admission.stats(), "conversations_active": len(conversation_locks)}
+
+@app.get("/api/stats/replica")
+async def get_replica_stats():
+    return firebase_service.read_freshness()
+
+@app.get("/api/stats/router")
+async def get_router_stats():
+    return router_metrics.snapshot()
+
+@app.get("/api/stats/search")
+async def get_search_stats():
+    return search_service.stats
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def _traced(response: AgentResponse, trace: metrics.RequestTrace, request: UserRequest) -> AgentResponse:
+    """Fills in the tools called, usage and (if asked for) timings collected for this request."""
+    if metrics.enabled:
+        metrics.GRAPH_HOPS.observe(trace.hops)
+    response.actions_taken = list(trace.actions)
+    response.usage = trace.usage()
+    if request.include_timings:
+        response.timings = trace.timings_ms()
+    return response
 
 @app.post("/chat", response_model=AgentResponse)
 async def chat(request: UserRequest):
+    with metrics.trace_request() as trace:
+        try:
+            # Use user_id as thread_id for persistence
+            config = {"configurable": {"thread_id": request.user_id}}
+            inputs = {"messages": [HumanMessage(content=request.query)], "context_stats": {}}
+            
+            # Turns of one conversation run one at a time
+            async with conversation_locks.hold(request.user_id):
+                result = await app_graph.ainvoke(inputs, config=config)
+            
+            last_message = result["messages"][-1]
+            response_text = last_message.content
+            
+            response = AgentResponse(response=response_text, context_stats=result.get("context_stats", {}))
+        except AdmissionRejected as e:
+            return _rejected(e)
+        except Exception as e:
+            response = _error_response(e)
+    return _traced(response, trace, request)
+
+def _ndjson(event: str, **data) -> str:
+    return json.dumps({"event": event, **data}, default=str) + "\n"
+
+async def _stream_chat(request: UserRequest):
+    """
+    Yields NDJSON events while the graph runs:
+    `token` for each LLM token, `tool_start`/`tool_end` around every tool call,
+    and a closing `final` event whose `data` matches AgentResponse.
+    """
+    config = {"configurable": {"thread_id": request.user_id}}
+    inputs = {"messages": [HumanMessage(content=request.query)], "context_stats": {}}
+    with metrics.trace_request() as trace:
+        try:
+            async with conversation_locks.hold(request.user_id):
+                async for event in app_graph.astream_events(inputs, config=config, version="v2"):
+                    kind = event["event"]
+                    if kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if content:
+                            yield _ndjson("token", content=content)
+                    elif kind == "on_tool_start":
+                        yield _ndjson("tool_start", tool=event["name"], input=event["data"].get("input"))
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        yield _ndjson("tool_end", tool=event["name"], output=getattr(output, "content", output))
+
+                state = await app_graph.aget_state(config)
+            response = AgentResponse(response=state.values["messages"][-1].content,
+                                     context_stats=state.values.get("context_stats", {}))
+        except Exception as e:
+            response = _error_response(e)
+    yield _ndjson("final", data=_traced(response, trace, request).model_dump())
+
+@app.post("/chat/stream")
+async def chat_stream(request: UserRequest):
+    # Rejected up front while the status code can still say so
     try:
-        # Use user_id as thread_id for persistence
-        config = {"configurable": {"thread_id": request.user_id}}
-        inputs = {"messages": [HumanMessage(content=request.query)]}
-        
-        result = app_graph.invoke(inputs, config=config)
-        
-        last_message = result["messages"][-1]
-        response_text = last_message.content
-        
-        return AgentResponse(response=response_text)
-    except Exception as e:
-        error_msg = str(e)
-        if "401" in error_msg or "unauthorized" in error_msg.lower():
-            return AgentResponse(response="Error: Unauthorized. Please check your API Key in the .env file.")
-        if "429" in error_msg or "rate limit" in error_msg.lower():
-            return AgentResponse(response="Error: Rate limit exceeded. Please wait a moment before trying again.")
-        print(f"Error processing request: {e}")
-        return AgentResponse(response=f"Sorry, I encountered an error: {str(e)}")
+        llm_admission.check()
+    except AdmissionRejected as e:
+        return _rejected(e)
+    # Starlette cancels the generator when the client disconnects, which also
+    # cancels the in-flight graph run and frees the slot.
+    return StreamingResponse(_stream_chat(request), media_type="application/x-ndjson")
 
 if __name__ == "__main__":
     import uvicorn
@@ -8,6 +8,10 @@ class Task(BaseModel):
     assignee: Optional[str] = None
     status: str = "pending"
     deadline: Optional[str] = None
+    created_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    # One-off reminder times (ISO), on top of the configured lead times
+    reminders: Optional[List[str]] = None
 
 class ProjectState(BaseModel):
     tasks: List[Task] = []
@@ -17,7 +21,26 @@ class ProjectState(BaseModel):
 class UserRequest(BaseModel):
     query: str
     user_id: str
+    # Return per-step timings (graph nodes, tools, service calls) with the response
+    include_timings: bool = False
 
 class AgentResponse(BaseModel):
     response: str
     actions_taken: List[str] = []
+    # Tokens sent to / trimmed from the LLM context during this request
+    context_stats: Dict[str, int] = {}
+    # Graph hops and LLM token usage for this request
+    usage: Dict[str, int] = {}
+    # Milliseconds per step, e.g. "node:agent" or "firebase:get_tasks"; only if requested
+    timings: Optional[Dict[str, float]] = None
+
+class BulkTaskResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkTaskResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkTaskResult]
@@ -1,10 +1,10 @@
 import os.path
-import datetime
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from typing import Optional
+from app.core import metrics
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.lazy import LazySingleton
+from app.services.calendar_outbox import CalendarOutbox, FakeCalendarTransport, GoogleCalendarTransport
+from app.services.firebase import firebase_service
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
@@ -13,12 +13,30 @@ class CalendarService:
         self.service = None
         self.initialized = False
         self._authenticate()
+        # Events are queued here and synced in batches by a background worker
+        transport = GoogleCalendarTransport(self.service) if self.initialized else FakeCalendarTransport()
+        self.outbox = CalendarOutbox(
+            settings.CALENDAR_OUTBOX_PATH,
+            transport,
+            interval=settings.CALENDAR_SYNC_INTERVAL,
+            max_attempts=settings.CALENDAR_SYNC_MAX_ATTEMPTS,
+        )
 
     def _authenticate(self):
         creds = None
         token_path = 'token.json'
         creds_path = 'credentials.json'
 
+        if not os.path.exists(token_path) and not os.path.exists(creds_path):
+            print("Warning: Google Calendar credentials not valid or found. Running in mock mode.")
+            return
+
+        # Imported here so mock mode never pays for the Google API client
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+
         if os.path.exists(token_path):
             try:
                 creds = Credentials.from_authorized_user_file(token_path, SCOPES)
@@ -51,27 +69,29 @@ class CalendarService:
         else:
             print("Warning: Google Calendar credentials not valid or found. Running in mock mode.")
 
-    def create_event(self, summary: str, start_time: str, end_time: str, description: str = "") -> str:
-        if not self.initialized:
-            return f"Mock: Event '{summary}' created in Google Calendar for {start_time}."
+    def enqueue_event(self, task_id: str, summary: str, start_time: str, end_time: str, description: str = "") -> str:
+        with metrics.timed(metrics.SERVICE_SECONDS, "calendar", "enqueue_event"):
+            status = self.outbox.enqueue(task_id, summary, start_time, end_time, description)
+        if status == "skipped":
+            return "Calendar sync skipped: the deadline is not a date/time."
+        mode = "Google Calendar" if self.initialized else "mock calendar"
+        return f"Calendar sync to {mode} queued."
+
+    def sync_status(self, task_id: str):
+        return self.outbox.status(task_id)
+
+    def cancel_event(self, task_id: str) -> bool:
+        """Stops a deleted task's event from being synced."""
+        return self.outbox.cancel(task_id)
+
+    async def aenqueue_event(self, task_id: str, summary: str, start_time: str, end_time: str,
+                             description: str = "") -> str:
+        return await run_blocking(self.enqueue_event, task_id, summary, start_time, end_time, description)
 
-        event = {
-            'summary': summary,
-            'description': description,
-            'start': {
-                'dateTime': start_time, # ISO format '2023-05-28T09:00:00-07:00'
-                'timeZone': 'UTC',
-            },
-            'end': {
-                'dateTime': end_time,
-                'timeZone': 'UTC',
-            },
-        }
+calendar_service: CalendarService = LazySingleton(CalendarService, "calendar_service")
 
-        try:
-            event = self.service.events().insert(calendarId='primary', body=event).execute()
-            return f"Event created: {event.get('htmlLink')}"
-        except Exception as e:
-            return f"Error creating calendar event: {str(e)}"
+def _on_task_event(event, task):
+    if event == "task_deleted":
+        calendar_service.cancel_event(task["id"])
 
-calendar_service = CalendarService()
+firebase_service.on_load(lambda service: service.add_listener(_on_task_event))
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.core import metrics
+from app.core.dates import parse_deadline
+
+# Google Calendar accepts at most 50 calls per batch request
+BATCH_SIZE = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calendar_outbox (
+    task_id TEXT PRIMARY KEY,
+    event_id TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    html_link TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calendar_outbox_due ON calendar_outbox (status, next_attempt_at);
+"""
+
+def event_id_for(task_id: str, revision: int) -> str:
+    """
+    Calendar event ID for a revision of a task's event. Retries and
+    re-enqueues of the same event reuse it, and Google rejects a second insert
+    with the same ID (409), which makes them idempotent. IDs must use
+    base32hex characters, which hex digits satisfy.
+    """
+    return hashlib.sha256(f"trackup:{task_id}:{revision}".encode()).hexdigest()
+
+class CalendarTransport:
+    """Sends a batch of event inserts and reports a result per event ID."""
+
+    def insert_batch(self, events: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns {event_id: {"ok": True, "html_link": ...}} on success or
+        {event_id: {"ok": False, "retryable": bool, "error": str}} on failure.
+        """
+        raise NotImplementedError
+
+class GoogleCalendarTransport(CalendarTransport):
+    """Inserts events with the Calendar API's batch HTTP requests."""
+
+    def __init__(self, service, calendar_id: str = "primary"):
+        self.service = service
+        self.calendar_id = calendar_id
+
+    def insert_batch(self, events: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                results[request_id] = {"ok": True, "html_link": response.get("htmlLink")}
+                return
+            status = getattr(getattr(exception, "resp", None), "status", None)
+            if status == 409:
+                # Already created by an earlier attempt
+                results[request_id] = {"ok": True, "html_link": None}
+            else:
+                retryable = status is None or status == 429 or status >= 500
+                results[request_id] = {"ok": False, "retryable": retryable, "error": str(exception)}
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for event in events:
+            batch.add(self.service.events().insert(calendarId=self.calendar_id, body=event), request_id=event["id"])
+        try:
+            batch.execute()
+        except Exception as e:
+            for event in events:
+                results.setdefault(event["id"], {"ok": False, "retryable": True, "error": str(e)})
+        return results
+
+class FakeCalendarTransport(CalendarTransport):
+    """
+    Offline transport used in mock mode and tests. Stores events by ID, so
+    repeated inserts are idempotent, and can be told to fail.
+    """
+
+    def __init__(self):
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.batches: List[List[str]] = []
+        # event_id -> list of failures to return before succeeding
+        self.failures: Dict[str, List[Dict[str, Any]]] = {}
+
+    def insert_batch(self, events: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        self.batches.append([e["id"] for e in events])
+        results = {}
+        for event in events:
+            pending = self.failures.get(event["id"])
+            if pending:
+                results[event["id"]] = {"ok": False, **pending.pop(0)}
+                continue
+            self.events.setdefault(event["id"], event)
+            results[event["id"]] = {"ok": True, "html_link": f"https://calendar.local/event?eid={event['id']}"}
+        return results
+
+class CalendarOutbox:
+    """
+    Durable queue of calendar events waiting to be synced.
+
+    Events are written to SQLite when a task is stored and a background worker
+    flushes due entries in batches, retrying transient failures with jittered
+    exponential backoff. Each task's status is one of pending, synced, failed
+    or skipped.
+    """
+
+    def __init__(self, db_path: str, transport: CalendarTransport, interval: float = 5.0,
+                 max_attempts: int = 8, base_backoff: float = 2.0, max_backoff: float = 600.0):
+        self.transport = transport
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        if "revision" not in {column[1] for column in self._db.execute("PRAGMA table_info(calendar_outbox)")}:
+            # Outboxes created before event IDs were derived from a revision
+            self._db.execute("ALTER TABLE calendar_outbox ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def enqueue(self, task_id: str, summary: str, start_time: str, end_time: str, description: str = "") -> str:
+        """
+        Queues the event for a task, replacing any earlier entry with a
+        different event. Re-enqueueing an unchanged event keeps its ID, so it
+        is never created twice. Returns the sync status.
+        """
+        start = _rfc3339(start_time)
+        end = _rfc3339(end_time) or start
+        event = {
+            "summary": summary,
+            "description": description,
+            "start": {"dateTime": start, "timeZone": "UTC"},
+            "end": {"dateTime": end, "timeZone": "UTC"},
+        }
+        status, error = ("pending", None) if start else ("skipped", f"Deadline '{start_time}' is not a date/time")
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT revision, body, status FROM calendar_outbox WHERE task_id = ?", (task_id,)).fetchone()
+            revision = 0
+            if row is not None:
+                previous = json.loads(row[1])
+                previous.pop("id")
+                if previous != event:
+                    revision = row[0] + 1
+                elif row[2] in ("pending", "synced"):
+                    return row[2]
+                else:
+                    revision = row[0]
+            body = {"id": event_id_for(task_id, revision), **event}
+            self._db.execute(
+                "INSERT OR REPLACE INTO calendar_outbox "
+                "(task_id, event_id, revision, body, status, next_attempt_at, last_error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, body["id"], revision, json.dumps(body), status, now, error, now),
+            )
+        if status == "pending":
+            self._wake.set()
+        return status
+
+    def cancel(self, task_id: str) -> bool:
+        """Drops a queued event that has not been synced yet."""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "DELETE FROM calendar_outbox WHERE task_id = ? AND status = 'pending'", (task_id,))
+        return cursor.rowcount > 0
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, attempts, last_error, html_link FROM calendar_outbox WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"task_id": task_id, "status": row[0], "attempts": row[1], "last_error": row[2], "html_link": row[3]}
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM calendar_outbox GROUP BY status"))
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """Sends every due event, one batch request per BATCH_SIZE events. Returns how many were sent."""
+        sent = 0
+        while True:
+            sent_batch = self._flush_batch(now or time.time())
+            sent += sent_batch
+            if sent_batch < BATCH_SIZE:
+                return sent
+
+    def _flush_batch(self, now: float) -> int:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT task_id, body, attempts FROM calendar_outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (now, BATCH_SIZE),
+            ).fetchall()
+        if not rows:
+            return 0
+
+        events = {task_id: json.loads(body) for task_id, body, _ in rows}
+        try:
+            with metrics.timed(metrics.SERVICE_SECONDS, "calendar", "insert_batch"):
+                results = self.transport.insert_batch(list(events.values()))
+        except Exception as e:
+            results = {}
+            print(f"Error syncing calendar batch: {e}")
+
+        updated_at = time.time()
+        with self._lock, self._db:
+            # Entries replaced or cancelled while the batch was in flight are left alone
+            for task_id, body, attempts in rows:
+                result = results.get(events[task_id]["id"]) or {"ok": False, "retryable": True, "error": "No response"}
+                attempts += 1
+                if result["ok"]:
+                    self._db.execute(
+                        "UPDATE calendar_outbox SET status = 'synced', attempts = ?, html_link = ?, last_error = NULL, "
+                        "updated_at = ? WHERE task_id = ? AND body = ?",
+                        (attempts, result.get("html_link"), updated_at, task_id, body))
+                else:
+                    failed = not result.get("retryable") or attempts >= self.max_attempts
+                    self._db.execute(
+                        "UPDATE calendar_outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, "
+                        "updated_at = ? WHERE task_id = ? AND body = ?",
+                        ("failed" if failed else "pending", attempts, result.get("error"),
+                         now + self._backoff(attempts), updated_at, task_id, body))
+        return len(rows)
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.base_backoff * 2 ** (attempts - 1), self.max_backoff)
+        return delay * random.uniform(0.5, 1.0)
+
+    # --- Background worker ---
+
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="calendar-outbox", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._worker:
+            self._worker.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing calendar outbox: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+def _rfc3339(value: str) -> Optional[str]:
+    parsed = parse_deadline(value)
+    return parsed.isoformat() if parsed else None
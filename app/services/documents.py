@@ -0,0 +1,364 @@
+import asyncio
+import datetime
+import hashlib
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+from app.core import metrics
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.lazy import LazySingleton
+from app.services.firebase import firebase_service
+
+# Resumable upload chunks must be a multiple of 256 KiB (except the last one)
+CHUNK_ALIGNMENT = 256 * 1024
+# Storage answers worth retrying: timeout, rate limited, or a transient server failure
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# Finished uploads kept for the progress endpoint
+FINISHED_UPLOADS_KEPT = 100
+
+class StorageError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+class StorageTransport:
+    """
+    Moves document bytes to an object store through resumable upload
+    sessions: a session is opened per object, chunks are sent in order, and
+    the bytes committed so far can be asked for after a failure.
+    """
+
+    def start_upload(self, name: str, content_type: str) -> str:
+        """Opens a resumable upload session for `name` and returns its handle."""
+        raise NotImplementedError
+
+    def upload_chunk(self, session: str, data: bytes, offset: int, total: Optional[int]) -> Optional[int]:
+        """
+        Sends `data` starting at byte `offset`; `total` is set on the last
+        chunk. Returns the bytes committed so far (possibly fewer than sent),
+        or None once the object is complete. Raises StorageError.
+        """
+        raise NotImplementedError
+
+    def committed(self, session: str) -> Optional[int]:
+        """Bytes the session has committed, or None if the object is complete."""
+        raise NotImplementedError
+
+    def cancel(self, session: str):
+        raise NotImplementedError
+
+    def exists(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def signed_url(self, name: str, expires_in: int) -> str:
+        """A URL that lets anyone holding it GET `name` for `expires_in` seconds."""
+        raise NotImplementedError
+
+class GCSStorageTransport(StorageTransport):
+    """
+    Cloud Storage (Firebase Storage) through the JSON API's resumable upload
+    protocol: each chunk is a PUT with a Content-Range to the session URL,
+    answered with 308 and the committed Range until the last one completes
+    the object.
+    """
+
+    def __init__(self, bucket, http: Optional[httpx.Client] = None):
+        self.bucket = bucket
+        # The session URL carries its own authorization
+        self.http = http or httpx.Client(timeout=httpx.Timeout(60.0, connect=10.0))
+
+    def start_upload(self, name: str, content_type: str) -> str:
+        return self.bucket.blob(name).create_resumable_upload_session(content_type=content_type)
+
+    def upload_chunk(self, session: str, data: bytes, offset: int, total: Optional[int]) -> Optional[int]:
+        size = "*" if total is None else str(total)
+        content_range = f"bytes {offset}-{offset + len(data) - 1}/{size}" if data else f"bytes */{size}"
+        return self._committed(self._put(session, data, content_range))
+
+    def committed(self, session: str) -> Optional[int]:
+        return self._committed(self._put(session, b"", "bytes */*"))
+
+    def cancel(self, session: str):
+        try:
+            self.http.delete(session)
+        except httpx.HTTPError:
+            pass
+
+    def exists(self, name: str) -> bool:
+        return self.bucket.blob(name).exists()
+
+    def signed_url(self, name: str, expires_in: int) -> str:
+        return self.bucket.blob(name).generate_signed_url(
+            version="v4", expiration=datetime.timedelta(seconds=expires_in), method="GET")
+
+    def _put(self, session: str, data: bytes, content_range: str) -> httpx.Response:
+        request = self.http.build_request("PUT", session, headers={"Content-Range": content_range,
+                                                                   "Content-Length": str(len(data))})
+        request.stream = _ChunkStream(data)
+        try:
+            return self.http.send(request)
+        except httpx.HTTPError as e:
+            raise StorageError(f"Storage upload failed: {e}", retryable=True)
+
+    def _committed(self, response: httpx.Response) -> Optional[int]:
+        if response.status_code in (200, 201):
+            return None
+        if response.status_code == 308:
+            # "bytes=0-N" once anything is committed; absent before the first byte
+            committed = response.headers.get("range")
+            return int(committed.rsplit("-", 1)[1]) + 1 if committed else 0
+        raise StorageError(f"Storage upload failed with {response.status_code}: {response.text[:200]}",
+                           status=response.status_code, retryable=response.status_code in RETRYABLE_STATUSES)
+
+class _ChunkStream(httpx.SyncByteStream):
+    """
+    A request body that lets go of its chunk once sent. httpx requests and
+    responses refer to each other, so a plain `content=` body would stay
+    alive until the cycle collector runs, several chunks later.
+    """
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def __iter__(self):
+        data, self._data = self._data, b""
+        yield data
+
+class FakeStorageTransport(StorageTransport):
+    """
+    Offline transport used in mock mode and tests. Objects keep only their
+    size and MD5, so uploads of any size cost no memory, and chunk uploads
+    can be told to fail or to commit only part of what was sent.
+    """
+
+    def __init__(self):
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        # Applied to the next chunk uploads, in order: {"status": 503} fails the
+        # chunk, {"commit": n} commits only its first n bytes
+        self.failures: List[Dict[str, Any]] = []
+        self.chunks: List[int] = []
+        self.signed: List[str] = []
+
+    def start_upload(self, name: str, content_type: str) -> str:
+        session = uuid.uuid4().hex
+        self.sessions[session] = {"name": name, "content_type": content_type, "size": 0, "md5": hashlib.md5()}
+        return session
+
+    def upload_chunk(self, session: str, data: bytes, offset: int, total: Optional[int]) -> Optional[int]:
+        state = self.sessions.get(session)
+        if state is None:
+            if any(o["session"] == session for o in self.objects.values()):
+                return None
+            raise StorageError(f"Unknown upload session {session}", status=404)
+        if offset != state["size"]:
+            raise StorageError(f"Chunk at {offset} but {state['size']} bytes committed", status=400)
+        failure = self.failures.pop(0) if self.failures else {}
+        if "status" in failure:
+            raise StorageError(f"Storage upload failed with {failure['status']}", status=failure["status"],
+                               retryable=failure["status"] in RETRYABLE_STATUSES)
+        data = data[:failure["commit"]] if "commit" in failure else data
+        state["md5"].update(data)
+        state["size"] += len(data)
+        self.chunks.append(len(data))
+        if total is not None and state["size"] == total:
+            del self.sessions[session]
+            self.objects[state["name"]] = {"size": total, "md5": state["md5"].hexdigest(),
+                                           "content_type": state["content_type"], "session": session}
+            return None
+        return state["size"]
+
+    def committed(self, session: str) -> Optional[int]:
+        state = self.sessions.get(session)
+        return state["size"] if state else None
+
+    def cancel(self, session: str):
+        self.sessions.pop(session, None)
+
+    def exists(self, name: str) -> bool:
+        return name in self.objects
+
+    def signed_url(self, name: str, expires_in: int) -> str:
+        expires = int(time.time()) + expires_in
+        signature = hashlib.sha256(f"{name}:{expires}:{uuid.uuid4()}".encode()).hexdigest()[:32]
+        self.signed.append(name)
+        return f"https://storage.local/{name}?expires={expires}&signature={signature}"
+
+class DocumentService:
+    """
+    Streams uploaded documents to Storage and hands out signed links to them.
+
+    An upload is read from the request in `chunk_size` pieces. Each piece is
+    queued for a background sender that PUTs it to the resumable session on
+    the I/O pool, while the next pieces are read from the client, so
+    receiving and sending overlap. At most `max_pending_chunks` pieces wait
+    in the queue, which bounds memory at a few chunks whatever the file
+    size. A chunk that fails is resumed from the offset Storage reports as
+    committed, with jittered backoff, up to `max_retries` times.
+
+    Signed links last `url_ttl` seconds and are reused until fewer than
+    `url_min_validity` seconds remain.
+    """
+
+    def __init__(self, transport: StorageTransport, chunk_size: int = 8 * 1024 * 1024,
+                 max_pending_chunks: int = 2, max_retries: int = 5, retry_delay: float = 0.5,
+                 url_ttl: int = 3600, url_min_validity: int = 600, prefix: str = "documents/"):
+        self.transport = transport
+        self.chunk_size = max(CHUNK_ALIGNMENT, -(-chunk_size // CHUNK_ALIGNMENT) * CHUNK_ALIGNMENT)
+        self.max_pending_chunks = max(1, max_pending_chunks)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.url_ttl = url_ttl
+        self.url_min_validity = min(url_min_validity, url_ttl // 2)
+        self.prefix = prefix
+        self.uploads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # name -> (signed URL, monotonic time it expires)
+        self._urls: Dict[str, Tuple[str, float]] = {}
+        self.url_hits = 0
+        self.url_misses = 0
+
+    def progress(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            return None
+        elapsed = (upload["finished_at"] or time.monotonic()) - upload["started_at"]
+        return {
+            **{k: v for k, v in upload.items() if k not in ("started_at", "finished_at")},
+            "seconds": round(elapsed, 3),
+            "percent": round(100 * upload["uploaded"] / upload["size"], 1) if upload["size"] else None,
+        }
+
+    async def upload(self, name: str, body: AsyncIterator[bytes], content_type: str = "application/octet-stream",
+                     size: Optional[int] = None, upload_id: Optional[str] = None) -> Dict[str, Any]:
+        """Streams `body` to the document `name` and returns the finished upload's progress record."""
+        _check_name(name)
+        upload_id = upload_id or uuid.uuid4().hex
+        if upload_id in self.uploads and self.uploads[upload_id]["state"] == "uploading":
+            raise ValueError(f"Upload {upload_id} is already running")
+        upload = self._track(upload_id, name, size)
+        session = await run_blocking(self.transport.start_upload, self.prefix + name, content_type)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_chunks)
+        sender = asyncio.ensure_future(self._send_chunks(session, queue, upload))
+        try:
+            buffer = bytearray()
+            async for piece in body:
+                buffer += piece
+                upload["received"] += len(piece)
+                # Hold back at least one byte, so the final chunk always carries the total
+                while len(buffer) > self.chunk_size:
+                    with memoryview(buffer) as view:
+                        chunk = bytes(view[:self.chunk_size])
+                    del buffer[:self.chunk_size]
+                    await self._queue(queue, (chunk, None), sender)
+            await self._queue(queue, (bytes(buffer), upload["received"]), sender)
+            del buffer
+            await sender
+        except BaseException as e:
+            sender.cancel()
+            upload.update(state="failed", error=str(e) or type(e).__name__, finished_at=time.monotonic())
+            await run_blocking(self.transport.cancel, session)
+            raise
+        upload.update(state="complete", size=upload["received"], finished_at=time.monotonic())
+        return self.progress(upload_id)
+
+    async def link(self, name: str) -> Optional[Dict[str, Any]]:
+        """A signed link to the document `name` as {"url", "expires_in"}, or None if it does not exist."""
+        _check_name(name)
+        now = time.monotonic()
+        cached = self._urls.get(name)
+        if cached and cached[1] - now >= self.url_min_validity:
+            self.url_hits += 1
+            return {"url": cached[0], "expires_in": int(cached[1] - now)}
+        self.url_misses += 1
+        with metrics.timed(metrics.SERVICE_SECONDS, "storage", "signed_url"):
+            if not await run_blocking(self.transport.exists, self.prefix + name):
+                return None
+            url = await run_blocking(self.transport.signed_url, self.prefix + name, self.url_ttl)
+        self._urls = {k: v for k, v in self._urls.items() if v[1] > now}
+        self._urls[name] = (url, now + self.url_ttl)
+        return {"url": url, "expires_in": self.url_ttl}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uploads_active": sum(1 for u in self.uploads.values() if u["state"] == "uploading"),
+            "signed_urls_cached": len(self._urls),
+            "signed_url_hits": self.url_hits,
+            "signed_url_misses": self.url_misses,
+        }
+
+    def _track(self, upload_id: str, name: str, size: Optional[int]) -> Dict[str, Any]:
+        finished = [k for k, u in self.uploads.items() if u["state"] != "uploading"]
+        for key in finished[:max(0, len(finished) - FINISHED_UPLOADS_KEPT + 1)]:
+            del self.uploads[key]
+        upload = self.uploads[upload_id] = {
+            "id": upload_id, "name": name, "state": "uploading", "size": size, "received": 0,
+            "uploaded": 0, "chunks": 0, "retries": 0, "error": None,
+            "started_at": time.monotonic(), "finished_at": None,
+        }
+        return upload
+
+    async def _queue(self, queue: asyncio.Queue, item, sender: asyncio.Future):
+        # Wait for room in the queue, unless the sender has failed meanwhile
+        put = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait({put, sender}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            sender.result()
+
+    async def _send_chunks(self, session: str, queue: asyncio.Queue, upload: Dict[str, Any]):
+        offset = 0
+        while True:
+            chunk, total = await queue.get()
+            with metrics.timed(metrics.SERVICE_SECONDS, "storage", "upload_chunk"):
+                await self._send_chunk(session, chunk, offset, total, upload)
+            offset += len(chunk)
+            upload["uploaded"] = offset
+            upload["chunks"] += 1
+            if total is not None:
+                return
+
+    async def _send_chunk(self, session: str, chunk: bytes, offset: int, total: Optional[int],
+                          upload: Dict[str, Any]):
+        # Each request runs on the I/O pool; backoff waits here on the event
+        # loop, so failing uploads do not hold pool threads while they sleep
+        end = offset + len(chunk)
+        data, start = chunk, offset
+        attempt = 0
+        while True:
+            try:
+                committed = await run_blocking(self.transport.upload_chunk, session, data, start, total)
+            except StorageError as e:
+                attempt += 1
+                if not e.retryable or attempt > self.max_retries:
+                    raise
+                upload["retries"] += 1
+                await asyncio.sleep(min(30.0, self.retry_delay * 2 ** (attempt - 1)) * random.uniform(1.0, 1.2))
+                committed = await run_blocking(self.transport.committed, session)
+            if committed is None or (committed >= end and total is None):
+                return
+            # Resume from what Storage actually kept
+            data, start = chunk[committed - offset:], committed
+
+def _check_name(name: str):
+    if not name or len(name) > 512 or name.startswith("/") or ".." in name.split("/") or "\\" in name \
+            or any(ord(c) < 32 for c in name):
+        raise ValueError(f"Invalid document name: {name!r}")
+
+def _build_document_service() -> DocumentService:
+    firebase = firebase_service.load()
+    transport = GCSStorageTransport(firebase.bucket) if firebase.initialized else FakeStorageTransport()
+    return DocumentService(
+        transport,
+        chunk_size=settings.DOCUMENT_CHUNK_SIZE,
+        max_pending_chunks=settings.DOCUMENT_MAX_PENDING_CHUNKS,
+        max_retries=settings.DOCUMENT_UPLOAD_RETRIES,
+        url_ttl=settings.DOCUMENT_URL_TTL,
+        url_min_validity=settings.DOCUMENT_URL_MIN_VALIDITY,
+    )
+
+document_service: DocumentService = LazySingleton(_build_document_service, "document_service")
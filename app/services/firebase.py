@@ -1,24 +1,65 @@
-import firebase_admin
-from firebase_admin import credentials, firestore, storage
+import base64
+import datetime
+import itertools
+import json
 import os
-from typing import List, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence
+from app.core import metrics
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.core.dates import parse_deadline
+from app.core.lazy import LazySingleton
+from app.services.journal import JournaledStore
+from app.services.replica import FirestoreReplica
+from app.services.shared_store import SharedStore
+from app.services.stats import StatsStore
+from app.services.store import MemoryStore
+
+# Firestore caps the number of values in an `in` filter
+FIRESTORE_IN_LIMIT = 30
+# Firestore caps the number of writes in one batch commit
+FIRESTORE_BATCH_LIMIT = 500
 
 class FirebaseService:
     def __init__(self):
         self.db = None
         self.bucket = None
         self.initialized = False
-        # Mock DB structure: { "teams": { "Team A": ["Alice", "Bob"] }, "tasks": [] }
-        self.mock_db = {
-            "teams": {},
-            "tasks": []
-        }
+        # Indexed in-process store used when Firebase is not configured
+        self.store: MemoryStore = MemoryStore()
+        # Snapshot-listener mirror of Firestore serving reads (FIRESTORE_READ_REPLICA)
+        self.replica: Optional[FirestoreReplica] = None
+        # Callbacks notified as callback(event, task) after every task write
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        # Per-member/per-team counters, updated on every write. Firestore data
+        # that predates this process is replayed into it on first read. Only
+        # read while they see every write (see _current_stats).
+        self.stats = StatsStore()
+        self._stats_loaded = False
+        self._stats_lock = threading.Lock()
+        # Bumped after every team/task write this process applies (see data_version)
+        self.version = 0
+        self._versions = itertools.count(1)
         self._initialize()
+        if not self.initialized and settings.SHARED_STATE:
+            self.store = SharedStore(settings.SHARED_STATE_PATH, poll_interval=settings.SHARED_STATE_POLL_INTERVAL)
+            self.store.on_change = self._on_shared_change
+            print(f"Offline store shared through {settings.SHARED_STATE_PATH} ({len(self.store.tasks)} tasks).")
+        elif not self.initialized and settings.MOCK_STORE_DIR:
+            self.store = JournaledStore(settings.MOCK_STORE_DIR, fsync_interval=settings.MOCK_STORE_FSYNC_INTERVAL,
+                                        snapshot_every=settings.MOCK_STORE_SNAPSHOT_EVERY)
+            print(f"Offline store recovered {len(self.store.tasks)} tasks from {settings.MOCK_STORE_DIR} "
+                  f"in {self.store.recovery['seconds']}s.")
 
     def _initialize(self):
         try:
             cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH", "serviceAccountKey.json")
             if os.path.exists(cred_path):
+                # Imported here so mock mode never pays for the Firebase SDK
+                import firebase_admin
+                from firebase_admin import credentials, firestore, storage
                 cred = credentials.Certificate(cred_path)
                 firebase_admin.initialize_app(cred, {
                     'storageBucket': os.getenv("FIREBASE_STORAGE_BUCKET", "your-app.appspot.com")
@@ -27,108 +68,738 @@ class FirebaseService:
                 self.bucket = storage.bucket()
                 self.initialized = True
                 print("Firebase initialized successfully.")
+                if settings.FIRESTORE_BACKFILL_ASSIGNEE_KEYS:
+                    self._backfill_on_startup()
+                if settings.FIRESTORE_READ_REPLICA:
+                    self.start_replica()
             else:
                 print(f"Warning: Firebase credentials not found at {cred_path}. Running in mock mode.")
         except Exception as e:
             print(f"Error initializing Firebase: {e}")
 
+    def _backfill_on_startup(self):
+        # Assignee queries filter on assignee_key; tasks without it would drop out of every per-user view
+        try:
+            updated = self.backfill_assignee_keys()
+            if updated:
+                print(f"Added assignee_key to {updated} Firestore tasks.")
+        except Exception as e:
+            print(f"Error backfilling assignee keys: {e}")
+
+    def start_replica(self):
+        """Mirrors teams and tasks locally; reads switch to the mirror once it has synced."""
+        self.replica = FirestoreReplica(self.db, on_task_change=self._notify, on_team_change=self._team_changed)
+        self.replica.start()
+
+    def close(self):
+        if self.replica:
+            self.replica.stop()
+        if isinstance(self.store, (JournaledStore, SharedStore)):
+            self.store.close()
+
+    def read_freshness(self) -> Dict[str, Any]:
+        """Where reads are served from right now and how current that source is."""
+        if not self.initialized:
+            return {"source": "shared" if isinstance(self.store, SharedStore) else "mock"}
+        if self.replica is None:
+            return {"source": "firestore"}
+        return self.replica.freshness()
+
+    @contextmanager
+    def _local_store(self):
+        """
+        Yields the store that can answer reads without a Firestore round trip:
+        the mock store (caught up with other workers when shared), the synced
+        replica (locked against snapshot updates), or None when reads must go
+        to Firestore.
+        """
+        if not self.initialized and isinstance(self.store, SharedStore):
+            with self.store.synced():
+                yield self.store
+        elif not self.initialized:
+            yield self.store
+        elif self.replica is not None and self.replica.ready:
+            with self.replica.lock:
+                yield self.replica.store
+        else:
+            yield None
+
+    def data_version(self) -> Optional[int]:
+        """
+        The write counter reads can be cached against: it moves after every
+        team/task write, this process's or (through the shared store or the
+        replica) another's. None while writes could land unseen, i.e. when
+        reads go straight to Firestore.
+        """
+        if self.initialized and not (self.replica is not None and self.replica.ready):
+            return None
+        if isinstance(self.store, SharedStore):
+            self.store.catch_up()
+        return self.version
+
+    def _changed(self):
+        self.version = next(self._versions)
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        self._listeners.append(callback)
+
+    def _notify(self, event: str, task: Dict[str, Any]):
+        if event == "task_deleted":
+            self.stats.remove_task(task["id"])
+        else:
+            self.stats.upsert_task(task)
+        # Moved only once the stats are current, so a read racing the write
+        # caches what it computed under the old version
+        self._changed()
+        for callback in self._listeners:
+            try:
+                callback(event, task)
+            except Exception as e:
+                print(f"Error in {event} listener: {e}")
+
+    def _on_shared_change(self, op: str, args: tuple, result: Any):
+        """Applies another worker's write to this process's stats and listeners."""
+        if op == "add_task":
+            self._notify("task_added", result)
+        elif op == "update_task" and result is not None:
+            self._notify("task_updated", result)
+        elif op == "delete_task" and result is not None:
+            self._notify("task_deleted", result)
+        elif op == "create_team" and result:
+            self._team_changed("add_team", *args)
+        elif op == "delete_team" and result:
+            self._team_changed("remove_team", *args)
+        elif op == "add_member" and result:
+            self._team_changed("add_member", *args)
+        elif op == "remove_member" and result:
+            self._team_changed("remove_member", *args)
+        elif op == "reload":
+            with self._stats_lock:
+                self.stats = StatsStore()
+                self._stats_loaded = False
+            self._changed()
+
+    def _team_changed(self, op: str, *args):
+        # Called once the change is readable (e.g. applied to the replica), so
+        # a read racing the write caches what it computed under the old version
+        getattr(self.stats, op)(*args)
+        self._changed()
+
     def create_team(self, team_name: str) -> str:
         if not self.initialized:
-            if team_name in self.mock_db["teams"]:
+            if not self.store.create_team(team_name):
                 return f"Team '{team_name}' already exists."
-            self.mock_db["teams"][team_name] = []
+            self._team_changed("add_team", team_name)
             return f"Team '{team_name}' created successfully."
-        # Real implementation would go here
-        return "Firebase create_team not implemented yet."
+
+        try:
+            ref = self.db.collection('teams').document(team_name)
+            if ref.get().exists:
+                return f"Team '{team_name}' already exists."
+            ref.set({'members': []})
+            if self.replica:
+                self.replica.apply_team(team_name, [])
+            self._team_changed("add_team", team_name)
+            return f"Team '{team_name}' created successfully."
+        except Exception as e:
+            return f"Error creating team: {str(e)}"
 
     def add_member(self, team_name: str, user_name: str) -> str:
         if not self.initialized:
-            if team_name not in self.mock_db["teams"]:
+            if not self.store.add_member(team_name, user_name):
+                # Checked after the write, which sees every worker's changes when the store is shared
+                if team_name not in self.store.teams:
+                    return f"Team '{team_name}' does not exist."
+                return f"User '{user_name}' is already in team '{team_name}'."
+            self._team_changed("add_member", team_name, user_name)
+            return f"User '{user_name}' added to team '{team_name}'."
+
+        try:
+            from firebase_admin import firestore
+            ref = self.db.collection('teams').document(team_name)
+            doc = ref.get()
+            if not doc.exists:
                 return f"Team '{team_name}' does not exist."
-            if user_name in self.mock_db["teams"][team_name]:
+            members = doc.to_dict().get('members', [])
+            if user_name in members:
                 return f"User '{user_name}' is already in team '{team_name}'."
-            self.mock_db["teams"][team_name].append(user_name)
+            ref.update({'members': firestore.ArrayUnion([user_name])})
+            if self.replica:
+                self.replica.apply_team(team_name, members + [user_name])
+            self._team_changed("add_member", team_name, user_name)
             return f"User '{user_name}' added to team '{team_name}'."
-        # Real implementation would go here
-        return "Firebase add_member not implemented yet."
+        except Exception as e:
+            return f"Error adding member: {str(e)}"
 
     def delete_team(self, team_name: str) -> str:
         if not self.initialized:
-            if team_name in self.mock_db["teams"]:
-                del self.mock_db["teams"][team_name]
+            if self.store.delete_team(team_name):
+                self._team_changed("remove_team", team_name)
                 return f"Team '{team_name}' deleted."
             return f"Team '{team_name}' not found."
-        return "Firebase delete_team not implemented yet."
+
+        try:
+            ref = self.db.collection('teams').document(team_name)
+            if not ref.get().exists:
+                return f"Team '{team_name}' not found."
+            ref.delete()
+            if self.replica:
+                self.replica.remove_team(team_name)
+            self._team_changed("remove_team", team_name)
+            return f"Team '{team_name}' deleted."
+        except Exception as e:
+            return f"Error deleting team: {str(e)}"
 
     def remove_member(self, team_name: str, user_name: str) -> str:
         if not self.initialized:
-            if team_name in self.mock_db["teams"]:
-                if user_name in self.mock_db["teams"][team_name]:
-                    self.mock_db["teams"][team_name].remove(user_name)
-                    return f"User '{user_name}' removed from '{team_name}'."
+            if self.store.remove_member(team_name, user_name):
+                self._team_changed("remove_member", team_name, user_name)
+                return f"User '{user_name}' removed from '{team_name}'."
             return "Member or team not found."
-        return "Firebase remove_member not implemented yet."
+
+        try:
+            from firebase_admin import firestore
+            ref = self.db.collection('teams').document(team_name)
+            doc = ref.get()
+            members = doc.to_dict().get('members', []) if doc.exists else []
+            if user_name not in members:
+                return "Member or team not found."
+            ref.update({'members': firestore.ArrayRemove([user_name])})
+            if self.replica:
+                self.replica.apply_team(team_name, [m for m in members if m != user_name])
+            self._team_changed("remove_member", team_name, user_name)
+            return f"User '{user_name}' removed from '{team_name}'."
+        except Exception as e:
+            return f"Error removing member: {str(e)}"
 
     def get_all_teams(self) -> Dict[str, List[str]]:
-        if not self.initialized:
-            return self.mock_db["teams"]
-        # Real implementation would go here
-        return {}
+        with self._local_store() as store:
+            if store is not None:
+                return store.get_teams()
+
+        try:
+            return {doc.id: doc.to_dict().get('members', []) for doc in self.db.collection('teams').stream()}
+        except Exception as e:
+            print(f"Error fetching teams: {e}")
+            return {}
+
+    def get_team_members(self, team_name: str) -> Optional[List[str]]:
+        """Returns the members of a team, or None if the team does not exist."""
+        with self._local_store() as store:
+            if store is not None:
+                return store.get_members(team_name)
+
+        try:
+            doc = self.db.collection('teams').document(team_name).get()
+            return doc.to_dict().get('members', []) if doc.exists else None
+        except Exception as e:
+            print(f"Error fetching team: {e}")
+            return None
+
+    def get_tasks_for_members(self, members: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetches the tasks of the given members only, grouped by member.
+        Firestore is queried with `assignee_key in [...]` batches instead of
+        streaming the whole collection.
+        """
+        grouped = {member: [] for member in members}
+        with self._local_store() as store:
+            if store is not None:
+                for member in members:
+                    grouped[member] = store.tasks_for(member)
+                return grouped
+
+        try:
+            from firebase_admin import firestore
+            tasks_ref = self.db.collection('tasks')
+            # Assignees match case-insensitively, as in the mock store and the replica
+            by_key: Dict[str, List[str]] = {}
+            for member in members:
+                by_key.setdefault(_assignee_key(member), []).append(member)
+            keys = list(by_key)
+            for i in range(0, len(keys), FIRESTORE_IN_LIMIT):
+                chunk = keys[i:i + FIRESTORE_IN_LIMIT]
+                query = tasks_ref.where(filter=firestore.FieldFilter('assignee_key', 'in', chunk))
+                for doc in query.stream():
+                    task = _task_from_doc(doc)
+                    for member in by_key.get(_assignee_key(task.get('assignee')), ()):
+                        grouped[member].append(task)
+        except Exception as e:
+            print(f"Error fetching team tasks: {e}")
+        return grouped
 
     def add_task(self, task_data: Dict[str, Any]) -> str:
+        task_data.setdefault("created_at", _now())
         if not self.initialized:
-            task_data["id"] = f"mock_{len(self.mock_db['tasks']) + 1}"
-            self.mock_db["tasks"].append(task_data)
+            self.store.add_task(task_data)
+            self._notify("task_added", task_data)
             return f"Task '{task_data.get('title')}' added with ID: {task_data['id']}"
         
         try:
-            doc_ref = self.db.collection('tasks').add(task_data)
+            doc_ref = self.db.collection('tasks').add(_task_document(task_data))
+            task_data["id"] = doc_ref[1].id
+            if self.replica:
+                self.replica.apply_task(dict(task_data))
+            self._notify("task_added", task_data)
             return f"Task added with ID: {doc_ref[1].id}"
         except Exception as e:
             return f"Error adding task: {str(e)}"
 
+    def add_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Stores many validated tasks at once and returns one result per task, in
+        order: {"ok": True, "id": ...} or {"ok": False, "error": ...}. Tasks that
+        carry an ID replace the stored task with that ID. In Firestore the
+        writes are committed in WriteBatch chunks; a failed commit fails only
+        the tasks in that chunk.
+        """
+        for task_data in tasks:
+            task_data.setdefault("created_at", _now())
+        if not self.initialized:
+            results: List[Dict[str, Any]] = [None] * len(tasks)
+            # Tasks with explicit IDs go first so generated IDs cannot collide with them
+            order = sorted(range(len(tasks)), key=lambda i: not tasks[i].get("id"))
+            for i in order:
+                task_data = tasks[i]
+                if task_data.get("id") and self.get_task(task_data["id"]):
+                    # Replaced, not merged, so fields left out of the import are dropped
+                    self.store.delete_task(task_data["id"])
+                    task = self.store.add_task(task_data)
+                    self._notify("task_updated", task)
+                else:
+                    task = self.store.add_task(task_data)
+                    self._notify("task_added", task)
+                results[i] = {"ok": True, "id": task["id"]}
+            return results
+
+        results = []
+        tasks_ref = self.db.collection('tasks')
+        for i in range(0, len(tasks), FIRESTORE_BATCH_LIMIT):
+            chunk = tasks[i:i + FIRESTORE_BATCH_LIMIT]
+            batch = self.db.batch()
+            refs = []
+            for task_data in chunk:
+                ref = tasks_ref.document(task_data.get("id"))
+                batch.set(ref, _task_document(task_data))
+                refs.append(ref)
+            try:
+                # An explicit ID is an update only if that task already exists
+                named = [ref for ref, task_data in zip(refs, chunk) if task_data.get("id")]
+                existing = {snapshot.id for snapshot in self.db.get_all(named) if snapshot.exists} if named else set()
+                batch.commit()
+            except Exception as e:
+                print(f"Error committing task batch: {e}")
+                results.extend({"ok": False, "error": str(e)} for _ in chunk)
+                continue
+            for task_data, ref in zip(chunk, refs):
+                event = "task_updated" if ref.id in existing else "task_added"
+                task_data["id"] = ref.id
+                if self.replica:
+                    self.replica.apply_task(dict(task_data))
+                self._notify(event, task_data)
+                results.append({"ok": True, "id": ref.id})
+        return results
+
+    def update_task_status(self, task_id: str, status: str) -> str:
+        """Sets a task's status, stamping completed_at when it becomes completed."""
+        if not self.initialized:
+            task = self.get_task(task_id)
+            if task is None:
+                return f"Task {task_id} not found."
+            if task.get("status") == status:
+                return f"Task {task_id} is already {status}."
+            task = self.store.update_task(task_id, _status_changes(status))
+            self._notify("task_updated", task)
+            return f"Task {task_id} marked as {status}."
+
+        try:
+            ref = self.db.collection('tasks').document(task_id)
+            doc = ref.get()
+            if not doc.exists:
+                return f"Task {task_id} not found."
+            task = _task_from_doc(doc)
+            if task.get("status") == status:
+                return f"Task {task_id} is already {status}."
+            changes = _status_changes(status)
+            ref.update(changes)
+            task = {**task, **changes}
+            if self.replica:
+                self.replica.apply_task(dict(task))
+            self._notify("task_updated", task)
+            return f"Task {task_id} marked as {status}."
+        except Exception as e:
+            return f"Error updating task: {str(e)}"
+
+    def add_reminder(self, task_id: str, when: str) -> str:
+        """
+        Adds a one-off reminder time (ISO) to a task's `reminders` list. The
+        reminder queue of every worker picks it up from the task_updated event.
+        """
+        if not self.initialized:
+            task = self.get_task(task_id)
+            if task is None:
+                return f"Task {task_id} not found."
+            if when in task.get("reminders", []):
+                return f"A reminder for task {task_id} at {when} is already set."
+            task = self.store.update_task(task_id, {"reminders": task.get("reminders", []) + [when]})
+            self._notify("task_updated", task)
+            return f"Reminder set for task {task_id} at {when}."
+
+        try:
+            from firebase_admin import firestore
+            ref = self.db.collection('tasks').document(task_id)
+            doc = ref.get()
+            if not doc.exists:
+                return f"Task {task_id} not found."
+            task = _task_from_doc(doc)
+            if when in task.get("reminders", []):
+                return f"A reminder for task {task_id} at {when} is already set."
+            ref.update({'reminders': firestore.ArrayUnion([when])})
+            task = {**task, "reminders": task.get("reminders", []) + [when]}
+            if self.replica:
+                self.replica.apply_task(dict(task))
+            self._notify("task_updated", task)
+            return f"Reminder set for task {task_id} at {when}."
+        except Exception as e:
+            return f"Error setting reminder: {str(e)}"
+
+    def backfill_assignee_keys(self) -> int:
+        """
+        Sets `assignee_key` on Firestore tasks that lack it or carry a stale
+        one (stored before assignee queries used it, or written by another
+        client). Returns how many tasks were updated.
+        """
+        if not self.initialized:
+            return 0
+        tasks_ref = self.db.collection('tasks')
+        batch, pending, updated = self.db.batch(), 0, 0
+        for doc in tasks_ref.select(['assignee', 'assignee_key']).stream():
+            data = doc.to_dict()
+            key = _assignee_key(data.get('assignee'))
+            if data.get('assignee_key') == key:
+                continue
+            batch.update(tasks_ref.document(doc.id), {'assignee_key': key})
+            pending += 1
+            if pending == FIRESTORE_BATCH_LIMIT:
+                batch.commit()
+                updated += pending
+                batch, pending = self.db.batch(), 0
+        if pending:
+            batch.commit()
+            updated += pending
+        return updated
+
+    def iter_tasks(self, user_id: str = None) -> Iterator[Dict[str, Any]]:
+        """Yields tasks one at a time; Firestore documents are streamed, not loaded up front."""
+        if not self.initialized or (self.replica and self.replica.ready):
+            yield from self.get_tasks(user_id)
+            return
+
+        from firebase_admin import firestore
+        tasks_ref = self.db.collection('tasks')
+        query = tasks_ref.where(filter=firestore.FieldFilter('assignee_key', '==', _assignee_key(user_id))) \
+            if user_id else tasks_ref
+        for doc in query.stream():
+            yield _task_from_doc(doc)
+
     def delete_task(self, task_id: str) -> str:
         if not self.initialized:
-            initial_len = len(self.mock_db["tasks"])
-            self.mock_db["tasks"] = [t for t in self.mock_db["tasks"] if t.get("id") != task_id]
-            if len(self.mock_db["tasks"]) < initial_len:
+            deleted = self.store.delete_task(task_id)
+            if deleted is not None:
+                self._notify("task_deleted", deleted)
                 return f"Task {task_id} deleted."
             return "Task not found."
         
         try:
             self.db.collection('tasks').document(task_id).delete()
+            if self.replica:
+                self.replica.remove_task(task_id)
+            self._notify("task_deleted", {"id": task_id})
             return f"Task {task_id} deleted."
         except Exception as e:
             return f"Error deleting task: {str(e)}"
 
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._local_store() as store:
+            if store is not None:
+                return store.get_task(task_id)
+
+        try:
+            doc = self.db.collection('tasks').document(task_id).get()
+            return _task_from_doc(doc) if doc.exists else None
+        except Exception as e:
+            print(f"Error fetching task: {e}")
+            return None
+
     def get_tasks(self, user_id: str = None) -> List[Dict[str, Any]]:
-        if not self.initialized:
-            if user_id:
-                return [t for t in self.mock_db["tasks"] if t.get("assignee", "").lower() == user_id.lower()]
-            return self.mock_db["tasks"]
+        with self._local_store() as store:
+            if store is not None:
+                if user_id:
+                    return store.tasks_for(user_id)
+                return store.all_tasks()
         
         try:
+            from firebase_admin import firestore
             tasks_ref = self.db.collection('tasks')
             if user_id:
-                query = tasks_ref.where('assignee', '==', user_id)
+                query = tasks_ref.where(filter=firestore.FieldFilter('assignee_key', '==', _assignee_key(user_id)))
                 docs = query.stream()
             else:
                 docs = tasks_ref.stream()
             
-            return [{**doc.to_dict(), "id": doc.id} for doc in docs]
+            return [_task_from_doc(doc) for doc in docs]
         except Exception as e:
             print(f"Error fetching tasks: {e}")
             return []
 
-    def upload_file(self, file_path: str, destination_blob_name: str) -> str:
-        if not self.initialized:
-            return f"Mock: File {file_path} uploaded to {destination_blob_name}"
-        
+    def query_tasks(self, assignee: str = None, status: str = None, due_after: str = None, due_before: str = None,
+                    fields: Optional[Sequence[str]] = None, limit: int = 100,
+                    cursor: str = None) -> Dict[str, Any]:
+        """
+        One page of tasks matching every given filter, as {"tasks": [...],
+        "next_cursor": ...}; pass next_cursor back for the following page.
+
+        Pages are ordered by task ID, or by deadline then ID when a deadline
+        bound (an ISO date/datetime; `due_before` is exclusive) is given, in
+        which case tasks without a date deadline are left out. `fields`
+        projects each task onto those fields plus "id". Firestore serves this
+        with where/order_by/start_after/select/limit, so only the page is
+        read; it needs a composite index for filters combined with a
+        deadline range.
+        """
+        ranged = due_after is not None or due_before is not None
+        bounds = _deadline_bounds(due_after, due_before)
+        after = _decode_cursor(cursor, ranged)
+        wanted = list(dict.fromkeys(fields)) if fields else None
+        with self._local_store() as store:
+            if store is not None:
+                key = None
+                if after is not None:
+                    key = (parse_deadline(after["deadline"]), after["id"]) if ranged else (after["id"],)
+                tasks = store.query_tasks(assignee, status, *bounds, after=key, limit=limit + 1)
+                return _page(tasks, limit, wanted, ranged)
+
         try:
-            blob = self.bucket.blob(destination_blob_name)
-            blob.upload_from_filename(file_path)
-            return blob.public_url
+            query = self._task_query(assignee, status, due_after, due_before)
+            query = query.order_by('deadline').order_by('__name__') if ranged else query.order_by('__name__')
+            if after is not None:
+                query = query.start_after({"deadline": after["deadline"], "__name__": after["id"]} if ranged
+                                          else {"__name__": after["id"]})
+            if wanted:
+                # The cursor of a deadline-ordered page needs the deadline of its last task
+                query = query.select(wanted + ["deadline"] if ranged and "deadline" not in wanted else wanted)
+            tasks = [_task_from_doc(doc) for doc in query.limit(limit + 1).stream()]
+            return _page(tasks, limit, wanted, ranged)
         except Exception as e:
-            return f"Error uploading file: {str(e)}"
+            print(f"Error querying tasks: {e}")
+            return {"tasks": [], "next_cursor": None}
+
+    def count_tasks(self, assignee: str = None, status: str = None, due_after: str = None,
+                    due_before: str = None) -> int:
+        """Tasks matching the query_tasks filters, counted by the store or a Firestore aggregation query."""
+        bounds = _deadline_bounds(due_after, due_before)
+        with self._local_store() as store:
+            if store is not None:
+                return store.count_tasks(assignee, status, *bounds)
+
+        try:
+            result = self._task_query(assignee, status, due_after, due_before).count(alias="total").get()
+            return int(result[0][0].value)
+        except Exception as e:
+            print(f"Error counting tasks: {e}")
+            return 0
+
+    def _task_query(self, assignee: Optional[str], status: Optional[str], due_after: Optional[str],
+                    due_before: Optional[str]):
+        from firebase_admin import firestore
+        query = self.db.collection('tasks')
+        if assignee is not None:
+            query = query.where(filter=firestore.FieldFilter('assignee_key', '==', _assignee_key(assignee)))
+        if status is not None:
+            query = query.where(filter=firestore.FieldFilter('status', '==', status))
+        if due_after is not None or due_before is not None:
+            # Deadlines are strings: "0" <= d < ":" keeps those starting with a digit, i.e. dates
+            query = query.where(filter=firestore.FieldFilter('deadline', '>=', due_after or "0"))
+            query = query.where(filter=firestore.FieldFilter('deadline', '<', due_before or ":"))
+        return query
+
+    def _ensure_stats(self):
+        if self._stats_loaded:
+            return
+        with self._stats_lock:
+            if not self._stats_loaded:
+                self.stats.load(self.iter_tasks(), self.get_all_teams())
+                self._stats_loaded = True
+
+    def _current_stats(self, members: List[str], teams: Optional[Dict[str, List[str]]] = None) -> StatsStore:
+        """
+        Counters that reflect every write to `members`' tasks. The shared
+        counters only hear of writes made through this process, the shared
+        store or the replica. When reads go straight to Firestore, other
+        clients' writes would go unseen, so the members' tasks (and `teams`)
+        are loaded into a fresh StatsStore for this read instead.
+        """
+        if self.data_version() is not None:
+            self._ensure_stats()
+            return self.stats
+        stats = StatsStore()
+        grouped = self.get_tasks_for_members(members)
+        stats.load((task for tasks in grouped.values() for task in tasks), teams or {})
+        return stats
+
+    def get_member_stats(self, user_name: str) -> Dict[str, Any]:
+        return self._current_stats([user_name]).member(user_name)
+
+    def get_members_stats(self, members: List[str]) -> Dict[str, Dict[str, Any]]:
+        stats = self._current_stats(members)
+        return {member: stats.member(member) for member in members}
+
+    def get_team_stats(self, team_name: str) -> Optional[Dict[str, Any]]:
+        """Aggregate counters for a team, or None if the team does not exist."""
+        if self.data_version() is not None:
+            self._ensure_stats()
+            return self.stats.team(team_name)
+        members = self.get_team_members(team_name)
+        if members is None:
+            return None
+        return self._current_stats(members, {team_name: members}).team(team_name)
+
+    # Async API used by the agent. The mock store is in-process and cheap, so it
+    # is called inline; Firestore/Storage calls block on network I/O (and the
+    # shared store on SQLite locks) and are offloaded to the shared I/O pool.
+
+    async def _run(self, func: Callable, *args):
+        with metrics.timed(metrics.SERVICE_SECONDS, "firebase", func.__name__):
+            if not self.initialized and not isinstance(self.store, SharedStore):
+                return func(*args)
+            return await run_blocking(func, *args)
+
+    async def _read(self, func: Callable, *args):
+        # Reads the synced replica can answer are in-memory, like mock mode
+        if self.replica is not None and self.replica.ready:
+            with metrics.timed(metrics.SERVICE_SECONDS, "firebase", func.__name__):
+                return func(*args)
+        return await self._run(func, *args)
+
+    async def acreate_team(self, team_name: str) -> str:
+        return await self._run(self.create_team, team_name)
+
+    async def aadd_member(self, team_name: str, user_name: str) -> str:
+        return await self._run(self.add_member, team_name, user_name)
+
+    async def adelete_team(self, team_name: str) -> str:
+        return await self._run(self.delete_team, team_name)
+
+    async def aremove_member(self, team_name: str, user_name: str) -> str:
+        return await self._run(self.remove_member, team_name, user_name)
+
+    async def adata_version(self) -> Optional[int]:
+        if not self.initialized and isinstance(self.store, SharedStore):
+            return await run_blocking(self.data_version)
+        return self.data_version()
+
+    async def aget_all_teams(self) -> Dict[str, List[str]]:
+        return await self._read(self.get_all_teams)
+
+    async def aget_team_members(self, team_name: str) -> Optional[List[str]]:
+        return await self._read(self.get_team_members, team_name)
+
+    async def aget_tasks_for_members(self, members: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        return await self._read(self.get_tasks_for_members, members)
+
+    async def aadd_task(self, task_data: Dict[str, Any]) -> str:
+        return await self._run(self.add_task, task_data)
+
+    async def aadd_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self._run(self.add_tasks, tasks)
+
+    async def aupdate_task_status(self, task_id: str, status: str) -> str:
+        return await self._run(self.update_task_status, task_id, status)
+
+    async def aadd_reminder(self, task_id: str, when: str) -> str:
+        return await self._run(self.add_reminder, task_id, when)
+
+    async def aget_member_stats(self, user_name: str) -> Dict[str, Any]:
+        return await self._run(self.get_member_stats, user_name)
+
+    async def aget_members_stats(self, members: List[str]) -> Dict[str, Dict[str, Any]]:
+        return await self._run(self.get_members_stats, members)
+
+    async def aget_team_stats(self, team_name: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.get_team_stats, team_name)
+
+    async def adelete_task(self, task_id: str) -> str:
+        return await self._run(self.delete_task, task_id)
+
+    async def aget_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        return await self._read(self.get_task, task_id)
+
+    async def aget_tasks(self, user_id: str = None) -> List[Dict[str, Any]]:
+        return await self._read(self.get_tasks, user_id)
+
+    async def aquery_tasks(self, assignee: str = None, status: str = None, due_after: str = None,
+                           due_before: str = None, fields: Optional[Sequence[str]] = None, limit: int = 100,
+                           cursor: str = None) -> Dict[str, Any]:
+        return await self._read(self.query_tasks, assignee, status, due_after, due_before, fields, limit, cursor)
+
+    async def acount_tasks(self, assignee: str = None, status: str = None, due_after: str = None,
+                           due_before: str = None) -> int:
+        return await self._read(self.count_tasks, assignee, status, due_after, due_before)
+
+def _assignee_key(assignee: Optional[str]) -> str:
+    return (assignee or "").lower()
+
+def _task_document(task_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A task as stored in Firestore: its fields without the ID, plus the
+    lowercased assignee that assignee queries filter on.
+    """
+    doc = {k: v for k, v in task_data.items() if k != "id"}
+    doc["assignee_key"] = _assignee_key(task_data.get("assignee"))
+    return doc
+
+def _task_from_doc(doc) -> Dict[str, Any]:
+    task = doc.to_dict()
+    task.pop("assignee_key", None)
+    task["id"] = doc.id
+    return task
+
+def _deadline_bounds(due_after: Optional[str], due_before: Optional[str]):
+    bounds = []
+    for name, value in (("due_after", due_after), ("due_before", due_before)):
+        parsed = parse_deadline(value)
+        if value is not None and parsed is None:
+            raise ValueError(f"{name} must be an ISO date or datetime, got {value!r}")
+        bounds.append(parsed)
+    return bounds
+
+def _encode_cursor(task: Dict[str, Any], ranged: bool) -> str:
+    key = {"id": task["id"], "deadline": task.get("deadline")} if ranged else {"id": task["id"]}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: Optional[str], ranged: bool) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(key.get("id"), str) or (ranged and not isinstance(key.get("deadline"), str)):
+            raise ValueError
+        return key
+    except (ValueError, AttributeError):
+        raise ValueError("Invalid cursor (cursors only work with the filters they were issued for)")
+
+def _page(tasks: List[Dict[str, Any]], limit: int, fields: Optional[List[str]], ranged: bool) -> Dict[str, Any]:
+    # One task past the limit was fetched to tell whether another page exists
+    next_cursor = _encode_cursor(tasks[limit - 1], ranged) if len(tasks) > limit else None
+    tasks = tasks[:limit]
+    if fields:
+        tasks = [{"id": task["id"], **{f: task[f] for f in fields if f in task and f != "id"}} for task in tasks]
+    return {"tasks": tasks, "next_cursor": next_cursor}
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+def _status_changes(status: str) -> Dict[str, Any]:
+    return {"status": status, "completed_at": _now() if status == "completed" else None}
 
-firebase_service = FirebaseService()
+firebase_service: FirebaseService = LazySingleton(FirebaseService, "firebase_service")
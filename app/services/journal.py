@@ -0,0 +1,259 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from app.services.store import MemoryStore
+
+_MOCK_ID = re.compile(r"^mock_(\d+)$")
+
+class JournaledStore(MemoryStore):
+    """
+    MemoryStore that survives restarts, for offline deployments.
+
+    Every write is appended to a JSON-lines journal and flushed to the OS, so a
+    process crash loses nothing; a background thread fsyncs the journal every
+    `fsync_interval` seconds (group commit), which bounds what a power loss can
+    lose. Once the journal holds `snapshot_every` writes (or as many writes as
+    the store has tasks, if that is more) the whole store is written to a
+    compact snapshot and the journal restarts, so recovery loads the snapshot
+    and replays only the tail.
+
+    Files in `directory`:
+      snapshot.json      state up to the sequence number it records
+      journal.log        writes since the last snapshot started
+      journal.log.old    writes being folded into a snapshot in progress
+    """
+
+    def __init__(self, directory: str, fsync_interval: float = 0.05, snapshot_every: int = 10000):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.journal_path = os.path.join(directory, "journal.log")
+        self.old_journal_path = self.journal_path + ".old"
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        self._seq = 0
+        self._since_snapshot = 0
+        self._dirty = False
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+        self.recovery = self._recover()
+        _truncate_torn_tail(self.journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._stop = threading.Event()
+        self._syncer = threading.Thread(target=self._sync_loop, name="store-journal", daemon=True)
+        self._syncer.start()
+
+    # --- Journaled writes ---
+
+    def create_team(self, team_name: str) -> bool:
+        with self._lock:
+            created = super().create_team(team_name)
+            if created:
+                self._log("create_team", team_name)
+            return created
+
+    def delete_team(self, team_name: str) -> bool:
+        with self._lock:
+            deleted = super().delete_team(team_name)
+            if deleted:
+                self._log("delete_team", team_name)
+            return deleted
+
+    def add_member(self, team_name: str, user_name: str) -> bool:
+        with self._lock:
+            added = super().add_member(team_name, user_name)
+            if added:
+                self._log("add_member", team_name, user_name)
+            return added
+
+    def remove_member(self, team_name: str, user_name: str) -> bool:
+        with self._lock:
+            removed = super().remove_member(team_name, user_name)
+            if removed:
+                self._log("remove_member", team_name, user_name)
+            return removed
+
+    def add_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            task = super().add_task(task_data)
+            self._log("add_task", task)
+            return task
+
+    def update_task(self, task_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            task = super().update_task(task_id, changes)
+            if task is not None:
+                self._log("update_task", task_id, changes)
+            return task
+
+    def delete_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            task = super().delete_task(task_id)
+            if task is not None:
+                self._log("delete_task", task_id)
+            return task
+
+    def _log(self, op: str, *args):
+        self._seq += 1
+        self._journal.write(json.dumps({"seq": self._seq, "op": op, "args": args}, default=str) + "\n")
+        self._journal.flush()
+        self._dirty = True
+        self._since_snapshot += 1
+        # Snapshotting when the tail reaches the size of the store keeps the
+        # amortized cost per write constant as the store grows
+        if self._since_snapshot >= max(self.snapshot_every, len(self.tasks)) and self._snapshot_thread is None:
+            self._snapshot_thread = threading.Thread(target=self.snapshot, name="store-snapshot", daemon=True)
+            self._snapshot_thread.start()
+
+    # --- Durability ---
+
+    def sync(self):
+        """
+        Forces journaled writes to disk. The fsync runs on a duplicate of the
+        journal's descriptor outside the lock, so writes (which run inline on
+        the event loop in mock mode) never wait for the disk.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._journal.flush()
+            # A rotation may close the journal meanwhile; the duplicate stays valid
+            fd = os.dup(self._journal.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Error syncing store journal: {e}")
+
+    def snapshot(self):
+        """
+        Writes the current state to snapshot.json and drops the journal entries
+        it covers. State is copied under the lock; serialization happens outside
+        it, so writes continue meanwhile (into a fresh journal).
+        """
+        try:
+            with self._lock:
+                state = {
+                    "seq": self._seq,
+                    "next_id": self._next_id,
+                    "teams": self.get_teams(),
+                    "tasks": [dict(task) for task in self.tasks.values()],
+                }
+                self._rotate_journal()
+                self._since_snapshot = 0
+
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, default=str, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            os.remove(self.old_journal_path)
+        except Exception as e:
+            print(f"Error writing store snapshot: {e}")
+        finally:
+            self._snapshot_thread = None
+
+    def _rotate_journal(self):
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._journal.close()
+        if os.path.exists(self.old_journal_path):
+            # An earlier snapshot failed; keep its entries ahead of ours
+            with open(self.old_journal_path, "a", encoding="utf-8") as old, \
+                    open(self.journal_path, encoding="utf-8") as current:
+                old.writelines(current)
+                old.flush()
+                os.fsync(old.fileno())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.old_journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._dirty = False
+
+    def close(self):
+        """Takes a final snapshot so the next start has nothing to replay."""
+        self._stop.set()
+        self._syncer.join()
+        pending = self._snapshot_thread
+        if pending is not None:
+            pending.join()
+        self.snapshot()
+        with self._lock:
+            self._journal.close()
+
+    # --- Recovery ---
+
+    def _recover(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        snapshot_seq = 0
+        snapshot_tasks = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                state = json.load(f)
+            snapshot_seq = state["seq"]
+            snapshot_tasks = len(state["tasks"])
+            for team_name, members in state["teams"].items():
+                MemoryStore.create_team(self, team_name)
+                for member in members:
+                    MemoryStore.add_member(self, team_name, member)
+            self.load_tasks(state["tasks"])
+            self._next_id = state["next_id"]
+        self._seq = snapshot_seq
+
+        replayed = 0
+        for path in (self.old_journal_path, self.journal_path):
+            if os.path.exists(path):
+                replayed += self._replay(path, snapshot_seq)
+        return {
+            "snapshot_tasks": snapshot_tasks,
+            "replayed": replayed,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _replay(self, path: str, after_seq: int) -> int:
+        replayed = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    print(f"Skipping unreadable journal entry in {path}")
+                    continue
+                if entry["seq"] <= after_seq:
+                    continue
+                getattr(MemoryStore, entry["op"])(self, *entry["args"])
+                if entry["op"] == "add_task":
+                    match = _MOCK_ID.match(entry["args"][0]["id"])
+                    if match:
+                        # Deleted IDs must stay retired after a restart
+                        self._next_id = max(self._next_id, int(match.group(1)) + 1)
+                self._seq = entry["seq"]
+                replayed += 1
+        return replayed
+
+def _truncate_torn_tail(path: str):
+    """Cuts a partial last line left by a crash, so new entries start on a fresh line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        f.seek(0)
+        f.truncate(f.read().rfind(b"\n") + 1)
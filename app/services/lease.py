@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+import time
+import uuid
+
+# Claims are only compared against work that is still pending, so old ones can go
+CLAIM_RETENTION_SECONDS = 30 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS claims (key TEXT PRIMARY KEY, holder TEXT NOT NULL, claimed_at REAL NOT NULL);
+"""
+
+class LeaderLease:
+    """
+    Time-limited lease stored in a SQLite database shared by the worker
+    processes on a host. One process holds it at a time; the holder renews it
+    with acquire() well within `ttl` seconds, and if it dies another process
+    takes over once the lease expires.
+
+    A lease alone cannot stop two holders overlapping briefly (a paused
+    leader still believes it holds the lease), so work that must happen once
+    is also guarded with claim(key), which succeeds for exactly one caller.
+    """
+
+    def __init__(self, path: str, name: str, ttl: float = 15.0):
+        self.name = name
+        self.ttl = ttl
+        self.holder = uuid.uuid4().hex
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    @property
+    def held(self) -> bool:
+        return time.time() < self._expires_at
+
+    def acquire(self) -> bool:
+        """Takes the lease if it is free or expired, or renews it if already held. Returns whether it is held."""
+        with self._lock:
+            now = time.time()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT holder, expires_at FROM leases WHERE name = ?",
+                                       (self.name,)).fetchone()
+                if row is None or row[0] == self.holder or row[1] < now:
+                    self._db.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                                     (self.name, self.holder, now + self.ttl))
+                    self._expires_at = now + self.ttl
+                    self._db.execute("DELETE FROM claims WHERE claimed_at < ?", (now - CLAIM_RETENTION_SECONDS,))
+                else:
+                    self._expires_at = 0.0
+                self._db.execute("COMMIT")
+            except BaseException:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                self._expires_at = 0.0
+                raise
+            return self.held
+
+    def release(self):
+        with self._lock:
+            self._db.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder))
+            self._expires_at = 0.0
+
+    def claim(self, key: str) -> bool:
+        """Records `key` as done by this process. False if any process claimed it before."""
+        with self._lock:
+            cursor = self._db.execute("INSERT OR IGNORE INTO claims VALUES (?, ?, ?)",
+                                      (key, self.holder, time.time()))
+            return cursor.rowcount == 1
+
+    def close(self):
+        self.release()
+        with self._lock:
+            self._db.close()
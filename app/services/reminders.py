@@ -0,0 +1,173 @@
+import datetime
+import heapq
+import itertools
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from app.core.dates import parse_deadline
+
+_LEAD_RE = re.compile(r"^\s*(\d+)\s*([mhd])\s*$")
+_LEAD_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+def parse_lead_times(spec: str) -> List[datetime.timedelta]:
+    """Parses a lead-time list such as "24h,1h,30m" into timedeltas."""
+    leads = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        match = _LEAD_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid reminder lead time: '{part}'")
+        leads.append(datetime.timedelta(**{_LEAD_UNITS[match.group(2)]: int(match.group(1))}))
+    return leads
+
+def _label(lead: datetime.timedelta) -> str:
+    minutes = int(lead.total_seconds() // 60)
+    if minutes % 60 == 0:
+        return f"{minutes // 60}h before"
+    return f"{minutes}m before"
+
+def _print_reminder(reminder: Dict[str, Any]):
+    print(f"Reminder: Task '{reminder['title']}' is due on {reminder['deadline']} ({reminder['label']}).")
+
+class ReminderEngine:
+    """
+    Deadline-ordered reminder queue.
+
+    Each pending reminder is a heap entry keyed by its fire time, so finding the
+    next due reminder is O(1) and scheduling/firing is O(log n). Tasks are added,
+    rescheduled and cancelled incrementally; heap entries that no longer match
+    a task's queued reminders are dropped lazily when they reach the top. A
+    reminder is sent once per (task, label, fire time), so moving a deadline
+    sends its reminders again for the new time.
+
+    One-off reminders are stored on the task itself (its `reminders` list of
+    ISO times), so they reach every worker and survive restarts with the task.
+    """
+
+    def __init__(self, lead_times: List[datetime.timedelta],
+                 notify: Callable[[Dict[str, Any]], None] = _print_reminder):
+        self.lead_times = lead_times
+        self.notify = notify
+        # Called with the new earliest fire time whenever it moves earlier
+        self.on_next_due: Optional[Callable[[datetime.datetime], None]] = None
+        self._heap: List[Tuple[datetime.datetime, int, str, str]] = []
+        self._seq = itertools.count()
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        # task_id -> {label: fire time} of the reminders still queued for it
+        self._scheduled: Dict[str, Dict[str, datetime.datetime]] = {}
+        # task_id -> (label, fire time) pairs already sent, kept while the task exists
+        self._sent: Dict[str, Set[Tuple[str, datetime.datetime]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(labels) for labels in self._scheduled.values())
+
+    def schedule_task(self, task: Dict[str, Any], now: Optional[datetime.datetime] = None) -> int:
+        """
+        Queues a task's reminders: the configured lead times before its
+        deadline, plus the one-off times in its `reminders` list. Returns how
+        many were queued.
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        queued = 0
+        for label, fire_at in self._fire_times(task).items():
+            # Times that have already passed are skipped rather than fired late
+            if fire_at > now and self._push(task, fire_at, label):
+                queued += 1
+        return queued
+
+    def reschedule_task(self, task: Dict[str, Any], now: Optional[datetime.datetime] = None) -> int:
+        """
+        Brings a task's reminders in line with its current deadline, status
+        and one-off reminders after an update. Returns how many reminders
+        were queued.
+        """
+        current = self._fire_times(task)
+        with self._lock:
+            pending = self._scheduled.get(task["id"], {})
+            for label in [label for label, fire_at in pending.items() if current.get(label) != fire_at]:
+                del pending[label]
+            if not pending:
+                self._scheduled.pop(task["id"], None)
+                self._tasks.pop(task["id"], None)
+            else:
+                self._tasks[task["id"]] = {"title": task.get("title"), "deadline": task.get("deadline")}
+            # Only what was sent for the current fire times still matters
+            sent = self._sent.get(task["id"])
+            if sent:
+                sent.intersection_update(current.items())
+                if not sent:
+                    del self._sent[task["id"]]
+        return self.schedule_task(task, now)
+
+    def cancel_task(self, task_id: str):
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            self._scheduled.pop(task_id, None)
+            self._sent.pop(task_id, None)
+
+    def next_due(self) -> Optional[datetime.datetime]:
+        with self._lock:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
+        """Sends every reminder due at `now` and returns them."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, _, task_id, label = heapq.heappop(self._heap)
+                labels = self._scheduled.get(task_id)
+                if not labels or labels.get(label) != fire_at:
+                    continue
+                del labels[label]
+                self._sent.setdefault(task_id, set()).add((label, fire_at))
+                task = self._tasks[task_id]
+                if not labels:
+                    del self._scheduled[task_id]
+                    del self._tasks[task_id]
+                due.append({"task_id": task_id, "title": task.get("title"),
+                            "deadline": task.get("deadline"), "label": label, "fire_at": fire_at})
+        for reminder in due:
+            self.notify(reminder)
+        return due
+
+    def _push(self, task: Dict[str, Any], fire_at: datetime.datetime, label: str) -> bool:
+        with self._lock:
+            labels = self._scheduled.setdefault(task["id"], {})
+            if labels.get(label) == fire_at or (label, fire_at) in self._sent.get(task["id"], ()):
+                if not labels:
+                    del self._scheduled[task["id"]]
+                return False
+            self._tasks[task["id"]] = {"title": task.get("title"), "deadline": task.get("deadline")}
+            # A label queued for another time is replaced; its old heap entry is skipped
+            labels[label] = fire_at
+            is_earliest = not self._heap or fire_at < self._heap[0][0]
+            heapq.heappush(self._heap, (fire_at, next(self._seq), task["id"], label))
+        if is_earliest and self.on_next_due:
+            self.on_next_due(fire_at)
+        return True
+
+    def _fire_times(self, task: Dict[str, Any]) -> Dict[str, datetime.datetime]:
+        # label -> fire time of every reminder the task should get; none once it is completed
+        if task.get("status") == "completed":
+            return {}
+        times = {}
+        deadline = parse_deadline(task.get("deadline"))
+        if deadline is not None:
+            for lead in self.lead_times:
+                times[_label(lead)] = deadline - lead
+        for value in task.get("reminders") or ():
+            when = parse_deadline(value)
+            if when is not None:
+                times[f"at {when.isoformat()}"] = when
+        return times
+
+    def _drop_cancelled(self):
+        while self._heap:
+            fire_at, _, task_id, label = self._heap[0]
+            if self._scheduled.get(task_id, {}).get(label) == fire_at:
+                break
+            heapq.heappop(self._heap)
@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.services.store import MemoryStore
+
+class FirestoreReplica:
+    """
+    Local mirror of the `tasks` and `teams` collections, kept current by
+    Firestore snapshot listeners.
+
+    The mirror is a MemoryStore, so replica reads use the same indexes as mock
+    mode. Listener callbacks arrive on Firestore's watch thread and are applied
+    under a lock. Writes made by this process are applied right away as well
+    (apply_task/remove_task/apply_team); the snapshot that follows is then a
+    no-op, so reads see a process's own writes without waiting for the round
+    trip.
+
+    Team changes are reported as (op, *args) tuples named after the StatsStore
+    methods: ("add_team", team), ("remove_team", team), ("add_member", team,
+    user) and ("remove_member", team, user).
+    """
+
+    COLLECTIONS = ("tasks", "teams")
+
+    def __init__(self, db, on_task_change: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 on_team_change: Optional[Callable[..., None]] = None):
+        self.db = db
+        self.store = MemoryStore()
+        # Called as on_task_change(event, task) for changes seen by the listener
+        self.on_task_change = on_task_change
+        # Called as on_team_change(op, *args) for each team change seen by the listener
+        self.on_team_change = on_team_change
+        self.lock = threading.RLock()
+        self._watches = []
+        self._synced = {name: False for name in self.COLLECTIONS}
+        self._last_update: Optional[float] = None
+        self._error: Optional[str] = None
+
+    def start(self):
+        self._watches = [
+            self.db.collection("tasks").on_snapshot(self._on_tasks),
+            self.db.collection("teams").on_snapshot(self._on_teams),
+        ]
+
+    def stop(self):
+        for watch in self._watches:
+            watch.unsubscribe()
+        self._watches = []
+
+    @property
+    def ready(self) -> bool:
+        """True once both collections have been loaded and the listeners are healthy."""
+        return all(self._synced.values()) and self._error is None
+
+    def freshness(self) -> Dict[str, Any]:
+        age = time.time() - self._last_update if self._last_update else None
+        return {
+            "source": "replica" if self.ready else "firestore",
+            "synced": dict(self._synced),
+            "seconds_since_update": round(age, 3) if age is not None else None,
+            "error": self._error,
+        }
+
+    # --- Snapshot callbacks ---
+
+    def _on_tasks(self, docs, changes, read_time):
+        try:
+            with self.lock:
+                for change in changes:
+                    task = {**(change.document.to_dict() or {}), "id": change.document.id}
+                    # The mirror's own index normalizes assignees
+                    task.pop("assignee_key", None)
+                    if change.type.name == "REMOVED":
+                        event = "task_deleted" if self.remove_task(task["id"]) else None
+                    else:
+                        event = self.apply_task(task)
+                    if event and self.on_task_change:
+                        self.on_task_change(event, task)
+                self._mark_synced("tasks")
+        except Exception as e:
+            self._fail(e)
+
+    def _on_teams(self, docs, changes, read_time):
+        try:
+            with self.lock:
+                for change in changes:
+                    if change.type.name == "REMOVED":
+                        differences = self.remove_team(change.document.id)
+                    else:
+                        differences = self.apply_team(change.document.id,
+                                                      (change.document.to_dict() or {}).get("members", []))
+                    for op, *args in differences:
+                        if self.on_team_change:
+                            self.on_team_change(op, *args)
+                self._mark_synced("teams")
+        except Exception as e:
+            self._fail(e)
+
+    def _mark_synced(self, collection: str):
+        self._synced[collection] = True
+        self._last_update = time.time()
+        self._error = None
+
+    def _fail(self, error: Exception):
+        # Reads fall back to Firestore until the next successful snapshot
+        self._error = str(error)
+        print(f"Error applying Firestore snapshot: {error}")
+
+    # --- Local writes ---
+
+    def apply_task(self, task: Dict[str, Any]) -> Optional[str]:
+        """Upserts a task into the mirror. Returns the event it amounts to, or None if nothing changed."""
+        with self.lock:
+            existing = self.store.get_task(task["id"])
+            if existing is None:
+                self.store.add_task(dict(task))
+                return "task_added"
+            if existing == task:
+                return None
+            # Replace rather than merge so fields removed upstream disappear locally
+            self.store.delete_task(task["id"])
+            self.store.add_task(dict(task))
+            return "task_updated"
+
+    def remove_task(self, task_id: str) -> bool:
+        with self.lock:
+            return self.store.delete_task(task_id) is not None
+
+    def apply_team(self, team_name: str, members: List[str]) -> List[Tuple]:
+        """Sets a team's members in the mirror. Returns the team changes this amounts to."""
+        with self.lock:
+            previous = self.store.teams.get(team_name)
+            self.store.teams[team_name] = dict.fromkeys(members)
+            differences: List[Tuple] = [("add_team", team_name)] if previous is None else []
+            differences += [("remove_member", team_name, m) for m in previous or () if m not in members]
+            differences += [("add_member", team_name, m) for m in members if m not in (previous or ())]
+            return differences
+
+    def remove_team(self, team_name: str) -> List[Tuple]:
+        with self.lock:
+            return [("remove_team", team_name)] if self.store.delete_team(team_name) else []
@@ -1,24 +1,92 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+from app.core.config import settings
 from app.services.firebase import firebase_service
+from app.services.lease import LeaderLease
+from app.services.reminders import ReminderEngine, parse_lead_times
+from typing import Optional
 import datetime
 
 scheduler = BackgroundScheduler()
+reminder_engine = ReminderEngine(parse_lead_times(settings.REMINDER_LEAD_TIMES))
+# With SHARED_STATE every worker keeps the reminder queue current, but only
+# the holder of this lease sends reminders
+lease: Optional[LeaderLease] = None
+
+REMINDER_JOB_ID = "deadline-reminders"
+LEASE_JOB_ID = "scheduler-lease"
+
+def _arm(next_due):
+    """Schedules a single wake-up for the next due reminder."""
+    if not scheduler.running or next_due is None:
+        return
+    scheduler.add_job(
+        check_deadlines, 'date', run_date=next_due, id=REMINDER_JOB_ID,
+        replace_existing=True, misfire_grace_time=None, coalesce=True,
+    )
+
+def _on_task_event(event, task):
+    if event == "task_added":
+        reminder_engine.schedule_task(task)
+    elif event == "task_updated":
+        reminder_engine.reschedule_task(task)
+    elif event == "task_deleted":
+        reminder_engine.cancel_task(task["id"])
+
+reminder_engine.on_next_due = _arm
+firebase_service.on_load(lambda service: service.add_listener(_on_task_event))
 
 def check_deadlines():
     """
-    Checks for tasks that are due soon and sends reminders.
+    Sends the reminders that are due and re-arms for the next one.
     """
-    print(f"[{datetime.datetime.now()}] Checking deadlines...")
-    tasks = firebase_service.get_tasks()
-    for task in tasks:
-        deadline = task.get('deadline')
-        status = task.get('status')
-        if deadline and status != 'completed':
-            # Logic to compare dates would go here
-            # For demo purposes, we just print
-            print(f"Reminder: Task '{task.get('title')}' is due on {deadline}.")
+    if lease is not None and not lease.held:
+        return
+    sent = reminder_engine.run_due()
+    if sent:
+        print(f"[{datetime.datetime.now()}] Sent {len(sent)} deadline reminder(s).")
+    _arm(reminder_engine.next_due())
+
+def _renew_lease():
+    was_leader = lease.held
+    try:
+        is_leader = lease.acquire()
+    except Exception as e:
+        print(f"Error renewing scheduler lease: {e}")
+        return
+    if is_leader and not was_leader:
+        print("This worker is now the scheduler leader.")
+        # Catch up on anything that came due while no worker was leading
+        check_deadlines()
+    elif was_leader and not is_leader:
+        print("This worker lost the scheduler lease.")
+
+def _start_lease():
+    global lease
+    lease = LeaderLease(settings.SHARED_STATE_PATH, "scheduler", ttl=settings.SCHEDULER_LEASE_TTL)
+    deliver = reminder_engine.notify
+
+    def deliver_once(reminder):
+        # A new leader's queue also holds reminders the old leader already sent;
+        # the fire time is part of the key so a moved deadline is reminded again
+        if lease.claim(f"reminder:{reminder['task_id']}:{reminder['label']}:{reminder['fire_at'].isoformat()}"):
+            deliver(reminder)
+
+    reminder_engine.notify = deliver_once
+    scheduler.add_job(_renew_lease, 'interval', seconds=settings.SCHEDULER_LEASE_TTL / 3, id=LEASE_JOB_ID,
+                      replace_existing=True, next_run_time=datetime.datetime.now())
 
 def start_scheduler():
-    scheduler.add_job(check_deadlines, 'interval', minutes=1) # Check every minute for demo
     scheduler.start()
-    print("Scheduler started.")
+    if settings.SHARED_STATE:
+        _start_lease()
+    # Load existing tasks once; afterwards the queue is kept current by task events
+    for task in firebase_service.iter_tasks():
+        reminder_engine.schedule_task(task)
+    _arm(reminder_engine.next_due())
+    print(f"Scheduler started ({len(reminder_engine)} reminders queued).")
+
+def stop_scheduler():
+    scheduler.shutdown(wait=False)
+    if lease is not None:
+        # Hand over right away instead of after the lease expires
+        lease.close()
@@ -0,0 +1,209 @@
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from app.core import metrics
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+
+class SearchBackend:
+    """Interface for web search providers used by SearchService."""
+
+    available: bool = True
+
+    async def search(self, query: str) -> str:
+        raise NotImplementedError
+
+    async def aclose(self):
+        """Releases pooled connections."""
+
+class SerpAPIBackend(SearchBackend):
+    """
+    Google search through SerpAPI's JSON endpoint, using one pooled
+    httpx client for every request instead of a new wrapper per call.
+    """
+
+    URL = "https://serpapi.com/search.json"
+
+    def __init__(self, api_key: str, timeout: float = 20.0):
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Clients are bound to the event loop that created them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            stale = self._client
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client_loop = loop
+            if stale is not None:
+                await _close_quietly(stale)
+        return self._client
+
+    async def search(self, query: str) -> str:
+        params = {"q": query, "engine": "google", "api_key": self.api_key}
+        response = await (await self._get_client()).get(self.URL, params=params)
+        response.raise_for_status()
+        return format_serpapi_results(response.json())
+
+    async def aclose(self):
+        client, self._client = self._client, None
+        if client is not None:
+            await _close_quietly(client)
+
+async def _close_quietly(client: httpx.AsyncClient):
+    try:
+        await client.aclose()
+    except Exception as e:
+        # Connections opened on a loop that has since closed cannot be shut
+        # down cleanly; their sockets are released with the client
+        print(f"Error closing search client: {e}")
+
+def format_serpapi_results(data: Dict[str, Any]) -> str:
+    """Picks the most useful text out of a SerpAPI response, like SerpAPIWrapper does."""
+    if "error" in data:
+        raise ValueError(f"Got error from SerpAPI: {data['error']}")
+    answer_box = data.get("answer_box") or {}
+    for key in ("answer", "snippet"):
+        if answer_box.get(key):
+            return str(answer_box[key])
+    if data.get("knowledge_graph", {}).get("description"):
+        return data["knowledge_graph"]["description"]
+    snippets = [r["snippet"] for r in data.get("organic_results", []) if r.get("snippet")]
+    return str(snippets) if snippets else "No good search result found"
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: case-folded, whitespace-collapsed, trailing punctuation dropped."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.!").strip().casefold()
+
+class SearchService:
+    """
+    Caching front for a SearchBackend.
+
+    Results are cached under normalized query keys in an in-memory LRU with a
+    TTL, optionally backed by a SQLite file so they survive restarts.
+    Concurrent identical queries share a single backend request.
+    """
+
+    def __init__(self, backend: SearchBackend, ttl: float = 24 * 3600, max_entries: int = 1000,
+                 db_path: Optional[str] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, expires_at REAL, result TEXT)")
+
+    @property
+    def available(self) -> bool:
+        return self.backend.available
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+    async def search(self, query: str) -> str:
+        key = normalize_query(query)
+        cached = self._get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # Owned by the service rather than the first caller, so no caller's
+            # cancellation (e.g. a dropped /chat/stream) cancels it for the others
+            inflight = asyncio.ensure_future(self._fetch(key, query))
+            # Marks a failure retrieved in case every caller was cancelled
+            inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._inflight[key] = inflight
+        return await asyncio.shield(inflight)
+
+    async def _fetch(self, key: str, query: str) -> str:
+        try:
+            result = await self._get_disk(key)
+            if result is not None:
+                self.stats["disk_hits"] += 1
+                self._put(key, result)
+                return result
+            self.stats["misses"] += 1
+            with metrics.timed(metrics.SERVICE_SECONDS, "search", "backend_search"):
+                result = await self.backend.search(query)
+            self._put(key, result)
+            await self._put_disk(key, result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def clear(self):
+        self._cache.clear()
+        if self._db:
+            with self._db_lock, self._db:
+                self._db.execute("DELETE FROM search_cache")
+
+    # --- Memory tier ---
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.time():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _put(self, key: str, result: str):
+        self._cache[key] = (time.time() + self.ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    # --- Disk tier ---
+
+    async def _get_disk(self, key: str) -> Optional[str]:
+        if not self._db:
+            return None
+        row = await run_blocking(self._select, key)
+        return row[0] if row else None
+
+    def _select(self, key: str):
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT result FROM search_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+
+    async def _put_disk(self, key: str, result: str):
+        if self._db:
+            await run_blocking(self._upsert, key, result)
+
+    def _upsert(self, key: str, result: str):
+        with self._db_lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)",
+                             (key, time.time() + self.ttl, result))
+
+search_service = SearchService(
+    SerpAPIBackend(settings.SERPAPI_API_KEY),
+    ttl=settings.SEARCH_CACHE_TTL,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    db_path=settings.SEARCH_CACHE_DB_PATH or None,
+)
@@ -0,0 +1,225 @@
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.services.store import MemoryStore
+
+_MOCK_ID = re.compile(r"^mock_(\d+)$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS store_tasks (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS store_teams (name TEXT PRIMARY KEY, members TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS store_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    op TEXT NOT NULL,
+    args TEXT NOT NULL
+);
+"""
+
+class SharedStore(MemoryStore):
+    """
+    MemoryStore shared by every worker process on a host, for running mock
+    mode with `uvicorn --workers N`.
+
+    Each process keeps the usual in-memory indexes and serves reads from them.
+    The authoritative copy lives in a SQLite database in WAL mode: current
+    tasks and teams, plus a change log. A write takes SQLite's write lock,
+    first applies the changes other processes logged since this one last
+    looked (so checks such as "team exists" and generated IDs see every
+    worker's writes), then applies itself and logs its change. Reads call
+    catch_up() first, which is one indexed SELECT when nothing changed, and a
+    background thread polls every `poll_interval` seconds so idle workers
+    (e.g. the scheduler leader) still hear about other workers' writes.
+
+    Changes made by other processes are reported to `on_change(op, args,
+    result)` after they are applied; op "reload" means this process fell
+    behind the retained change log and reloaded from the tables.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.05, change_retention: int = 100_000):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.change_retention = change_retention
+        self.origin = uuid.uuid4().hex
+        self.on_change: Optional[Callable[[str, Tuple, Any], None]] = None
+        self._lock = threading.RLock()
+        # Autocommit mode, so BEGIN IMMEDIATE below controls transactions
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._seq = 0
+        with self._lock:
+            self._reload()
+        self._stop = threading.Event()
+        self._poller = threading.Thread(target=self._poll_loop, name="shared-store", daemon=True)
+        self._poller.start()
+
+    # --- Writes ---
+
+    def create_team(self, team_name: str) -> bool:
+        with self._transaction():
+            created = MemoryStore.create_team(self, team_name)
+            if created:
+                self._db.execute("INSERT OR REPLACE INTO store_teams VALUES (?, '[]')", (team_name,))
+                self._log("create_team", team_name)
+            return created
+
+    def delete_team(self, team_name: str) -> bool:
+        with self._transaction():
+            deleted = MemoryStore.delete_team(self, team_name)
+            if deleted:
+                self._db.execute("DELETE FROM store_teams WHERE name = ?", (team_name,))
+                self._log("delete_team", team_name)
+            return deleted
+
+    def add_member(self, team_name: str, user_name: str) -> bool:
+        with self._transaction():
+            added = MemoryStore.add_member(self, team_name, user_name)
+            if added:
+                self._save_team(team_name)
+                self._log("add_member", team_name, user_name)
+            return added
+
+    def remove_member(self, team_name: str, user_name: str) -> bool:
+        with self._transaction():
+            removed = MemoryStore.remove_member(self, team_name, user_name)
+            if removed:
+                self._save_team(team_name)
+                self._log("remove_member", team_name, user_name)
+            return removed
+
+    def add_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._transaction():
+            task = MemoryStore.add_task(self, task_data)
+            self._save_task(task)
+            self._db.execute("INSERT OR REPLACE INTO store_meta VALUES ('next_id', ?)", (self._next_id,))
+            self._log("add_task", task)
+            return task
+
+    def update_task(self, task_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._transaction():
+            task = MemoryStore.update_task(self, task_id, changes)
+            if task is not None:
+                self._save_task(task)
+                self._log("update_task", task_id, changes)
+            return task
+
+    def delete_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._transaction():
+            task = MemoryStore.delete_task(self, task_id)
+            if task is not None:
+                self._db.execute("DELETE FROM store_tasks WHERE id = ?", (task_id,))
+                self._log("delete_task", task_id)
+            return task
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._apply_changes()
+                yield
+                self._db.execute("COMMIT")
+            except BaseException:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                # Memory may hold the write that was just rolled back
+                self._reload()
+                raise
+
+    def _save_task(self, task: Dict[str, Any]):
+        self._db.execute("INSERT OR REPLACE INTO store_tasks VALUES (?, ?)",
+                         (task["id"], json.dumps(task, default=str)))
+
+    def _save_team(self, team_name: str):
+        self._db.execute("UPDATE store_teams SET members = ? WHERE name = ?",
+                         (json.dumps(list(self.teams[team_name])), team_name))
+
+    def _log(self, op: str, *args):
+        cursor = self._db.execute("INSERT INTO store_changes (origin, op, args) VALUES (?, ?, ?)",
+                                  (self.origin, op, json.dumps(args, default=str)))
+        self._seq = cursor.lastrowid
+        if self._seq % 1000 == 0:
+            self._db.execute("DELETE FROM store_changes WHERE seq <= ?", (self._seq - self.change_retention,))
+
+    # --- Following other workers ---
+
+    def catch_up(self):
+        """Applies changes other processes have made since the last call."""
+        with self._lock:
+            self._apply_changes()
+
+    @contextmanager
+    def synced(self):
+        """Catches up, then holds the store still for the duration of a read."""
+        with self._lock:
+            self._apply_changes()
+            yield self
+
+    def _apply_changes(self):
+        rows = self._db.execute("SELECT seq, origin, op, args FROM store_changes WHERE seq > ? ORDER BY seq",
+                                (self._seq,)).fetchall()
+        if not rows:
+            return
+        if rows[0][0] != self._seq + 1:
+            # Changes we never saw have been pruned from the log
+            self._reload()
+            self._report("reload", (), None)
+            return
+        for seq, origin, op, args in rows:
+            self._seq = seq
+            if origin == self.origin:
+                continue
+            args = tuple(json.loads(args))
+            result = getattr(MemoryStore, op)(self, *args)
+            if op == "add_task":
+                match = _MOCK_ID.match(args[0]["id"])
+                if match:
+                    self._next_id = max(self._next_id, int(match.group(1)) + 1)
+            self._report(op, args, result)
+
+    def _report(self, op: str, args: Tuple, result: Any):
+        if self.on_change:
+            try:
+                self.on_change(op, args, result)
+            except Exception as e:
+                print(f"Error handling shared store change {op}: {e}")
+
+    def _reload(self):
+        """Rebuilds memory from the tables and resumes following the log from its end."""
+        # A read transaction, so the tables and log position are one consistent snapshot
+        own_transaction = not self._db.in_transaction
+        if own_transaction:
+            self._db.execute("BEGIN")
+        try:
+            MemoryStore.__init__(self)
+            self._seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM store_changes").fetchone()[0]
+            for name, members in self._db.execute("SELECT name, members FROM store_teams"):
+                self.teams[name] = dict.fromkeys(json.loads(members))
+            self.load_tasks(json.loads(data) for (data,) in self._db.execute("SELECT data FROM store_tasks"))
+            row = self._db.execute("SELECT value FROM store_meta WHERE key = 'next_id'").fetchone()
+            if row:
+                self._next_id = row[0]
+        finally:
+            if own_transaction:
+                self._db.execute("COMMIT")
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.catch_up()
+            except Exception as e:
+                print(f"Error following shared store: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._poller.join()
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,204 @@
+import bisect
+import datetime
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+from app.core.dates import parse_deadline
+
+COMPLETED = "completed"
+# Days of daily completion counts kept for throughput queries
+VELOCITY_DAYS = 90
+
+class _Contribution(NamedTuple):
+    """The fields of a task that the counters depend on."""
+    assignee: str
+    status: Optional[str]
+    deadline: Optional[datetime.datetime]
+    created_at: Optional[datetime.datetime]
+    completed_at: Optional[datetime.datetime]
+
+    @classmethod
+    def of(cls, task: Dict[str, Any]) -> "_Contribution":
+        return cls(
+            assignee=_normalize(task.get("assignee")),
+            status=task.get("status"),
+            deadline=parse_deadline(task.get("deadline")),
+            created_at=parse_deadline(task.get("created_at")),
+            completed_at=parse_deadline(task.get("completed_at")),
+        )
+
+class Stats:
+    """
+    Counters for one member or team: totals by status, open deadlines (sorted,
+    for overdue counts), completions per UTC day and total lead time.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Dict[str, int] = {}
+        self.open_deadlines: List[datetime.datetime] = []
+        self.completed_by_day: Dict[datetime.date, int] = {}
+        self.lead_time_seconds = 0.0
+        self.lead_time_count = 0
+
+    def apply(self, c: _Contribution, sign: int, today: datetime.date):
+        self.total += sign
+        _bump(self.by_status, c.status, sign)
+        if c.status != COMPLETED:
+            if c.deadline is not None:
+                _sorted_bump(self.open_deadlines, c.deadline, sign)
+            return
+        if c.completed_at is not None:
+            day = c.completed_at.date()
+            if (today - day).days < VELOCITY_DAYS:
+                _bump(self.completed_by_day, day, sign)
+            if c.created_at is not None:
+                self.lead_time_seconds += sign * (c.completed_at - c.created_at).total_seconds()
+                self.lead_time_count += sign
+
+    def merge(self, other: "Stats", sign: int):
+        self.total += sign * other.total
+        for status, n in other.by_status.items():
+            _bump(self.by_status, status, sign * n)
+        for deadline in other.open_deadlines:
+            _sorted_bump(self.open_deadlines, deadline, sign)
+        for day, n in other.completed_by_day.items():
+            _bump(self.completed_by_day, day, sign * n)
+        self.lead_time_seconds += sign * other.lead_time_seconds
+        self.lead_time_count += sign * other.lead_time_count
+
+    def summary(self, now: datetime.datetime) -> Dict[str, Any]:
+        today = now.date()
+        for day in [d for d in self.completed_by_day if (today - d).days >= VELOCITY_DAYS]:
+            del self.completed_by_day[day]
+
+        def completed_since(days: int) -> int:
+            return sum(self.completed_by_day.get(today - datetime.timedelta(days=i), 0) for i in range(days))
+
+        return {
+            "total": self.total,
+            "completed": self.by_status.get(COMPLETED, 0),
+            "by_status": dict(self.by_status),
+            "overdue": bisect.bisect_left(self.open_deadlines, now),
+            "completed_last_7_days": completed_since(7),
+            "completed_last_30_days": completed_since(30),
+            "avg_lead_time_hours": (round(self.lead_time_seconds / self.lead_time_count / 3600, 1)
+                                    if self.lead_time_count else None),
+        }
+
+class StatsStore:
+    """
+    Materialized per-member and per-team task statistics.
+
+    FirebaseService reports every task write and team change here, so insight
+    queries read counters instead of rescanning tasks. Each task's last
+    contribution is remembered by ID, which makes writes idempotent: replaying
+    a task (e.g. on reload) replaces its old contribution rather than adding a
+    second one. Team counters are the sum of their members' counters.
+    """
+
+    def __init__(self):
+        self.members: Dict[str, Stats] = {}
+        self.teams: Dict[str, Stats] = {}
+        self._team_members: Dict[str, Set[str]] = {}
+        self._member_teams: Dict[str, Set[str]] = {}
+        self._tasks: Dict[str, _Contribution] = {}
+        self._lock = threading.Lock()
+
+    # --- Tasks ---
+
+    def upsert_task(self, task: Dict[str, Any], now: Optional[datetime.datetime] = None):
+        today = (now or _now()).date()
+        contribution = _Contribution.of(task)
+        with self._lock:
+            previous = self._tasks.get(task["id"])
+            if previous == contribution:
+                return
+            if previous is not None:
+                self._apply(previous, -1, today)
+            self._tasks[task["id"]] = contribution
+            self._apply(contribution, +1, today)
+
+    def remove_task(self, task_id: str, now: Optional[datetime.datetime] = None):
+        with self._lock:
+            previous = self._tasks.pop(task_id, None)
+            if previous is not None:
+                self._apply(previous, -1, (now or _now()).date())
+
+    def _apply(self, c: _Contribution, sign: int, today: datetime.date):
+        self.members.setdefault(c.assignee, Stats()).apply(c, sign, today)
+        for team in self._member_teams.get(c.assignee, ()):
+            self.teams[team].apply(c, sign, today)
+
+    # --- Teams ---
+
+    def add_team(self, team_name: str):
+        with self._lock:
+            self.teams.setdefault(team_name, Stats())
+            self._team_members.setdefault(team_name, set())
+
+    def remove_team(self, team_name: str):
+        with self._lock:
+            self.teams.pop(team_name, None)
+            for member in self._team_members.pop(team_name, set()):
+                self._member_teams[member].discard(team_name)
+
+    def add_member(self, team_name: str, user_name: str):
+        member = _normalize(user_name)
+        with self._lock:
+            members = self._team_members.setdefault(team_name, set())
+            if member in members:
+                return
+            members.add(member)
+            self._member_teams.setdefault(member, set()).add(team_name)
+            self.teams.setdefault(team_name, Stats()).merge(self.members.get(member, Stats()), +1)
+
+    def remove_member(self, team_name: str, user_name: str):
+        member = _normalize(user_name)
+        with self._lock:
+            members = self._team_members.get(team_name)
+            if not members or member not in members:
+                return
+            members.discard(member)
+            self._member_teams[member].discard(team_name)
+            self.teams[team_name].merge(self.members.get(member, Stats()), -1)
+
+    # --- Reads ---
+
+    def load(self, tasks: Iterable[Dict[str, Any]], teams: Dict[str, List[str]]):
+        """Replays existing tasks and teams, e.g. after startup."""
+        for team_name, members in teams.items():
+            self.add_team(team_name)
+            for member in members:
+                self.add_member(team_name, member)
+        for task in tasks:
+            self.upsert_task(task)
+
+    def member(self, user_name: str, now: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+        with self._lock:
+            return self.members.get(_normalize(user_name), Stats()).summary(now or _now())
+
+    def team(self, team_name: str, now: Optional[datetime.datetime] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stats = self.teams.get(team_name)
+            return stats.summary(now or _now()) if stats is not None else None
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+def _normalize(name: Optional[str]) -> str:
+    return (name or "").lower()
+
+def _bump(counts: Dict[Any, int], key: Any, delta: int):
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+def _sorted_bump(values: List[datetime.datetime], value: datetime.datetime, sign: int):
+    if sign > 0:
+        bisect.insort(values, value)
+        return
+    i = bisect.bisect_left(values, value)
+    if i < len(values) and values[i] == value:
+        del values[i]
@@ -0,0 +1,229 @@
+import datetime
+import heapq
+import itertools
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.dates import parse_deadline
+from app.core.sortedlist import SortedList
+
+# Dicts are used as insertion-ordered sets throughout: O(1) add/remove/contains
+# while keeping the order the dashboard displays members and tasks in.
+IdSet = Dict[str, None]
+
+class MemoryStore:
+    """
+    In-process storage engine backing FirebaseService in mock mode.
+
+    Tasks are keyed by ID with secondary indexes by case-normalized assignee,
+    by status, by parsed deadline and in ID order for paging. Team membership is set-based and task IDs
+    are monotonic, so an ID is never reused after a delete.
+    """
+
+    def __init__(self):
+        self.teams: Dict[str, IdSet] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self._by_assignee: Dict[str, IdSet] = {}
+        self._by_status: Dict[str, IdSet] = {}
+        # Task IDs, and (deadline, id) pairs; bucketed so writes stay O(log n) at any size
+        self._by_id = SortedList()
+        self._by_deadline = SortedList()
+        self._next_id = 1
+
+    # --- Teams ---
+
+    def create_team(self, team_name: str) -> bool:
+        if team_name in self.teams:
+            return False
+        self.teams[team_name] = {}
+        return True
+
+    def delete_team(self, team_name: str) -> bool:
+        return self.teams.pop(team_name, None) is not None
+
+    def add_member(self, team_name: str, user_name: str) -> bool:
+        members = self.teams.get(team_name)
+        if members is None or user_name in members:
+            return False
+        members[user_name] = None
+        return True
+
+    def remove_member(self, team_name: str, user_name: str) -> bool:
+        members = self.teams.get(team_name)
+        if members is None or user_name not in members:
+            return False
+        del members[user_name]
+        return True
+
+    def get_members(self, team_name: str) -> Optional[List[str]]:
+        members = self.teams.get(team_name)
+        return list(members) if members is not None else None
+
+    def get_teams(self) -> Dict[str, List[str]]:
+        return {name: list(members) for name, members in self.teams.items()}
+
+    # --- Tasks ---
+
+    def next_task_id(self) -> str:
+        # Imported tasks may already use IDs from the mock_N sequence
+        task_id = f"mock_{self._next_id}"
+        while task_id in self.tasks:
+            self._next_id += 1
+            task_id = f"mock_{self._next_id}"
+        self._next_id += 1
+        return task_id
+
+    def add_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        if not task_data.get("id"):
+            task_data["id"] = self.next_task_id()
+        previous = self.tasks.get(task_data["id"])
+        if previous is None:
+            self._by_id.add(task_data["id"])
+        else:
+            # Replaces the stored task; its index entries go with it
+            self._unindex(previous)
+        self.tasks[task_data["id"]] = task_data
+        self._index(task_data)
+        return task_data
+
+    def load_tasks(self, tasks: Iterable[Dict[str, Any]]):
+        """Bulk-adds tasks that already have IDs, sorting the ID and deadline indexes once at the end."""
+        ids: IdSet = {}
+        deadlines: Dict[str, Tuple[datetime.datetime, str]] = {}
+        for task in tasks:
+            task_id = task["id"]
+            previous = self.tasks.get(task_id)
+            if previous is None:
+                ids[task_id] = None
+            else:
+                self._unindex(previous)
+                deadlines.pop(task_id, None)
+            self.tasks[task_id] = task
+            self._by_assignee.setdefault(_normalize(task.get("assignee")), {})[task_id] = None
+            self._by_status.setdefault(task.get("status"), {})[task_id] = None
+            deadline = parse_deadline(task.get("deadline"))
+            if deadline is not None:
+                deadlines[task_id] = (deadline, task_id)
+        self._by_id.update(ids)
+        self._by_deadline.update(deadlines.values())
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        return self.tasks.get(task_id)
+
+    def update_task(self, task_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        self._unindex(task)
+        task.update(changes)
+        self._index(task)
+        return task
+
+    def delete_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            self._by_id.discard(task_id)
+            self._unindex(task)
+        return task
+
+    def all_tasks(self) -> List[Dict[str, Any]]:
+        return list(self.tasks.values())
+
+    def tasks_for(self, assignee: str) -> List[Dict[str, Any]]:
+        ids = self._by_assignee.get(_normalize(assignee), {})
+        return [self.tasks[task_id] for task_id in ids]
+
+    def tasks_with_status(self, status: str) -> List[Dict[str, Any]]:
+        return [self.tasks[task_id] for task_id in self._by_status.get(status, {})]
+
+    def tasks_due_between(self, start: Optional[datetime.datetime] = None,
+                          end: Optional[datetime.datetime] = None) -> List[Dict[str, Any]]:
+        """Tasks with a parseable deadline in [start, end), ordered by deadline."""
+        pairs = self._by_deadline.irange(None if start is None else (start, ""), None if end is None else (end, ""))
+        return [self.tasks[task_id] for _, task_id in pairs]
+
+    def query_tasks(self, assignee: Optional[str] = None, status: Optional[str] = None,
+                    due_after: Optional[datetime.datetime] = None, due_before: Optional[datetime.datetime] = None,
+                    after: Optional[Tuple] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` tasks matching every given filter. Ordered by ID, or by
+        (deadline, ID) when a deadline bound is given, and starting after the
+        `after` key in that order: (id,) or (deadline, id).
+        """
+        required = self._filter_sets(assignee, status)
+        if due_after is not None or due_before is not None:
+            start, inclusive = (None if due_after is None else (due_after, "")), True
+            if after is not None and (start is None or after >= start):
+                start, inclusive = after, False
+            pairs = self._by_deadline.irange(start, None if due_before is None else (due_before, ""),
+                                             inclusive=(inclusive, False))
+            ids = []
+            for _, task_id in pairs:
+                if all(task_id in index for index in required):
+                    ids.append(task_id)
+                    if limit is not None and len(ids) == limit:
+                        break
+        elif required and (limit is None or len(min(required, key=len)) ** 2 <= limit * len(self.tasks)):
+            # A small candidate set is cheaper to scan whole; a bounded heap avoids sorting it
+            matches = (task_id for task_id in min(required, key=len)
+                       if (after is None or task_id > after[-1]) and all(task_id in index for index in required))
+            ids = heapq.nsmallest(limit, matches) if limit is not None else sorted(matches)
+        else:
+            # Walk the ID index from the cursor: a page costs O(log n + limit) unfiltered,
+            # and about limit * n / candidates with broad filters
+            matches = (task_id for task_id in self._by_id.irange(None if after is None else after[-1],
+                                                                 inclusive=(False, False))
+                       if all(task_id in index for index in required))
+            ids = list(itertools.islice(matches, limit))
+        return [self.tasks[task_id] for task_id in ids]
+
+    def count_tasks(self, assignee: Optional[str] = None, status: Optional[str] = None,
+                    due_after: Optional[datetime.datetime] = None, due_before: Optional[datetime.datetime] = None) -> int:
+        required = self._filter_sets(assignee, status)
+        if due_after is not None or due_before is not None:
+            start = None if due_after is None else (due_after, "")
+            end = None if due_before is None else (due_before, "")
+            if not required:
+                lo = 0 if start is None else self._by_deadline.bisect_left(start)
+                hi = len(self._by_deadline) if end is None else self._by_deadline.bisect_left(end)
+                return hi - lo
+            return sum(1 for _, task_id in self._by_deadline.irange(start, end)
+                       if all(task_id in ids for ids in required))
+        if not required:
+            return len(self.tasks)
+        smallest = min(required, key=len)
+        return sum(1 for task_id in smallest if all(task_id in ids for ids in required))
+
+    def _filter_sets(self, assignee: Optional[str], status: Optional[str]) -> List[IdSet]:
+        required = []
+        if assignee is not None:
+            required.append(self._by_assignee.get(_normalize(assignee), {}))
+        if status is not None:
+            required.append(self._by_status.get(status, {}))
+        return required
+
+    # --- Indexes ---
+
+    def _index(self, task: Dict[str, Any]):
+        task_id = task["id"]
+        self._by_assignee.setdefault(_normalize(task.get("assignee")), {})[task_id] = None
+        self._by_status.setdefault(task.get("status"), {})[task_id] = None
+        deadline = parse_deadline(task.get("deadline"))
+        if deadline is not None:
+            self._by_deadline.add((deadline, task_id))
+
+    def _unindex(self, task: Dict[str, Any]):
+        task_id = task["id"]
+        _discard(self._by_assignee, _normalize(task.get("assignee")), task_id)
+        _discard(self._by_status, task.get("status"), task_id)
+        deadline = parse_deadline(task.get("deadline"))
+        if deadline is not None:
+            self._by_deadline.discard((deadline, task_id))
+
+def _normalize(name: Optional[str]) -> str:
+    return (name or "").lower()
+
+def _discard(index: Dict[Any, IdSet], key: Any, task_id: str):
+    ids = index.get(key)
+    if ids is not None:
+        ids.pop(task_id, None)
+        if not ids:
+            del index[key]
@@ -49,17 +49,50 @@ document.addEventListener('DOMContentLoaded', () => {
         const loadingId = addLoadingIndicator();
 
         try {
-            const response = await fetch('/chat', {
+            const response = await fetch('/chat/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ query: message, user_id: userId }),
             });
 
             if (!response.ok) throw new Error('Network response was not ok');
-            const data = await response.json();
-            
-            removeMessage(loadingId);
-            addMessage(data.response, 'bot');
+
+            // Read NDJSON events and render tokens as they arrive
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let contentDiv = null;
+            let streamed = '';
+
+            const handleEvent = (event) => {
+                if (event.event === 'token') {
+                    if (!contentDiv) {
+                        removeMessage(loadingId);
+                        contentDiv = addMessage('', 'bot');
+                    }
+                    streamed += event.content;
+                    contentDiv.textContent = streamed;
+                    chatContainer.scrollTop = chatContainer.scrollHeight;
+                } else if (event.event === 'final') {
+                    removeMessage(loadingId);
+                    if (contentDiv) {
+                        contentDiv.textContent = event.data.response;
+                    } else {
+                        addMessage(event.data.response, 'bot');
+                    }
+                }
+            };
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)));
+            }
+            if (buffer.trim()) handleEvent(JSON.parse(buffer));
+
             fetchTeams(); // Refresh teams after chat
         } catch (error) {
             console.error('Error:', error);
@@ -105,6 +138,7 @@ document.addEventListener('DOMContentLoaded', () => {
         
         chatContainer.appendChild(messageDiv);
         chatContainer.scrollTop = chatContainer.scrollHeight;
+        return contentDiv;
     }
 
     function addLoadingIndicator() {
@@ -190,42 +224,58 @@ document.addEventListener('DOMContentLoaded', () => {
         };
 
         try {
-            const response = await fetch(`/api/member/${encodeURIComponent(memberName)}`);
-            if (response.ok) {
-                const data = await response.json();
-                modalCompleted.textContent = data.completed_tasks;
-                modalTotal.textContent = data.total_tasks;
-                
-                modalTasksList.innerHTML = '';
-                if (data.tasks.length === 0) {
-                    modalTasksList.innerHTML = '<p style="padding:10px; color:#888;">No tasks assigned.</p>';
-                } else {
-                    data.tasks.forEach(task => {
-                        const div = document.createElement('div');
-                        div.classList.add('task-item');
-                        div.innerHTML = `
-                            <span>${task.title}</span>
-                            <div style="display:flex; align-items:center; gap:10px;">
-                                <span class="task-status ${task.status}">${task.status}</span>
-                                <button class="delete-task-btn" style="background:none; border:none; color:#dc3545; cursor:pointer;">&times;</button>
-                            </div>
-                        `;
-                        div.querySelector('.delete-task-btn').onclick = async () => {
-                            if(confirm('Delete this task?')) {
-                                await fetch(`/api/tasks/${task.id}`, { method: 'DELETE' });
-                                openMemberModal(memberName); // Refresh modal
-                            }
-                        };
-                        modalTasksList.appendChild(div);
-                    });
-                }
-            }
+            await loadMemberTasks(memberName, null);
         } catch (error) {
             console.error('Error fetching member details:', error);
             modalTasksList.innerHTML = '<p style="padding:10px; color:red;">Error loading details.</p>';
         }
     }
 
+    // Fetches one page of a member's tasks (only the fields the modal shows) and
+    // appends it, with a "Load more" button while further pages exist
+    async function loadMemberTasks(memberName, cursor) {
+        const params = new URLSearchParams({ fields: 'title,status', limit: '50' });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`/api/member/${encodeURIComponent(memberName)}?${params}`);
+        if (!response.ok) return;
+        const data = await response.json();
+        modalCompleted.textContent = data.completed_tasks;
+        modalTotal.textContent = data.total_tasks;
+
+        if (!cursor) modalTasksList.innerHTML = '';
+        const loadMore = modalTasksList.querySelector('.load-more-btn');
+        if (loadMore) loadMore.remove();
+        if (!cursor && data.tasks.length === 0) {
+            modalTasksList.innerHTML = '<p style="padding:10px; color:#888;">No tasks assigned.</p>';
+            return;
+        }
+        data.tasks.forEach(task => {
+            const div = document.createElement('div');
+            div.classList.add('task-item');
+            div.innerHTML = `
+                <span>${task.title}</span>
+                <div style="display:flex; align-items:center; gap:10px;">
+                    <span class="task-status ${task.status}">${task.status}</span>
+                    <button class="delete-task-btn" style="background:none; border:none; color:#dc3545; cursor:pointer;">&times;</button>
+                </div>
+            `;
+            div.querySelector('.delete-task-btn').onclick = async () => {
+                if(confirm('Delete this task?')) {
+                    await fetch(`/api/tasks/${task.id}`, { method: 'DELETE' });
+                    openMemberModal(memberName); // Refresh modal
+                }
+            };
+            modalTasksList.appendChild(div);
+        });
+        if (data.next_cursor) {
+            const button = document.createElement('button');
+            button.classList.add('action-btn', 'load-more-btn');
+            button.textContent = 'Load more';
+            button.onclick = () => loadMemberTasks(memberName, data.next_cursor);
+            modalTasksList.appendChild(button);
+        }
+    }
+
     // --- File Upload Logic ---
     const attachBtn = document.getElementById('attach-btn');
     const fileInput = document.getElementById('file-upload');
@@ -0,0 +1,277 @@
+"""
+Load test for the API with a deterministic fake LLM.
+
+Seeds the mock-mode store, swaps the graph's model for ReplayChatModel and
+drives /chat, /api/teams and /api/member/{name} in-process through httpx's
+ASGI transport, so the numbers are TrackUp's own overhead rather than model
+or network time. Prints JSON with p50/p95/p99 latency and throughput per
+endpoint, time spent per graph node and tool, and peak RSS:
+
+    python -m benchmarks.bench_load --teams 10000 --tasks 1000000 --concurrency 32
+    python -m benchmarks.bench_load --out results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("CALENDAR_OUTBOX_PATH", ":memory:")
+os.environ.setdefault("MOCK_STORE_DIR", "")
+os.environ.setdefault("FIREBASE_CREDENTIALS_PATH", "/nonexistent")
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tracers.context import register_configure_hook
+
+from app.agents import graph_new
+from app.main import app
+from app.services.firebase import firebase_service
+
+ENDPOINTS = ("chat", "teams", "member")
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Fake model that answers each scripted query with its tool call, then
+    summarizes the tool result, the way the real model does for one-tool turns.
+    """
+
+    script: Dict[str, Dict[str, Any]]
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, HumanMessage):
+            call = self.script.get(last.content)
+            if call:
+                return AIMessage(content="", tool_calls=[{**call, "id": f"call_{random.getrandbits(48):x}"}])
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=f"Here is what I found:\n{str(last.content)[:500]}")
+        return AIMessage(content="OK.")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+
+class StepTimer(BaseCallbackHandler):
+    """Collects the duration of every graph node and tool run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self._started: Dict[Any, tuple] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        name = kwargs.get("name")
+        if metadata and name and name == metadata.get("langgraph_node"):
+            self._started[run_id] = (f"node:{name}", time.perf_counter())
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._started[run_id] = (f"tool:{kwargs.get('name') or serialized.get('name')}", time.perf_counter())
+
+    def _end(self, run_id):
+        started = self._started.pop(run_id, None)
+        if started:
+            key, at = started
+            self.samples.setdefault(key, []).append(time.perf_counter() - at)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+
+_step_timer: ContextVar[Optional[StepTimer]] = ContextVar("bench_step_timer", default=None)
+register_configure_hook(_step_timer, inheritable=True)
+
+
+def _rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def seed(teams: int, tasks: int, members_per_team: int):
+    """Fills the mock store directly, as if loaded from an existing database."""
+    store = firebase_service.store
+    users = [f"user{i}" for i in range(max(teams * members_per_team, 1))]
+    for i in range(teams):
+        team = f"T{i}"
+        store.create_team(team)
+        for j in range(members_per_team):
+            store.add_member(team, users[(i * members_per_team + j) % len(users)])
+    for i in range(tasks):
+        # Deadlines ascend with i so the deadline index only ever appends
+        store.add_task({
+            "title": f"task {i}", "description": "", "assignee": users[i % len(users)],
+            "status": "completed" if i % 3 == 0 else "pending",
+            "deadline": f"{2000 + i // 100_000}-{1 + i // 10_000 % 10:02d}-{1 + i // 400 % 25:02d}T"
+                        f"{i // 20 % 20:02d}:{i % 20 * 3:02d}:00",
+        })
+    firebase_service.stats.load(store.all_tasks(), store.get_teams())
+    return users
+
+
+def chat_script(teams: int, users: List[str], count: int) -> List[tuple]:
+    """Queries the router does not recognize, each paired with the tool call the fake model makes."""
+    rng = random.Random(0)
+    scenarios = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            team = f"T{rng.randrange(max(teams, 1))}"
+            scenarios.append((f"Could you give me a status update on {team}? ({i})",
+                              {"name": "check_progress", "args": {"team_name": team}}))
+        elif kind == 1:
+            user = rng.choice(users)
+            scenarios.append((f"I'd like to know how {user} has been performing ({i})",
+                              {"name": "get_performance_insights", "args": {"user_id": user}}))
+        else:
+            user = rng.choice(users)
+            scenarios.append((f"Please have {user} draft release notes by 2030-01-01 ({i})",
+                              {"name": "assign_task", "args": {
+                                  "task_description": f"Release notes {i}", "assignee": user,
+                                  "deadline": "2030-01-01T09:00:00"}}))
+    return scenarios
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def at(q):
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {"count": len(ordered), "p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99),
+            "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+async def drive(client: httpx.AsyncClient, requests: List[tuple], concurrency: int) -> Dict[str, Any]:
+    """Sends (method, url, json) requests from `concurrency` workers; returns latency stats."""
+    latencies: List[float] = []
+    errors = 0
+    queue = iter(requests)
+
+    async def worker():
+        nonlocal errors
+        for method, url, body in queue:
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {**_percentiles(latencies), "errors": errors,
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None}
+
+
+async def run(teams=1000, tasks=100_000, members_per_team=5, requests=300, concurrency=16,
+              llm_latency_ms=0.0, endpoints=ENDPOINTS) -> Dict[str, Any]:
+    started = time.perf_counter()
+    users = seed(teams, tasks, members_per_team)
+    seed_seconds = time.perf_counter() - started
+    rss_after_seed = _rss_mb()
+
+    script = chat_script(teams, users, requests)
+    model = ReplayChatModel(script=dict(script), latency=llm_latency_ms / 1000)
+    graph_new.llm = model
+    graph_new.llm_with_tools = model
+    graph_new.app_graph.load()
+
+    rng = random.Random(1)
+    workloads = {
+        "chat": [("POST", "/chat", {"query": query, "user_id": f"bench{i % concurrency}"})
+                 for i, (query, _) in enumerate(script)],
+        "teams": [("GET", "/api/teams", None)] * requests,
+        "member": [("GET", f"/api/member/{rng.choice(users)}", None) for _ in range(requests)],
+    }
+
+    timer = StepTimer()
+    _step_timer.set(timer)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name in endpoints:
+            results[name] = await drive(client, workloads[name], concurrency)
+    _step_timer.set(None)
+
+    return {
+        "revision": _revision(),
+        "params": {"teams": teams, "tasks": tasks, "members_per_team": members_per_team, "requests": requests,
+                   "concurrency": concurrency, "llm_latency_ms": llm_latency_ms},
+        "seed_seconds": round(seed_seconds, 2),
+        "endpoints": results,
+        "steps": {key: _percentiles(samples) for key, samples in sorted(timer.samples.items())},
+        "rss_mb": {"after_seed": rss_after_seed, "peak": _rss_mb()},
+    }
+
+
+def _revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--teams", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--members-per-team", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=300, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated model latency per call")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--out", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(
+        teams=args.teams, tasks=args.tasks, members_per_team=args.members_per_team, requests=args.requests,
+        concurrency=args.concurrency, llm_latency_ms=args.llm_latency_ms,
+        endpoints=[e for e in args.endpoints.split(",") if e],
+    ))
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Cold-start benchmark.
+
+Measures how long `import app.main` takes in a fresh interpreter, then starts
+uvicorn and times the first successful /ready and /api/teams responses:
+
+    python -m benchmarks.bench_startup
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def bench_import(runs=3):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import app.main"], check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def _wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.02)
+    return False
+
+
+def bench_server(timeout=60):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, CALENDAR_OUTBOX_PATH=":memory:", MOCK_STORE_DIR="")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        ready = _wait_for(f"{base}/ready", deadline)
+        ready_ms = (time.perf_counter() - started) * 1000
+        teams = ready and _wait_for(f"{base}/api/teams", deadline)
+        teams_ms = (time.perf_counter() - started) * 1000
+        return {
+            "first_ready_ms": round(ready_ms, 1) if ready else None,
+            "first_teams_ms": round(teams_ms, 1) if teams else None,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    print(json.dumps({"import_ms": round(bench_import(), 1), **bench_server()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
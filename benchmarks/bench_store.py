@@ -0,0 +1,75 @@
+"""
+Microbenchmark for the mock-mode task store.
+
+Compares the indexed MemoryStore against the previous flat-list scan for
+assignee lookup and delete at growing table sizes, and times indexed
+inserts. Indexed lookup cost only grows with the number of matching tasks
+(n / ASSIGNEES), not the table size:
+
+    python -m benchmarks.bench_store
+"""
+import random
+import time
+
+from app.services.store import MemoryStore
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+ASSIGNEES = 1_000
+OPS = 200
+
+
+def _tasks(n):
+    return [
+        {"title": f"task {i}", "assignee": f"User{i % ASSIGNEES}", "status": "pending",
+         "deadline": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}"}
+        for i in range(n)
+    ]
+
+
+def _per_op_us(fn, args):
+    started = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - started) / len(args) * 1e6
+
+
+def bench_list_scan(n):
+    tasks = []
+    for i, task in enumerate(_tasks(n)):
+        task["id"] = f"mock_{i + 1}"
+        tasks.append(task)
+    users = [f"user{random.randrange(ASSIGNEES)}" for _ in range(OPS)]
+    lookup = _per_op_us(lambda u: [t for t in tasks if t.get("assignee", "").lower() == u.lower()], users)
+
+    def delete(task_id):
+        nonlocal tasks
+        tasks = [t for t in tasks if t.get("id") != task_id]
+
+    delete_us = _per_op_us(delete, [f"mock_{i}" for i in random.sample(range(1, n + 1), OPS)])
+    return lookup, delete_us
+
+
+def bench_indexed(n):
+    store = MemoryStore()
+    for task in _tasks(n):
+        store.add_task(task)
+    users = [f"user{random.randrange(ASSIGNEES)}" for _ in range(OPS)]
+    lookup = _per_op_us(store.tasks_for, users)
+    delete_us = _per_op_us(store.delete_task, [f"mock_{i}" for i in random.sample(range(1, n + 1), OPS)])
+    insert_us = _per_op_us(store.add_task, random.sample(_tasks(n), OPS))
+    return lookup, delete_us, insert_us
+
+
+def main():
+    print(f"{'tasks':>8} | {'scan lookup':>12} {'scan delete':>12} | "
+          f"{'index lookup':>12} {'index delete':>12} {'index insert':>12}  (us/op)")
+    for n in SIZES:
+        # The flat list is only measured up to 100k tasks; beyond that it takes minutes
+        scan = bench_list_scan(n) if n <= 100_000 else (float("nan"), float("nan"))
+        indexed = bench_indexed(n)
+        print(f"{n:>8} | {scan[0]:>12.1f} {scan[1]:>12.1f} | "
+              f"{indexed[0]:>12.1f} {indexed[1]:>12.1f} {indexed[2]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
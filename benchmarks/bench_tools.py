@@ -0,0 +1,135 @@
+"""
+Benchmark for per-request tool selection.
+
+Runs a labelled set of chat requests through the ToolSelector and reports
+the prompt tokens of one agent call with every tool offered versus the
+selected subset. It also reports how often the tool the request needs was
+offered (recall), the fallback rate and the selection overhead:
+
+    python -m benchmarks.bench_tools
+    python -m benchmarks.bench_tools --live   # also time real calls to the configured LLM
+
+Offline token counts are approximate (about 4 characters per token). With
+--live, tokens come from the provider's reported usage and latency is
+measured end to end.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("CALENDAR_OUTBOX_PATH", ":memory:")
+os.environ.setdefault("MOCK_STORE_DIR", "")
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.agents import graph_new
+from app.agents.context import count_tokens
+
+SYSTEM_PROMPT = ("You are TrackUp Buddy, an intelligent project management assistant. Today's date is 2026-01-01. "
+                 "When assigning tasks, use this date as reference. When asked about team status, provide "
+                 "detailed breakdowns.")
+
+# (request, the tool it needs or None when no tool is needed)
+REQUESTS = [
+    ("Assign the quarterly report to Alice with a deadline of next Friday", "assign_task"),
+    ("Please have Carol draft the release notes by 2030-01-01", "assign_task"),
+    ("Give Bob the login bug ticket, due Monday", "assign_task"),
+    ("Could you give me a status update on the Apollo team?", "check_progress"),
+    ("How is the platform squad getting on this week?", "check_progress"),
+    ("Show me a breakdown of where team Zeus stands", "check_progress"),
+    ("I'd like to know how Bob has been performing", "get_performance_insights"),
+    ("What's Dave's throughput and lead time lately?", "get_performance_insights"),
+    ("Is Erin overdue on much? Give me her productivity stats", "get_performance_insights"),
+    ("I finished task mock_12, please mark it done", "update_task_status"),
+    ("Task mock_7 is in progress now", "update_task_status"),
+    ("Remind me about task mock_3 tomorrow at 9am", "set_reminder"),
+    ("Ping the assignee of mock_9 a day before it's due", "set_reminder"),
+    ("Set up a new squad called Hermes", "create_team"),
+    ("Form a group for the mobile rewrite named Mobile", "create_team"),
+    ("Put Frank on the platform team", "add_team_member"),
+    ("Onboard Grace into the Apollo squad", "add_team_member"),
+    ("Disband the Apollo group", "delete_team"),
+    ("Kick Eve out of Apollo", "remove_team_member"),
+    ("Offboard Heidi from the Zeus team", "remove_team_member"),
+    ("Cancel ticket mock_4, it's no longer needed", "delete_task"),
+    ("Send the Q3 slides to Alice and Bob", "share_document"),
+    ("Share the design spec with the whole Apollo team", "share_document"),
+    ("What's the best Python library for parsing PDFs?", "research_technical_question"),
+    ("Why does my FastAPI app throw a 422 error on file upload?", "research_technical_question"),
+    ("Compare Postgres and MongoDB for an analytics workload", "research_technical_question"),
+    ("Hello!", None),
+    ("Thanks, that's all for now", None),
+    ("Yes, go ahead", None),
+]
+
+
+def _messages(request):
+    return [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=request)]
+
+
+def offline():
+    selector = graph_new.tool_selector
+    full_tokens, selected_tokens, select_us = [], [], []
+    hits = needed = fallbacks = 0
+    for request, expected in REQUESTS:
+        messages = _messages(request)
+        started = time.perf_counter()
+        subset = selector.select(messages)
+        select_us.append((time.perf_counter() - started) * 1e6)
+        base = count_tokens(messages)
+        full_tokens.append(base + selector.schema_tokens())
+        selected_tokens.append(base + selector.schema_tokens(subset))
+        fallbacks += subset is None
+        if expected:
+            needed += 1
+            hits += subset is None or expected in {tool.name for tool in subset}
+    full, selected = statistics.mean(full_tokens), statistics.mean(selected_tokens)
+    return {
+        "requests": len(REQUESTS),
+        "input_tokens_per_call": {"all_tools": round(full), "selected": round(selected),
+                                  "reduction_pct": round(100 * (1 - selected / full), 1)},
+        "recall": round(hits / needed, 3),
+        "fallback_rate": round(fallbacks / len(REQUESTS), 3),
+        "selection_us": {"p50": round(statistics.median(select_us), 1), "max": round(max(select_us), 1)},
+    }
+
+
+async def live(repeats: int):
+    model = graph_new.llm_with_tools.load()
+    selector = graph_new.tool_selector
+    results = {"all_tools": {"latency": [], "tokens": []}, "selected": {"latency": [], "tokens": []}}
+    for _ in range(repeats):
+        for request, _ in REQUESTS:
+            messages = _messages(request)
+            subset = selector.select(messages)
+            variants = {"all_tools": {}, "selected": {"tools": selector.schemas(subset)} if subset else {}}
+            for name, overrides in variants.items():
+                started = time.perf_counter()
+                response = await model.ainvoke(messages, **overrides)
+                results[name]["latency"].append(time.perf_counter() - started)
+                usage = response.usage_metadata or {}
+                results[name]["tokens"].append(usage.get("input_tokens", 0))
+    return {
+        name: {"input_tokens_mean": round(statistics.mean(r["tokens"])),
+               "latency_p50_ms": round(statistics.median(r["latency"]) * 1000, 1),
+               "latency_mean_ms": round(statistics.mean(r["latency"]) * 1000, 1)}
+        for name, r in results.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--live", action="store_true", help="also call the configured LLM")
+    parser.add_argument("--repeats", type=int, default=1, help="passes over the requests in --live mode")
+    args = parser.parse_args(argv)
+    report = {"offline": offline()}
+    if args.live:
+        report["live"] = asyncio.run(live(args.repeats))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark for streamed document uploads.
+
+Streams a generated file of --size-gb through POST /api/documents (in
+process, over ASGI) to a local storage backend and reports throughput and
+how much the process's peak RSS grew, which should stay at a few chunks
+whatever the file size:
+
+    python -m benchmarks.bench_upload --size-gb 4
+    python -m benchmarks.bench_upload --size-gb 4 --transport gcs   # resumable-protocol PUTs to a local endpoint
+
+`fake` is the mock-mode backend; `gcs` runs the real Cloud Storage
+transport against an in-process endpoint that speaks the resumable upload
+protocol and discards the bytes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import time
+
+os.environ.setdefault("CALENDAR_OUTBOX_PATH", ":memory:")
+os.environ.setdefault("MOCK_STORE_DIR", "")
+
+import httpx
+
+from app import main
+from app.core.config import settings
+from app.services.documents import DocumentService, FakeStorageTransport, GCSStorageTransport
+
+PIECE = 64 * 1024
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _gcs_transport() -> GCSStorageTransport:
+    committed = {"size": 0}
+
+    def handler(request: httpx.Request):
+        start, end, total = re.match(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)", request.headers["content-range"]).groups()
+        if start is not None:
+            committed["size"] += sum(len(piece) for piece in request.stream)
+        if total != "*" and committed["size"] == int(total):
+            return httpx.Response(200)
+        return httpx.Response(308, headers={"Range": f"bytes=0-{committed['size'] - 1}"})
+
+    class Blob:
+        def create_resumable_upload_session(self, content_type):
+            return "https://storage.local/upload/session"
+
+    class Bucket:
+        def blob(self, name):
+            return Blob()
+
+    return GCSStorageTransport(Bucket(), http=httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+async def run(size: int, transport_name: str):
+    transport = FakeStorageTransport() if transport_name == "fake" else _gcs_transport()
+    service = DocumentService(transport, chunk_size=settings.DOCUMENT_CHUNK_SIZE,
+                              max_pending_chunks=settings.DOCUMENT_MAX_PENDING_CHUNKS)
+    main.document_service = service
+    block = os.urandom(PIECE)
+
+    async def body():
+        for _ in range(size // PIECE):
+            yield block
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        response = await client.post("/api/documents", params={"name": "bench.bin"}, content=body())
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    result = response.json()
+    return {
+        "transport": transport_name,
+        "size_mb": round(result["uploaded"] / 2 ** 20),
+        "chunks": result["chunks"],
+        "chunk_mb": service.chunk_size / 2 ** 20,
+        "seconds": round(elapsed, 2),
+        "throughput_mb_s": round(result["uploaded"] / 2 ** 20 / elapsed, 1),
+        "peak_rss_growth_mb": round(_peak_rss_mb() - baseline, 1),
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size-gb", type=float, default=2.0, help="size of the generated file")
+    parser.add_argument("--transport", choices=("fake", "gcs"), default="fake")
+    args = parser.parse_args(argv)
+    size = int(args.size_gb * 2 ** 30) // PIECE * PIECE
+    print(json.dumps(asyncio.run(run(size, args.transport)), indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
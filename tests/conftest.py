@@ -0,0 +1,307 @@
+import asyncio
+import itertools
+import json
+import os
+import types
+from typing import Any, Callable, List, Optional, Union
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Keep test runs from writing local state files into the repository
+os.environ.setdefault("CALENDAR_OUTBOX_PATH", ":memory:")
+os.environ.setdefault("MOCK_STORE_DIR", "")
+
+from app.agents import graph_new
+from app.core.cache import read_cache
+from app.services.firebase import firebase_service
+from app.services.stats import StatsStore
+from app.services.store import MemoryStore
+
+Reply = Union[AIMessage, Callable[[List[BaseMessage]], AIMessage]]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic stand-in for the LLM: replays scripted replies in order."""
+
+    replies: List[Any]
+    delay: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _next(self, messages: List[BaseMessage]) -> AIMessage:
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        return reply(messages) if callable(reply) else reply.model_copy()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._next(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._next(messages))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        message = self._next(messages)
+        # Emit content word by word, then tool calls in a final chunk.
+        words = message.content.split(" ") if message.content else []
+        for i, word in enumerate(words):
+            token = word if i == len(words) - 1 else word + " "
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(message.tool_calls)
+                ],
+            ))
+
+
+@pytest.fixture(autouse=True)
+def _empty_read_cache():
+    # Fixtures swap whole stores without a write, which the data version cannot see
+    read_cache.clear()
+    yield
+    read_cache.clear()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Swaps the graph's tool-bound model for a scripted one."""
+
+    def install(*replies: Reply, delay: float = 0.0) -> ScriptedChatModel:
+        model = ScriptedChatModel(replies=list(replies) or [AIMessage(content="ok")], delay=delay)
+        monkeypatch.setattr(graph_new, "llm_with_tools", model)
+        return model
+
+    return install
+
+
+@pytest.fixture
+def mock_store(monkeypatch):
+    """Gives the shared FirebaseService an empty mock-mode store."""
+    store = MemoryStore()
+    monkeypatch.setattr(firebase_service, "store", store)
+    monkeypatch.setattr(firebase_service, "stats", StatsStore())
+    return store
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocRef:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self):
+        return FakeDoc(self.id, self._collection.docs.get(self.id))
+
+    def set(self, data):
+        change = "MODIFIED" if self.id in self._collection.docs else "ADDED"
+        self._collection.docs[self.id] = dict(data)
+        self._collection.changed(change, self.id)
+
+    def update(self, changes):
+        data = self._collection.docs[self.id]
+        for key, value in changes.items():
+            # ArrayUnion / ArrayRemove transforms carry their operands in `.values`
+            if type(value).__name__ == "ArrayUnion":
+                data[key] = data.get(key, []) + [v for v in value.values if v not in data.get(key, [])]
+            elif type(value).__name__ == "ArrayRemove":
+                data[key] = [v for v in data.get(key, []) if v not in value.values]
+            else:
+                data[key] = value
+        self._collection.changed("MODIFIED", self.id)
+
+    def delete(self):
+        if self._collection.docs.pop(self.id, None) is not None:
+            self._collection.changed("REMOVED", self.id, removed=True)
+
+
+class FakeQuery:
+    def __init__(self, collection, filters=(), orders=(), after=None, limit=None, fields=None):
+        self._collection = collection
+        self._filters = filters
+        self._orders = orders
+        self._after = after
+        self._limit = limit
+        self._fields = fields
+
+    def _with(self, **changes):
+        args = {"filters": self._filters, "orders": self._orders, "after": self._after, "limit": self._limit,
+                "fields": self._fields, **changes}
+        return FakeQuery(self._collection, **args)
+
+    def where(self, filter):
+        return self._with(filters=self._filters + (filter,))
+
+    def order_by(self, field):
+        return self._with(orders=self._orders + (field,))
+
+    def start_after(self, values):
+        return self._with(after=tuple(values[field] for field in self._orders))
+
+    def limit(self, count):
+        return self._with(limit=count)
+
+    def select(self, fields):
+        return self._with(fields=list(fields))
+
+    def count(self, alias=None):
+        query = self
+
+        class Aggregation:
+            def get(self):
+                value = sum(1 for _ in query.stream())
+                return [[types.SimpleNamespace(alias=alias, value=value)]]
+
+        return Aggregation()
+
+    def _key(self, doc_id, data):
+        return tuple(doc_id if field == "__name__" else data.get(field) for field in self._orders)
+
+    def stream(self):
+        self._collection.queries.append(self._filters)
+        docs = [(doc_id, data) for doc_id, data in list(self._collection.docs.items())
+                if all(_matches(data, f) for f in self._filters)]
+        if self._orders:
+            docs.sort(key=lambda doc: self._key(*doc))
+        if self._after is not None:
+            docs = [doc for doc in docs if self._key(*doc) > self._after]
+        for doc_id, data in docs[:self._limit]:
+            yield FakeDoc(doc_id, {k: v for k, v in data.items() if k in self._fields} if self._fields else data)
+
+
+class FakeChange:
+    def __init__(self, kind, doc):
+        self.type = types.SimpleNamespace(name=kind)
+        self.document = doc
+
+
+class FakeWatch:
+    def __init__(self, collection, callback):
+        self._collection = collection
+        self.callback = callback
+
+    def unsubscribe(self):
+        self._collection.watches.remove(self)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self):
+        super().__init__(self)
+        self.docs = {}
+        self.queries = []
+        self._ids = itertools.count(1)
+        # Snapshot listeners; set hold_snapshots to queue changes until deliver()
+        self.watches = []
+        self.hold_snapshots = False
+        self._pending = []
+
+    def on_snapshot(self, callback):
+        watch = FakeWatch(self, callback)
+        self.watches.append(watch)
+        callback([], [FakeChange("ADDED", FakeDoc(i, d)) for i, d in self.docs.items()], None)
+        return watch
+
+    def changed(self, kind, doc_id, removed=False):
+        if not self.watches:
+            return
+        self._pending.append(FakeChange(kind, FakeDoc(doc_id, None if removed else self.docs[doc_id])))
+        if not self.hold_snapshots:
+            self.deliver()
+
+    def deliver(self):
+        changes, self._pending = self._pending, []
+        for watch in list(self.watches):
+            watch.callback([], changes, None)
+
+    def document(self, doc_id=None):
+        return FakeDocRef(self, doc_id or f"doc_{next(self._ids)}")
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, ref, data):
+        self._writes.append((ref.set, data))
+
+    def update(self, ref, changes):
+        self._writes.append((ref.update, changes))
+
+    def commit(self):
+        if self._db.fail_commits:
+            self._db.fail_commits -= 1
+            raise RuntimeError("commit failed")
+        self._db.commits.append(len(self._writes))
+        for write, data in self._writes:
+            write(data)
+
+
+class FakeFirestore:
+    """Minimal in-memory stand-in for the Firestore client API FirebaseService uses."""
+
+    def __init__(self):
+        self.collections = {}
+        # Sizes of committed write batches, and how many upcoming commits should fail
+        self.commits = []
+        self.fail_commits = 0
+
+    def collection(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def get_all(self, refs):
+        return [ref.get() for ref in refs]
+
+
+def _matches(data, f):
+    value = data.get(f.field_path)
+    if f.op_string == "==":
+        return value == f.value
+    if f.op_string == "in":
+        return value in f.value
+    if f.op_string in (">=", "<"):
+        return isinstance(value, str) and (value >= f.value if f.op_string == ">=" else value < f.value)
+    raise NotImplementedError(f.op_string)
+
+
+@pytest.fixture
+def fake_firestore(monkeypatch):
+    """Puts the shared FirebaseService into Firestore mode against a fake client."""
+    db = FakeFirestore()
+    monkeypatch.setattr(firebase_service, "db", db)
+    monkeypatch.setattr(firebase_service, "initialized", True)
+    monkeypatch.setattr(firebase_service, "stats", StatsStore())
+    monkeypatch.setattr(firebase_service, "_stats_loaded", False)
+    monkeypatch.setattr(firebase_service, "replica", None)
+    return db
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse
+from langchain_core.messages import AIMessage
+from langchain_openai import ChatOpenAI
+
+from app.agents import graph_new
+from app.core.admission import AdmissionRejected, LLMAdmission
+from app.main import app
+
+
+def _fake_openai(failures):
+    """OpenAI-compatible chat completions endpoint that fails with each (status, headers) in turn, then answers."""
+    api = FastAPI()
+    calls = []
+
+    @api.post("/v1/chat/completions")
+    async def completions(body: dict = Body(...)):
+        calls.append({"at": time.monotonic(), "body": body})
+        if failures:
+            status, headers = failures.pop(0)
+            return JSONResponse({"error": {"message": "Too many requests", "type": "rate_limit_exceeded"}},
+                                status_code=status, headers=headers)
+        return {
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "pong"}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 1, "total_tokens": 13},
+        }
+
+    model = ChatOpenAI(
+        model="gpt-4o", api_key="test", base_url="http://fake-openai/v1", max_retries=0,
+        http_async_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://fake-openai/v1"),
+    )
+    return model, calls
+
+
+async def _chat(user_id="admission-user", query="ping"):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/chat", json={"query": query, "user_id": user_id})
+
+
+def test_chat_waits_out_upstream_retry_after(monkeypatch):
+    model, calls = _fake_openai([(429, {"retry-after": "0.2"}), (503, {})])
+    monkeypatch.setattr(graph_new, "llm_with_tools", model)
+    monkeypatch.setattr(graph_new, "llm_admission", LLMAdmission(max_retries=3, base_delay=0.05))
+
+    response = asyncio.run(_chat())
+    assert response.status_code == 200
+    assert response.json()["response"] == "pong"
+    assert len(calls) == 3
+    assert calls[1]["at"] - calls[0]["at"] >= 0.2
+
+
+def test_upstream_rate_limit_becomes_http_429(monkeypatch):
+    model, calls = _fake_openai([(429, {"retry-after": "0"})] * 3)
+    monkeypatch.setattr(graph_new, "llm_with_tools", model)
+    monkeypatch.setattr(graph_new, "llm_admission", LLMAdmission(max_retries=2))
+
+    response = asyncio.run(_chat())
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["reason"] == "upstream_429"
+    assert len(calls) == 3
+
+
+def test_quota_rejects_instead_of_queueing_past_max_wait(monkeypatch, fake_llm):
+    fake_llm(AIMessage(content="hello"))
+    # Two requests per minute: the third would wait ~30s
+    monkeypatch.setattr(graph_new, "llm_admission", LLMAdmission(rpm=2, max_wait=5))
+
+    assert asyncio.run(_chat("quota-1")).status_code == 200
+    assert asyncio.run(_chat("quota-2")).status_code == 200
+    response = asyncio.run(_chat("quota-3"))
+    assert response.status_code == 429
+    assert 25 <= int(response.headers["Retry-After"]) <= 31
+    assert response.json()["reason"] == "wait_too_long"
+
+
+def test_full_queue_is_rejected_with_503():
+    admission = LLMAdmission(rpm=1, max_wait=3600, max_queue=1)
+
+    async def scenario():
+        async def llm():
+            return "ok"
+
+        assert await admission.call(llm) == "ok"
+        waiting = asyncio.create_task(admission.call(llm))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.call(llm)
+        waiting.cancel()
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.queue_depth == 1
+    assert admission.waiting == 0
+
+
+def test_turns_of_one_conversation_run_in_order(fake_llm):
+    delay = 0.2
+    fake_llm(lambda messages: AIMessage(content=f"seen {len(messages)}"), delay=delay)
+
+    async def scenario():
+        return await asyncio.gather(_chat("serial-user", "first"), _chat("serial-user", "second"))
+
+    started = time.perf_counter()
+    responses = asyncio.run(scenario())
+    assert time.perf_counter() - started >= 2 * delay
+    # The second turn saw the first turn's messages
+    assert sorted(r.json()["response"] for r in responses) == ["seen 2", "seen 4"]
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import httpx
+from langchain_core.messages import AIMessage
+
+from app.main import app
+
+LLM_DELAY = 0.3
+
+
+async def _post_chats(n: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*[
+            client.post("/chat", json={"query": "hi", "user_id": f"async-user-{i}"})
+            for i in range(n)
+        ])
+
+
+def test_concurrent_chats_do_not_serialize(fake_llm):
+    fake_llm(AIMessage(content="hello"), delay=LLM_DELAY)
+
+    started = time.perf_counter()
+    responses = asyncio.run(_post_chats(8))
+    elapsed = time.perf_counter() - started
+
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["response"] == "hello" for r in responses)
+    # Eight chats should take about as long as one, not eight times as long.
+    assert elapsed < LLM_DELAY * 2
+
+
+def test_dashboard_stays_responsive_during_chat(fake_llm):
+    fake_llm(AIMessage(content="hello"), delay=LLM_DELAY)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            chat = asyncio.create_task(client.post("/chat", json={"query": "hi", "user_id": "slow-user"}))
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            teams = await client.get("/api/teams")
+            teams_elapsed = time.perf_counter() - started
+            await chat
+            return teams, teams_elapsed
+
+    teams, teams_elapsed = asyncio.run(scenario())
+    assert teams.status_code == 200
+    assert teams_elapsed < LLM_DELAY / 2
+
+
+def test_async_tools_run_through_graph(fake_llm):
+    fake_llm(
+        AIMessage(content="", tool_calls=[{"name": "create_team", "args": {"team_name": "AsyncTeam"}, "id": "call_1"}]),
+        lambda messages: AIMessage(content=messages[-1].content),
+    )
+
+    responses = asyncio.run(_post_chats(1))
+
+    assert responses[0].json()["response"] == "Team 'AsyncTeam' created successfully."
@@ -0,0 +1,19 @@
+import asyncio
+
+from app.agents import graph_new
+from benchmarks import bench_load
+
+
+def test_load_harness_reports_latency_and_steps(mock_store, monkeypatch):
+    # run() installs its fake model on the module; restore the originals afterwards
+    monkeypatch.setattr(graph_new, "llm", graph_new.llm)
+    monkeypatch.setattr(graph_new, "llm_with_tools", graph_new.llm_with_tools)
+
+    report = asyncio.run(bench_load.run(teams=5, tasks=50, requests=6, concurrency=2))
+
+    assert set(report["endpoints"]) == {"chat", "teams", "member"}
+    for stats in report["endpoints"].values():
+        assert stats["count"] == 6 and stats["errors"] == 0
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    assert {"node:agent", "node:tools", "tool:check_progress"} <= set(report["steps"])
+    assert report["rss_mb"]["peak"] > 0
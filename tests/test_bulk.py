@@ -0,0 +1,99 @@
+import datetime
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.firebase import FIRESTORE_BATCH_LIMIT, firebase_service
+from app.services.scheduler import reminder_engine
+
+client = TestClient(app)
+
+
+def test_bulk_import_reports_per_item_results(mock_store):
+    response = client.post("/api/tasks/bulk", json=[
+        {"title": "Spec", "description": "Write spec", "assignee": "Alice", "deadline": "2026-01-01"},
+        {"title": "No description"},
+        {"id": "mock_1", "title": "Imported", "description": "Keeps its ID", "assignee": "Bob"},
+    ])
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [r["index"] for r in body["results"]] == [0, 1, 2]
+    assert body["results"][1]["ok"] is False and "description" in body["results"][1]["error"]
+    assert body["results"][2]["id"] == "mock_1"
+    # The generated ID skips the imported one
+    assert body["results"][0]["id"] == "mock_2"
+    assert mock_store.get_task("mock_1")["title"] == "Imported"
+
+
+def test_bulk_import_replaces_tasks_with_known_ids(mock_store):
+    task_id = firebase_service.store.add_task({"title": "Old", "assignee": "Alice", "status": "pending"})["id"]
+    client.post("/api/tasks/bulk", json=[
+        {"id": task_id, "title": "New", "description": "", "assignee": "Bob", "status": "completed"}])
+
+    assert [t["title"] for t in mock_store.tasks_for("Bob")] == ["New"]
+    assert mock_store.tasks_for("Alice") == []
+
+
+@pytest.mark.parametrize("backend", ["mock_store", "fake_firestore"])
+def test_import_replaces_whole_tasks_and_reports_new_ids_as_added(backend, request):
+    request.getfixturevalue(backend)
+    firebase_service.add_tasks([{"id": "t1", "title": "Old", "assignee": "Alice", "deadline": "2026-01-01"}])
+    events = []
+    firebase_service.add_listener(lambda event, task: events.append((event, task["id"])))
+    try:
+        firebase_service.add_tasks([{"id": "t1", "title": "New", "assignee": "Alice"},
+                                    {"id": "t2", "title": "Fresh", "assignee": "Alice"}])
+    finally:
+        firebase_service._listeners.pop()
+
+    assert events == [("task_updated", "t1"), ("task_added", "t2")]
+    # Fields left out of the import do not survive from the old task
+    assert "deadline" not in firebase_service.get_task("t1")
+
+
+def test_reimport_with_a_moved_deadline_reminds_once_at_the_new_time(mock_store):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    task = {"title": "Ship", "description": "", "assignee": "Alice", "status": "pending",
+            "deadline": (now + datetime.timedelta(days=3)).isoformat()}
+    task_id = client.post("/api/tasks/bulk", json=[task]).json()["results"][0]["id"]
+    new_deadline = now + datetime.timedelta(days=10)
+    client.post("/api/tasks/bulk", json=[{**task, "id": task_id, "deadline": new_deadline.isoformat()}])
+
+    sent = [r for day in (2.5, 9.5) for r in reminder_engine.run_due(now + datetime.timedelta(days=day))
+            if r["task_id"] == task_id]
+    assert [(r["label"], r["fire_at"]) for r in sent] == [("24h before", new_deadline - datetime.timedelta(hours=24))]
+    reminder_engine.cancel_task(task_id)
+
+
+def test_export_streams_ndjson(mock_store):
+    firebase_service.add_task({"title": "A", "assignee": "Alice", "status": "pending"})
+    firebase_service.add_task({"title": "B", "assignee": "Bob", "status": "pending"})
+
+    response = client.get("/api/tasks/export")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == ["A", "B"]
+
+    response = client.get("/api/tasks/export", params={"assignee": "Bob"})
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == ["B"]
+
+
+def test_firestore_import_uses_write_batches(fake_firestore):
+    tasks = [{"title": f"t{i}", "description": "", "assignee": "Alice"} for i in range(FIRESTORE_BATCH_LIMIT + 10)]
+    fake_firestore.fail_commits = 1
+
+    results = firebase_service.add_tasks(tasks)
+
+    # The first chunk fails as a unit; the second commits
+    assert fake_firestore.commits == [10]
+    assert [r["ok"] for r in results].count(False) == FIRESTORE_BATCH_LIMIT
+    assert all(r["ok"] for r in results[FIRESTORE_BATCH_LIMIT:])
+    assert len(fake_firestore.collection("tasks").docs) == 10
+
+
+def test_bulk_import_rejects_oversized_requests(mock_store, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "BULK_MAX_TASKS", 1)
+    response = client.post("/api/tasks/bulk", json=[{"title": "a", "description": ""}] * 2)
+    assert response.status_code == 413
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.agents.tools import check_progress
+from app.core.cache import ResultCache, read_cache
+from app.main import app
+from app.services.firebase import FirebaseService, firebase_service
+from app.services.shared_store import SharedStore
+
+from tests.test_replica import _start_replica
+
+client = TestClient(app)
+
+
+def test_polling_gets_304_until_a_write(mock_store):
+    firebase_service.create_team("Apollo")
+    firebase_service.add_member("Apollo", "Alice")
+
+    before = read_cache.stats()
+    first = client.get("/api/member/Alice")
+    etag = first.headers["ETag"]
+    assert first.json()["total_tasks"] == 0
+    unchanged = client.get("/api/member/Alice", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert read_cache.stats()["hits"] == before["hits"] + 1
+
+    firebase_service.add_task({"title": "Spec", "assignee": "Alice", "status": "pending"})
+    changed = client.get("/api/member/Alice", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["total_tasks"] == 1
+    assert changed.headers["ETag"] != etag
+    assert read_cache.stats()["invalidations"] == before["invalidations"] + 1
+
+    assert client.get("/api/teams/Zeus/stats").status_code == 404
+
+
+def test_stale_results_are_never_served_after_a_write(mock_store):
+    firebase_service.create_team("Apollo")
+    firebase_service.add_member("Apollo", "Alice")
+    ids, hits = [], read_cache.stats()["hits"]
+    for i in range(20):
+        # Every write is visible to the very next read of each cached route and tool
+        ids.append(firebase_service.add_task({"title": f"T{i}", "assignee": "Alice", "status": "pending"}))
+        assert client.get("/api/member/Alice").json()["total_tasks"] == i + 1
+        assert client.get("/api/teams/Apollo/stats").json()["total"] == i + 1
+        assert f"0/{i + 1} tasks completed" in asyncio.run(check_progress.ainvoke({"team_name": "Apollo"}))
+        assert asyncio.run(check_progress.ainvoke({"team_name": "Apollo"})) \
+            == asyncio.run(check_progress.ainvoke({"team_name": "Apollo"}))
+    firebase_service.update_task_status(ids[0].split()[-1], "completed")
+    assert "1/20 tasks completed" in asyncio.run(check_progress.ainvoke({"team_name": "Apollo"}))
+    firebase_service.add_member("Apollo", "Bob")
+    assert client.get("/api/teams").json() == {"Apollo": ["Alice", "Bob"]}
+    assert read_cache.stats()["hits"] - hits >= 20
+
+
+def test_read_racing_a_write_is_not_cached_under_the_new_version(mock_store, monkeypatch):
+    entered, release = threading.Event(), threading.Event()
+    upsert = firebase_service.stats.upsert_task
+
+    def slow_upsert(task, *args):
+        entered.set()
+        release.wait(5)
+        upsert(task, *args)
+
+    monkeypatch.setattr(firebase_service.stats, "upsert_task", slow_upsert)
+    writer = threading.Thread(target=firebase_service.add_task,
+                              args=({"title": "Spec", "assignee": "Alice", "status": "pending"},))
+    writer.start()
+    assert entered.wait(5)
+    # Stored but not yet in the stats
+    assert client.get("/api/member/Alice").json()["total_tasks"] == 0
+    release.set()
+    writer.join(5)
+    assert client.get("/api/member/Alice").json()["total_tasks"] == 1
+
+
+def test_replica_shows_a_team_write_before_its_version_moves(fake_firestore, monkeypatch):
+    _start_replica(fake_firestore)
+    fake_firestore.collection("teams").hold_snapshots = True
+    seen = []
+    changed = firebase_service._changed
+
+    def record():
+        # What a read racing the write would compute and cache under the new version
+        seen.append(firebase_service.get_all_teams())
+        changed()
+
+    monkeypatch.setattr(firebase_service, "_changed", record)
+    firebase_service.create_team("Zeus")
+    firebase_service.add_member("Zeus", "Bob")
+    firebase_service.remove_member("Apollo", "Alice")
+    firebase_service.delete_team("Zeus")
+    assert seen == [{"Apollo": ["Alice"], "Zeus": []}, {"Apollo": ["Alice"], "Zeus": ["Bob"]},
+                    {"Apollo": [], "Zeus": ["Bob"]}, {"Apollo": []}]
+
+
+def test_result_computed_during_a_write_is_not_reused():
+    cache = ResultCache()
+    data = {"version": 1, "value": "old"}
+
+    async def compute_while_writing():
+        value = data["value"]
+        # A write lands after the read but before the result is stored
+        data.update(version=2, value="new")
+        return value
+
+    async def scenario():
+        stale = await cache.get_or_compute("k", 1, compute_while_writing)
+
+        async def compute():
+            return data["value"]
+
+        return stale, await cache.get_or_compute("k", data["version"], compute)
+
+    assert asyncio.run(scenario()) == ("old", "new")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_version_follows_other_workers_and_the_replica(tmp_path, fake_firestore):
+    # Not synced yet: writes could land unseen, so nothing is cached
+    assert firebase_service.data_version() is None
+    tasks = _start_replica(fake_firestore)
+    before = firebase_service.data_version()
+    tasks.document("t2").set({"title": "Build", "assignee": "Alice", "status": "pending"})
+    fake_firestore.collection("teams").document("Zeus").set({"members": []})
+    assert firebase_service.data_version() == before + 2
+
+    worker = FirebaseService()
+    worker.store = SharedStore(str(tmp_path / "shared.sqlite"), poll_interval=60)
+    worker.store.on_change = worker._on_shared_change
+    other = SharedStore(str(tmp_path / "shared.sqlite"), poll_interval=60)
+    try:
+        before = worker.data_version()
+        other.create_team("Apollo")
+        assert worker.data_version() > before
+    finally:
+        worker.store.close()
+        other.close()
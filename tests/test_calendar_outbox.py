@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+from app.agents.tools import assign_task
+from app.services.calendar import calendar_service
+from app.services.firebase import firebase_service
+from app.services.calendar_outbox import BATCH_SIZE, CalendarOutbox, FakeCalendarTransport
+
+
+def _outbox(transport, **kwargs):
+    return CalendarOutbox(":memory:", transport, **kwargs)
+
+
+def test_events_are_flushed_in_batches():
+    transport = FakeCalendarTransport()
+    outbox = _outbox(transport)
+    for i in range(BATCH_SIZE + 10):
+        assert outbox.enqueue(f"t{i}", f"Task {i}", "2026-05-01T09:00:00", "2026-05-01T09:00:00") == "pending"
+
+    assert outbox.flush() == BATCH_SIZE + 10
+    assert [len(batch) for batch in transport.batches] == [BATCH_SIZE, 10]
+    assert outbox.counts() == {"synced": BATCH_SIZE + 10}
+    status = outbox.status("t0")
+    assert status["status"] == "synced" and status["html_link"].startswith("https://calendar.local/")
+
+
+def test_transient_failures_retry_with_backoff_and_same_event_id():
+    transport = FakeCalendarTransport()
+    outbox = _outbox(transport, base_backoff=10)
+    outbox.enqueue("t1", "Task", "2026-05-01T09:00:00", "2026-05-01T09:00:00")
+    body_id = outbox._db.execute("SELECT event_id FROM calendar_outbox").fetchone()[0]
+    transport.failures[body_id] = [{"retryable": True, "error": "503 backend error"}]
+
+    now = time.time()
+    outbox.flush(now)
+    assert outbox.status("t1")["status"] == "pending"
+    assert outbox.status("t1")["last_error"] == "503 backend error"
+
+    assert outbox.flush(now + 1) == 0  # still backing off
+    assert outbox.flush(now + 11) == 1
+    assert outbox.status("t1")["status"] == "synced"
+    assert transport.batches == [[body_id], [body_id]]
+
+
+def test_permanent_failures_and_unparseable_deadlines():
+    transport = FakeCalendarTransport()
+    outbox = _outbox(transport, max_attempts=2, base_backoff=0)
+    outbox.enqueue("bad", "Task", "2026-05-01", "2026-05-01")
+    event_id = outbox._db.execute("SELECT event_id FROM calendar_outbox").fetchone()[0]
+    transport.failures[event_id] = [{"retryable": False, "error": "400 invalid"}]
+
+    assert outbox.enqueue("vague", "Task", "next Friday", "next Friday") == "skipped"
+    outbox.flush()
+
+    assert outbox.status("bad")["status"] == "failed"
+    assert outbox.status("vague")["status"] == "skipped"
+    assert transport.batches == [[event_id]]
+
+
+def test_background_worker_syncs_queued_events():
+    transport = FakeCalendarTransport()
+    outbox = _outbox(transport, interval=10)
+    outbox.start()
+    try:
+        outbox.enqueue("t1", "Task", "2026-05-01T09:00:00", "2026-05-01T10:00:00")
+        deadline = time.time() + 2
+        while outbox.status("t1")["status"] != "synced" and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        outbox.stop()
+    assert outbox.status("t1")["status"] == "synced"
+
+
+def test_assign_task_returns_before_calendar_sync(mock_store, monkeypatch):
+    transport = FakeCalendarTransport()
+    monkeypatch.setattr(calendar_service, "outbox", _outbox(transport))
+
+    result = asyncio.run(assign_task.ainvoke(
+        {"task_description": "Write report", "assignee": "Alice", "deadline": "2026-05-01T09:00:00"}))
+
+    task_id = mock_store.tasks_for("Alice")[0]["id"]
+    assert result.startswith(f"Task 'Write report' added with ID: {task_id}")
+    assert transport.batches == []
+    assert calendar_service.sync_status(task_id)["status"] == "pending"
+
+    calendar_service.outbox.flush()
+    assert calendar_service.sync_status(task_id)["status"] == "synced"
+
+
+def test_reenqueued_events_keep_their_id_until_they_change():
+    transport = FakeCalendarTransport()
+    outbox = _outbox(transport)
+    outbox.enqueue("t1", "Task", "2026-05-01T09:00:00", "2026-05-01T09:00:00")
+    outbox.flush()
+    assert outbox.enqueue("t1", "Task", "2026-05-01T09:00:00", "2026-05-01T09:00:00") == "synced"
+    assert outbox.flush() == 0
+    assert outbox.enqueue("t1", "Task", "2026-05-02T09:00:00", "2026-05-02T09:00:00") == "pending"
+    outbox.flush()
+    assert len(transport.events) == 2
+    assert len(set(transport.events)) == len(transport.batches) == 2
+
+
+def test_entry_replaced_during_a_batch_stays_pending():
+    class Racing(FakeCalendarTransport):
+        def insert_batch(self, events):
+            if not self.batches:
+                outbox.enqueue("t1", "Task", "2026-05-02T09:00:00", "2026-05-02T09:00:00")
+            return super().insert_batch(events)
+
+    transport = Racing()
+    outbox = _outbox(transport)
+    outbox.enqueue("t1", "Task", "2026-05-01T09:00:00", "2026-05-01T09:00:00")
+    outbox.flush()
+    assert outbox.status("t1") == {"task_id": "t1", "status": "pending", "attempts": 0,
+                                   "last_error": None, "html_link": None}
+    outbox.flush()
+    assert outbox.status("t1")["status"] == "synced"
+    event_id = outbox._db.execute("SELECT event_id FROM calendar_outbox").fetchone()[0]
+    assert transport.events[event_id]["start"]["dateTime"].startswith("2026-05-02")
+
+
+def test_deleting_a_task_cancels_its_calendar_sync(mock_store, monkeypatch):
+    transport = FakeCalendarTransport()
+    monkeypatch.setattr(calendar_service, "outbox", _outbox(transport))
+    asyncio.run(assign_task.ainvoke(
+        {"task_description": "Write report", "assignee": "Alice", "deadline": "2026-05-01T09:00:00"}))
+    task_id = mock_store.tasks_for("Alice")[0]["id"]
+
+    firebase_service.delete_task(task_id)
+    assert calendar_service.sync_status(task_id) is None
+    assert calendar_service.outbox.flush() == 0
@@ -0,0 +1,51 @@
+import json
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _events(response):
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_stream_emits_tokens_tool_events_and_final(fake_llm):
+    fake_llm(
+        AIMessage(content="", tool_calls=[{"name": "create_team", "args": {"team_name": "Streamers"}, "id": "call_1"}]),
+        AIMessage(content="Team Streamers is ready."),
+    )
+
+    with client.stream("POST", "/chat/stream", json={"query": "please set up a team called Streamers", "user_id": "stream-user"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = _events(response)
+
+    kinds = [e["event"] for e in events]
+    assert kinds.index("tool_start") < kinds.index("tool_end") < kinds.index("token")
+    assert kinds[-1] == "final"
+
+    tool_end = next(e for e in events if e["event"] == "tool_end")
+    assert tool_end["tool"] == "create_team"
+    assert tool_end["output"] == "Team 'Streamers' created successfully."
+
+    tokens = "".join(e["content"] for e in events if e["event"] == "token")
+    assert tokens == "Team Streamers is ready."
+    final = events[-1]["data"]
+    assert final["response"] == "Team Streamers is ready."
+    assert final["context_stats"]["llm_calls"] == 2
+
+
+def test_stream_reports_errors_as_final_event(fake_llm):
+    def boom(messages):
+        raise RuntimeError("429 rate limit")
+
+    fake_llm(boom)
+
+    with client.stream("POST", "/chat/stream", json={"query": "hi", "user_id": "stream-error-user"}) as response:
+        events = _events(response)
+
+    assert events[-1]["event"] == "final"
+    assert "Rate limit exceeded" in events[-1]["data"]["response"]
@@ -0,0 +1,77 @@
+import asyncio
+import operator
+import time
+from typing import Annotated, List, TypedDict
+
+from langgraph.graph import END, StateGraph
+
+from app.agents.checkpoint import BoundedCheckpointSaver
+
+
+class CounterState(TypedDict):
+    items: Annotated[List[str], operator.add]
+
+
+def _graph(saver):
+    workflow = StateGraph(CounterState)
+    workflow.add_node("echo", lambda state: {"items": ["echo"]})
+    workflow.set_entry_point("echo")
+    workflow.add_edge("echo", END)
+    return workflow.compile(checkpointer=saver)
+
+
+def _turn(graph, thread_id, item):
+    config = {"configurable": {"thread_id": thread_id}}
+    return asyncio.run(graph.ainvoke({"items": [item]}, config=config))["items"]
+
+
+def test_threads_keep_history_and_cap_checkpoints():
+    saver = BoundedCheckpointSaver(max_checkpoints=3)
+    graph = _graph(saver)
+    _turn(graph, "t1", "a")
+    assert _turn(graph, "t1", "b") == ["a", "echo", "b", "echo"]
+
+    config = {"configurable": {"thread_id": "t1"}}
+    assert len(list(saver.list(config))) == 3
+    assert saver.stats()["resident_threads"] == 1
+    assert saver.stats()["resident_bytes"] > 0
+
+
+def test_lru_and_ttl_eviction():
+    saver = BoundedCheckpointSaver(max_threads=2)
+    graph = _graph(saver)
+    for thread_id in ("t1", "t2", "t3"):
+        _turn(graph, thread_id, "x")
+
+    assert saver.stats()["resident_threads"] == 2
+    assert saver.get_tuple({"configurable": {"thread_id": "t1"}}) is None
+    assert _turn(graph, "t1", "y") == ["y", "echo"]  # memory-only: evicted history is gone
+
+    saver.thread_ttl = 0.05
+    time.sleep(0.1)
+    saver.get_tuple({"configurable": {"thread_id": "t1"}})  # t3 is now idle past the TTL
+    assert saver.stats()["resident_threads"] == 1
+
+
+def test_sqlite_tier_reloads_evicted_threads_and_survives_restart(tmp_path):
+    db_path = str(tmp_path / "checkpoints.sqlite")
+    saver = BoundedCheckpointSaver(db_path=db_path, max_threads=1)
+    graph = _graph(saver)
+    _turn(graph, "t1", "a")
+    _turn(graph, "t2", "b")  # evicts t1 from memory
+
+    assert saver.stats()["resident_threads"] == 1
+    assert _turn(graph, "t1", "c") == ["a", "echo", "c", "echo"]
+
+    restarted = _graph(BoundedCheckpointSaver(db_path=db_path))
+    assert _turn(restarted, "t2", "d") == ["b", "echo", "d", "echo"]
+    mode = saver._db.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_delete_thread(tmp_path):
+    saver = BoundedCheckpointSaver(db_path=str(tmp_path / "c.sqlite"))
+    graph = _graph(saver)
+    _turn(graph, "t1", "a")
+    saver.delete_thread("t1")
+    assert saver.get_tuple({"configurable": {"thread_id": "t1"}}) is None
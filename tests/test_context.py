@@ -0,0 +1,59 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.agents.context import SUMMARY_PREFIX, build_window, context_node
+from app.core.config import settings
+
+
+def _turn(i, tool_output=None):
+    messages = [HumanMessage(content=f"question {i} " + "words " * 50)]
+    if tool_output is not None:
+        call = {"name": "check_progress", "args": {"team_name": "Apollo"}, "id": f"call_{i}"}
+        messages += [AIMessage(content="", tool_calls=[call]), ToolMessage(content=tool_output, tool_call_id=f"call_{i}")]
+    messages.append(AIMessage(content=f"answer {i}"))
+    return messages
+
+
+def test_short_history_is_sent_in_full():
+    history = _turn(1) + _turn(2)
+    update = context_node({"messages": history})
+
+    assert update["context_start"] == 0
+    assert update["summary"] == ""
+    assert update["context_stats"]["tokens_trimmed"] == 0
+    assert build_window(history, update["summary"]) == history
+
+
+def test_old_turns_are_folded_into_summary_within_budget(monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 400)
+    monkeypatch.setattr(settings, "CONTEXT_SUMMARY_TOKENS", 150)
+    history = [m for i in range(10) for m in _turn(i, tool_output="report " * 20)]
+    history.append(HumanMessage(content="what now?"))
+
+    update = context_node({"messages": history})
+    window = build_window(history[update["context_start"]:], update["summary"])
+
+    assert update["context_start"] > 0
+    assert isinstance(history[update["context_start"]], HumanMessage)
+    assert window[-1].content == "what now?"
+    assert isinstance(window[0], SystemMessage) and window[0].content.startswith(SUMMARY_PREFIX)
+    assert "Tools: check_progress" in update["summary"]
+    stats = update["context_stats"]
+    assert stats["tokens_sent"] <= settings.CONTEXT_TOKEN_BUDGET
+    assert stats["tokens_trimmed"] > 0
+
+    # The window only moves forward and the summary keeps rolling
+    history += [AIMessage(content="done")] + _turn(11)
+    later = context_node({"messages": history, **update})
+    assert later["context_start"] >= update["context_start"]
+    assert later["context_stats"]["llm_calls"] == 2
+
+
+def test_bulky_tool_output_is_compacted_only_in_older_turns(monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_TOOL_MESSAGE_TOKENS", 20)
+    history = _turn(1, tool_output="x" * 2000) + _turn(2, tool_output="y" * 2000)
+
+    window = build_window(history, "")
+    tool_outputs = [m.content for m in window if isinstance(m, ToolMessage)]
+
+    assert tool_outputs[0].endswith("[output truncated]") and len(tool_outputs[0]) < 200
+    assert tool_outputs[1] == "y" * 2000
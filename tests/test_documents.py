@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.agents import tools
+from app.core.concurrency import run_blocking
+from app.main import app
+from app.services.documents import CHUNK_ALIGNMENT, DocumentService, FakeStorageTransport, GCSStorageTransport
+
+CHUNK = CHUNK_ALIGNMENT
+
+
+@pytest.fixture
+def documents(monkeypatch):
+    service = DocumentService(FakeStorageTransport(), chunk_size=CHUNK, retry_delay=0.01)
+    monkeypatch.setattr("app.main.document_service", service)
+    monkeypatch.setattr(tools, "document_service", service)
+    return service
+
+
+def _payload(size):
+    return bytes(i % 251 for i in range(size))
+
+
+async def _body(data):
+    yield data
+
+
+async def _upload(name, data, piece=64 * 1024, headers=None):
+    async def body():
+        for start in range(0, len(data), piece):
+            yield data[start:start + piece]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/api/documents", params={"name": name}, content=body(), headers=headers or {})
+
+
+def test_upload_streams_aligned_chunks_and_shares_a_cached_link(documents):
+    data = _payload(3 * CHUNK + 1234)
+    response = asyncio.run(_upload("specs/design.pdf", data, headers={"X-Upload-Id": "up-1"}))
+    assert response.status_code == 200
+    assert response.json()["state"] == "complete"
+    assert response.json()["uploaded"] == len(data)
+
+    stored = documents.transport.objects["documents/specs/design.pdf"]
+    assert stored["md5"] == hashlib.md5(data).hexdigest()
+    assert documents.transport.chunks == [CHUNK, CHUNK, CHUNK, 1234]
+    assert documents.progress("up-1")["state"] == "complete"
+
+    shared = asyncio.run(tools.share_document.ainvoke({"document_name": "specs/design.pdf",
+                                                       "recipients": ["Alice", "Bob"]}))
+    assert "shared with Alice, Bob" in shared
+    assert "https://storage.local/documents/specs/design.pdf?" in shared
+    # Reused while it has enough validity left, re-signed close to expiry
+    assert asyncio.run(tools.share_document.ainvoke({"document_name": "specs/design.pdf", "recipients": ["Carol"]})) \
+        .split(": ")[-1] == shared.split(": ")[-1]
+    assert len(documents.transport.signed) == 1
+    url, _ = documents._urls["specs/design.pdf"]
+    documents._urls["specs/design.pdf"] = (url, time.monotonic() + 5)
+    assert asyncio.run(documents.link("specs/design.pdf"))["expires_in"] == documents.url_ttl
+    assert len(documents.transport.signed) == 2
+
+    assert "not found" in asyncio.run(tools.share_document.ainvoke({"document_name": "nope.txt", "recipients": ["A"]}))
+    assert asyncio.run(_upload("../etc/passwd", b"x")).status_code == 400
+
+
+def test_failed_chunks_resume_from_the_committed_offset(documents):
+    documents.transport.failures = [{"status": 503}, {"commit": 1000}, {"status": 429}]
+    data = _payload(2 * CHUNK + 10)
+    response = asyncio.run(_upload("report.csv", data))
+    assert response.status_code == 200
+    assert response.json()["retries"] == 2
+    assert documents.transport.objects["documents/report.csv"]["md5"] == hashlib.md5(data).hexdigest()
+
+    documents.transport.failures = [{"status": 403}]
+    response = asyncio.run(_upload("denied.csv", data, headers={"X-Upload-Id": "up-2"}))
+    assert response.status_code == 502
+    assert documents.progress("up-2")["state"] == "failed"
+    assert documents.transport.sessions == {}
+
+
+def test_backoff_does_not_hold_an_io_pool_thread(documents, monkeypatch):
+    monkeypatch.setattr("app.core.concurrency._executor", ThreadPoolExecutor(max_workers=1))
+    documents.retry_delay = 0.5
+    documents.transport.failures = [{"status": 503}]
+
+    async def scenario():
+        upload = asyncio.ensure_future(documents.upload("report.csv", _body(_payload(10))))
+        await asyncio.sleep(0.1)  # the chunk has failed and is backing off
+        started = time.perf_counter()
+        await run_blocking(time.perf_counter)
+        waited = time.perf_counter() - started
+        await upload
+        return waited
+
+    assert asyncio.run(scenario()) < 0.2
+
+
+def test_reading_stays_a_bounded_number_of_chunks_ahead(documents):
+    class SlowStorage(FakeStorageTransport):
+        ahead = []
+
+        def upload_chunk(self, session, data, offset, total):
+            time.sleep(0.01)
+            self.ahead.append(documents.uploads["slow"]["received"] - offset)
+            return super().upload_chunk(session, data, offset, total)
+
+    documents.transport = SlowStorage()
+    data = _payload(12 * CHUNK)
+    assert asyncio.run(_upload("big.bin", data, headers={"X-Upload-Id": "slow"})).status_code == 200
+    # The chunk being sent, the queued ones, the one waiting for room and a partial piece
+    assert max(SlowStorage.ahead) <= (documents.max_pending_chunks + 2) * CHUNK + 64 * 1024
+
+
+def test_gcs_transport_speaks_the_resumable_protocol():
+    stored = bytearray()
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request.headers["content-range"])
+        start, end, total = re.match(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)", request.headers["content-range"]).groups()
+        if start is not None:
+            assert int(start) == len(stored)
+            # Keeps only part of the first chunk, as Storage may
+            content = b"".join(request.stream)
+            stored.extend(content[:1000] if len(requests) == 1 else content)
+        if total != "*" and len(stored) == int(total):
+            return httpx.Response(200, json={"name": "doc"})
+        return httpx.Response(308, headers={"Range": f"bytes=0-{len(stored) - 1}"} if stored else {})
+
+    class Blob:
+        def create_resumable_upload_session(self, content_type):
+            return "https://storage.googleapis.com/upload/session-1"
+
+    class Bucket:
+        def blob(self, name):
+            return Blob()
+
+    transport = GCSStorageTransport(Bucket(), http=httpx.Client(transport=httpx.MockTransport(handler)))
+    service = DocumentService(transport, chunk_size=CHUNK)
+    data = _payload(CHUNK + 5)
+
+    async def body():
+        yield data
+
+    result = asyncio.run(service.upload("doc.bin", body()))
+    assert result["state"] == "complete"
+    assert bytes(stored) == data
+    assert requests == [f"bytes 0-{CHUNK - 1}/*", f"bytes 1000-{CHUNK - 1}/*", f"bytes {CHUNK}-{CHUNK + 4}/{CHUNK + 5}"]
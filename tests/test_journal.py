@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+from app.services.journal import JournaledStore
+
+
+def _open(path, **kwargs):
+    return JournaledStore(str(path), fsync_interval=0.01, **kwargs)
+
+
+def _populate(store):
+    store.create_team("Apollo")
+    store.add_member("Apollo", "Alice")
+    store.add_member("Apollo", "Bob")
+    store.remove_member("Apollo", "Bob")
+    first = store.add_task({"title": "Spec", "assignee": "Alice", "status": "pending"})["id"]
+    second = store.add_task({"title": "Build", "assignee": "Alice", "status": "pending"})["id"]
+    store.update_task(first, {"status": "completed"})
+    store.delete_task(second)
+    return first, second
+
+
+def test_recovers_from_journal_after_crash(tmp_path):
+    first, second = _populate(_open(tmp_path))
+
+    # No close(): the process died with everything still in the journal
+    recovered = _open(tmp_path)
+    assert recovered.recovery["replayed"] == 8
+    assert recovered.get_teams() == {"Apollo": ["Alice"]}
+    assert recovered.get_task(first)["status"] == "completed"
+    assert [t["title"] for t in recovered.tasks_with_status("completed")] == ["Spec"]
+    assert recovered.get_task(second) is None
+    # The deleted ID is not handed out again
+    assert recovered.add_task({"title": "Docs", "assignee": "Bob"})["id"] not in (first, second)
+
+
+def test_snapshot_limits_replay_to_the_tail(tmp_path):
+    store = _open(tmp_path, snapshot_every=5)
+    _populate(store)
+    store._snapshot_thread and store._snapshot_thread.join()
+    store.add_task({"title": "Tail", "assignee": "Carol"})
+
+    recovered = _open(tmp_path)
+    assert recovered.recovery["snapshot_tasks"] > 0
+    assert recovered.recovery["replayed"] < 9
+    assert sorted(t["title"] for t in recovered.all_tasks()) == ["Spec", "Tail"]
+    assert not os.path.exists(tmp_path / "journal.log.old")
+
+
+def test_close_snapshots_and_skips_torn_entries(tmp_path):
+    store = _open(tmp_path)
+    _populate(store)
+    store.close()
+
+    with open(tmp_path / "journal.log", "a") as journal:
+        journal.write('{"seq": 99, "op": "add_ta')
+
+    recovered = _open(tmp_path)
+    assert recovered.recovery["replayed"] == 0
+    assert recovered.get_teams() == {"Apollo": ["Alice"]}
+    assert len(recovered.all_tasks()) == 1
+
+    # New entries land on a clean line after the torn one is cut off
+    recovered.add_task({"title": "After", "assignee": "Alice"})
+    assert _open(tmp_path).recovery["replayed"] == 1
+
+
+def test_writes_do_not_wait_for_fsync(tmp_path, monkeypatch):
+    syncing, release = threading.Event(), threading.Event()
+    fsync = os.fsync
+
+    def slow_fsync(fd):
+        # Other tests' stores may still be syncing in the background
+        if threading.current_thread() is store._syncer:
+            syncing.set()
+            release.wait(5)
+        fsync(fd)
+
+    monkeypatch.setattr("app.services.journal.os.fsync", slow_fsync)
+    store = _open(tmp_path)
+    store.add_task({"title": "Spec", "assignee": "Alice", "status": "pending"})
+    assert syncing.wait(5)
+    # The group commit is stuck on the disk; writes still go through
+    started = time.perf_counter()
+    store.add_task({"title": "Build", "assignee": "Alice", "status": "pending"})
+    assert time.perf_counter() - started < 1
+    release.set()
+    store.close()
+    assert len(_open(tmp_path).tasks) == 2
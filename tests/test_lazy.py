@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from app.core.lazy import LazySingleton
+
+def test_lazy_singleton_builds_once_and_runs_hooks():
+    built = []
+    lazy = LazySingleton(lambda: built.append(1) or type("Obj", (), {"value": 1})(), "obj")
+    seen = []
+    lazy.on_load(seen.append)
+    assert not lazy.loaded and built == []
+
+    assert lazy.value == 1
+    lazy.value = 2
+    assert lazy.value == 2
+    assert built == [1] and len(seen) == 1
+
+    late = []
+    lazy.on_load(late.append)
+    assert late == [lazy.load()]
+
+def test_importing_app_does_not_load_sdks_or_services():
+    script = (
+        "import json, sys\n"
+        "import app.main as m\n"
+        "print(json.dumps({\n"
+        "    'loaded': [s._name for s in (m.firebase_service, m.calendar_service, m.app_graph) if s.loaded],\n"
+        "    'modules': [n for n in ('firebase_admin', 'googleapiclient', 'langchain_openai') if n in sys.modules],\n"
+        "}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report == {"loaded": [], "modules": []}
+
+def test_ready_after_startup():
+    from app.main import app
+    with TestClient(app) as client:
+        response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["components"] == {"firebase": True, "calendar": True, "graph": True}
@@ -6,4 +6,5 @@ client = TestClient(app)
 def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"message": "Welcome to TrackUp API"}
+    assert response.headers["content-type"].startswith("text/html")
+    assert "TrackUp" in response.text
@@ -0,0 +1,80 @@
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.core import metrics
+from app.main import app
+from app.services.firebase import firebase_service
+
+client = TestClient(app)
+
+USAGE = {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150}
+
+
+def _progress_replies():
+    return (
+        AIMessage(content="", tool_calls=[{"name": "check_progress", "args": {"team_name": "Apollo"}, "id": "c1"}],
+                  usage_metadata=USAGE),
+        AIMessage(content="Apollo is on track.", usage_metadata=USAGE),
+    )
+
+
+def test_chat_reports_actions_usage_and_timings(fake_llm, mock_store):
+    firebase_service.create_team("Apollo")
+    fake_llm(*_progress_replies())
+
+    body = client.post("/chat", json={
+        "query": "How is everyone on Apollo getting on?", "user_id": "metrics-1", "include_timings": True,
+    }).json()
+
+    assert body["actions_taken"] == ["check_progress"]
+    # router -> context -> agent -> tools -> context -> agent
+    assert body["usage"] == {"graph_hops": 6, "llm_input_tokens": 240, "llm_output_tokens": 60}
+    assert {"node:agent", "node:tools", "tool:check_progress", "firebase:get_team_members", "llm"} <= set(body["timings"])
+
+
+def test_timings_are_opt_in(fake_llm, mock_store):
+    fake_llm(AIMessage(content="hello"))
+    body = client.post("/chat", json={"query": "hi", "user_id": "metrics-2"}).json()
+    assert body["timings"] is None
+    assert body["actions_taken"] == []
+
+
+def test_metrics_endpoint_exports_prometheus_text(fake_llm, mock_store):
+    firebase_service.create_team("Apollo")
+    fake_llm(*_progress_replies())
+    client.post("/chat", json={"query": "How is everyone on Apollo getting on?", "user_id": "metrics-3"})
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE trackup_node_seconds histogram" in text
+    assert 'trackup_node_seconds_bucket{node="agent",le="+Inf"}' in text
+    assert 'trackup_tool_seconds_count{tool="check_progress"}' in text
+    assert 'trackup_llm_tokens_total{type="input"}' in text
+
+
+def test_disabled_metrics_record_nothing(fake_llm, mock_store, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    before = metrics.NODE_SECONDS.count("agent")
+    fake_llm(AIMessage(content="hello"))
+
+    body = client.post("/chat", json={"query": "hi", "user_id": "metrics-4", "include_timings": True}).json()
+
+    assert metrics.NODE_SECONDS.count("agent") == before
+    # Per-request timings still work
+    assert "node:agent" in body["timings"]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_seconds", "Test.", ["op"], buckets=(0.1, 1.0))
+    metrics.REGISTRY.remove(histogram)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "read")
+
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{op="read",le="0.1"} 1',
+        'test_seconds_bucket{op="read",le="1"} 2',
+        'test_seconds_bucket{op="read",le="+Inf"} 3',
+        'test_seconds_sum{op="read"} 5.55',
+        'test_seconds_count{op="read"} 3',
+    ]
@@ -0,0 +1,128 @@
+import asyncio
+import datetime
+
+import pytest
+
+from app.agents.tools import set_reminder
+from app.services.firebase import firebase_service
+from app.services.reminders import ReminderEngine, parse_lead_times
+from app.services.scheduler import reminder_engine
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2026, 1, 1, 12, 0, tzinfo=UTC)
+
+
+def _engine(sent):
+    return ReminderEngine(parse_lead_times("24h,1h"), notify=sent.append)
+
+
+def _task(task_id, deadline, title="Report"):
+    return {"id": task_id, "title": title, "deadline": deadline, "status": "pending"}
+
+
+def test_parse_lead_times():
+    assert parse_lead_times("24h, 1h,30m,2d") == [
+        datetime.timedelta(hours=24), datetime.timedelta(hours=1),
+        datetime.timedelta(minutes=30), datetime.timedelta(days=2),
+    ]
+    with pytest.raises(ValueError):
+        parse_lead_times("soon")
+
+
+def test_reminders_fire_in_deadline_order_exactly_once():
+    sent = []
+    engine = _engine(sent)
+    engine.schedule_task(_task("t2", "2026-01-05T12:00:00"), now=NOW)
+    engine.schedule_task(_task("t1", "2026-01-03T12:00:00"), now=NOW)
+    engine.schedule_task(_task("t1", "2026-01-03T12:00:00"), now=NOW)  # duplicate
+    engine.schedule_task(_task("vague", "next Friday"), now=NOW)
+
+    assert len(engine) == 4
+    assert engine.next_due() == datetime.datetime(2026, 1, 2, 12, 0, tzinfo=UTC)
+
+    assert engine.run_due(NOW) == []
+    due = engine.run_due(datetime.datetime(2026, 1, 3, 12, 0, tzinfo=UTC))
+    assert [(r["task_id"], r["label"]) for r in due] == [("t1", "24h before"), ("t1", "1h before")]
+
+    # Re-scheduling after a reminder was sent never sends it again
+    engine.schedule_task(_task("t1", "2026-01-03T12:00:00"), now=NOW)
+    assert engine.run_due(datetime.datetime(2026, 1, 9, tzinfo=UTC))[0]["task_id"] == "t2"
+    assert [r["task_id"] for r in sent] == ["t1", "t1", "t2", "t2"]
+    assert len(engine) == 0
+
+
+def test_cancelled_and_past_reminders_are_skipped():
+    sent = []
+    engine = _engine(sent)
+    engine.schedule_task(_task("gone", "2026-01-03T12:00:00"), now=NOW)
+    # Due in 30 minutes: both lead times already passed
+    assert engine.schedule_task(_task("soon", "2026-01-01T12:30:00"), now=NOW) == 0
+
+    engine.cancel_task("gone")
+
+    assert engine.next_due() is None
+    assert engine.run_due(datetime.datetime(2026, 2, 1, tzinfo=UTC)) == []
+
+
+def test_moved_deadline_fires_at_the_new_time_only():
+    sent = []
+    engine = _engine(sent)
+    engine.schedule_task(_task("t1", "2026-01-03T12:00:00"), now=NOW)
+    engine.reschedule_task(_task("t1", "2026-01-10T12:00:00"), now=NOW)
+
+    assert engine.run_due(datetime.datetime(2026, 1, 2, 12, 1, tzinfo=UTC)) == []
+    assert engine.next_due() == datetime.datetime(2026, 1, 9, 12, 0, tzinfo=UTC)
+    due = engine.run_due(datetime.datetime(2026, 1, 9, 12, 0, tzinfo=UTC))
+    assert [(r["label"], r["fire_at"].day) for r in due] == [("24h before", 9)]
+
+    # Extended after its 24h reminder was sent: sent again for the new deadline
+    engine.reschedule_task(_task("t1", "2026-01-20T12:00:00"), now=datetime.datetime(2026, 1, 9, 13, tzinfo=UTC))
+    assert [r["fire_at"].day for r in engine.run_due(datetime.datetime(2026, 1, 21, tzinfo=UTC))] == [19, 20]
+    # An update that keeps the deadline does not repeat what was sent
+    engine.reschedule_task(_task("t1", "2026-01-20T12:00:00"), now=datetime.datetime(2026, 1, 9, 13, tzinfo=UTC))
+    assert engine.run_due(datetime.datetime(2026, 1, 21, tzinfo=UTC)) == []
+    assert len(sent) == 3
+
+    engine.cancel_task("t1")
+    assert engine._sent == {} and len(engine) == 0
+
+
+def test_next_due_callback_only_when_head_moves_earlier():
+    armed = []
+    engine = _engine([])
+    engine.on_next_due = armed.append
+    engine.schedule_task(_task("b", "2026-01-05T12:00:00"), now=NOW)
+    engine.schedule_task(_task("c", "2026-01-09T12:00:00"), now=NOW)
+    engine.schedule_task(_task("a", "2026-01-03T12:00:00"), now=NOW)
+
+    assert armed == [
+        datetime.datetime(2026, 1, 4, 12, 0, tzinfo=UTC),
+        datetime.datetime(2026, 1, 2, 12, 0, tzinfo=UTC),
+    ]
+
+
+def test_task_writes_update_the_reminder_queue(mock_store):
+    deadline = (datetime.datetime.now(UTC) + datetime.timedelta(days=3)).isoformat()
+    before = len(reminder_engine)
+    firebase_service.add_task({"title": "Ship", "assignee": "Alice", "deadline": deadline, "status": "pending"})
+    task_id = firebase_service.get_tasks("Alice")[0]["id"]
+    assert len(reminder_engine) == before + 2
+
+    firebase_service.delete_task(task_id)
+    assert len(reminder_engine) == before
+
+
+def test_set_reminder_tool(mock_store):
+    firebase_service.add_task({"title": "Ship", "assignee": "Alice", "deadline": "2030-01-01", "status": "pending"})
+    task_id = firebase_service.get_tasks("Alice")[0]["id"]
+    args = {"task_id": task_id, "time": "2029-12-31T09:00:00+00:00"}
+
+    assert asyncio.run(set_reminder.ainvoke(args)) == f"Reminder set for task {task_id} at 2029-12-31T09:00:00+00:00."
+    assert "already set" in asyncio.run(set_reminder.ainvoke(args))
+    assert asyncio.run(set_reminder.ainvoke({"task_id": "missing", "time": "2030-01-01"})) == "Task missing not found."
+    assert "Could not understand" in asyncio.run(set_reminder.ainvoke({"task_id": task_id, "time": "tomorrow"}))
+    assert "in the past" in asyncio.run(set_reminder.ainvoke({"task_id": task_id, "time": "2020-01-01"}))
+    # Kept on the task, where every worker and the next start find it
+    assert mock_store.get_task(task_id)["reminders"] == ["2029-12-31T09:00:00+00:00"]
+    assert "at 2029-12-31T09:00:00+00:00" in reminder_engine._scheduled[task_id]
+    reminder_engine.cancel_task(task_id)
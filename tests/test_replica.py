@@ -0,0 +1,105 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.firebase import firebase_service
+
+client = TestClient(app)
+
+
+def test_firestore_team_crud(fake_firestore):
+    assert firebase_service.create_team("Apollo") == "Team 'Apollo' created successfully."
+    assert firebase_service.create_team("Apollo") == "Team 'Apollo' already exists."
+    assert firebase_service.add_member("Apollo", "Alice") == "User 'Alice' added to team 'Apollo'."
+    assert firebase_service.add_member("Apollo", "Alice") == "User 'Alice' is already in team 'Apollo'."
+    assert firebase_service.add_member("Nope", "Alice") == "Team 'Nope' does not exist."
+    firebase_service.add_member("Apollo", "Bob")
+    assert firebase_service.get_all_teams() == {"Apollo": ["Alice", "Bob"]}
+
+    assert firebase_service.remove_member("Apollo", "Alice") == "User 'Alice' removed from 'Apollo'."
+    assert firebase_service.remove_member("Apollo", "Alice") == "Member or team not found."
+    assert firebase_service.get_team_members("Apollo") == ["Bob"]
+    assert firebase_service.delete_team("Apollo") == "Team 'Apollo' deleted."
+    assert firebase_service.get_all_teams() == {}
+
+
+def _start_replica(db):
+    db.collection("teams").document("Apollo").set({"members": ["Alice"]})
+    db.collection("tasks").document("t1").set({"title": "Spec", "assignee": "Alice", "status": "pending"})
+    firebase_service.start_replica()
+    return db.collection("tasks")
+
+
+def test_replica_serves_reads_locally(fake_firestore):
+    tasks = _start_replica(fake_firestore)
+
+    assert firebase_service.read_freshness()["source"] == "replica"
+    assert firebase_service.get_all_teams() == {"Apollo": ["Alice"]}
+    assert [t["title"] for t in firebase_service.get_tasks("alice")] == ["Spec"]
+    assert firebase_service.get_tasks_for_members(["Alice"])["Alice"][0]["id"] == "t1"
+    assert tasks.queries == []
+
+
+def test_replica_applies_other_writers_changes(fake_firestore):
+    tasks = _start_replica(fake_firestore)
+    events = []
+    firebase_service.add_listener(lambda event, task: events.append((event, task["id"])))
+    try:
+        # Another instance writes; the change is not visible until its snapshot arrives
+        tasks.hold_snapshots = True
+        tasks.document("t2").set({"title": "Build", "assignee": "Alice", "status": "pending"})
+        assert [t["id"] for t in firebase_service.get_tasks()] == ["t1"]
+
+        tasks.deliver()
+        assert [t["id"] for t in firebase_service.get_tasks()] == ["t1", "t2"]
+        assert firebase_service.get_member_stats("Alice")["total"] == 2
+
+        tasks.document("t1").delete()
+        tasks.deliver()
+        assert firebase_service.get_task("t1") is None
+        assert events == [("task_added", "t2"), ("task_deleted", "t1")]
+    finally:
+        firebase_service._listeners.pop()
+
+
+def test_replica_feeds_other_writers_team_changes_to_stats(fake_firestore):
+    _start_replica(fake_firestore)
+    fake_firestore.collection("tasks").document("t2").set({"title": "Ops", "assignee": "Bob", "status": "pending"})
+    assert firebase_service.get_team_stats("Apollo")["total"] == 1
+
+    # Another pod or the console changes teams behind this process's back
+    teams = fake_firestore.collection("teams")
+    teams.document("Hermes").set({"members": ["Bob"]})
+    teams.document("Apollo").set({"members": ["Bob"]})
+    assert firebase_service.get_team_stats("Hermes")["total"] == 1
+    assert client.get("/api/teams/Apollo/stats").json()["total"] == 1
+    assert firebase_service.get_team_stats("Apollo")["total"] == 1
+
+    teams.document("Apollo").set({"members": ["Alice", "Bob"]})
+    assert firebase_service.get_team_stats("Apollo")["total"] == 2
+    teams.document("Hermes").delete()
+    assert client.get("/api/teams/Hermes/stats").status_code == 404
+
+
+def test_replica_reads_own_writes_without_waiting(fake_firestore):
+    tasks = _start_replica(fake_firestore)
+    events = []
+    firebase_service.add_listener(lambda event, task: events.append(event))
+    try:
+        tasks.hold_snapshots = True
+        firebase_service.add_task({"title": "Docs", "assignee": "Alice", "status": "pending"})
+        assert [t["title"] for t in firebase_service.get_tasks("Alice")] == ["Spec", "Docs"]
+
+        # The echoed snapshot changes nothing and is not reported twice
+        tasks.deliver()
+        assert events == ["task_added"]
+        assert len(firebase_service.get_tasks()) == 2
+    finally:
+        firebase_service._listeners.pop()
+
+
+def test_dashboard_reports_data_source(fake_firestore):
+    _start_replica(fake_firestore)
+    response = client.get("/api/teams")
+    assert response.json() == {"Apollo": ["Alice"]}
+    assert response.headers["X-Data-Source"] == "replica"
+    assert float(response.headers["X-Data-Age"]) >= 0
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.agents import graph_new
+from app.agents.router import confident_route, match_route, router_metrics
+from app.main import app
+from app.services.firebase import firebase_service
+
+
+@pytest.mark.parametrize("text, tool, args", [
+    ("create team Apollo", "create_team", {"team_name": "Apollo"}),
+    ("Create a new team called Apollo.", "create_team", {"team_name": "Apollo"}),
+    ("add Bob to Apollo", "add_team_member", {"user_name": "Bob", "team_name": "Apollo"}),
+    ("add Bob to team Apollo", "add_team_member", {"user_name": "Bob", "team_name": "Apollo"}),
+    ("remove Bob from the Apollo team", "remove_team_member", {"user_name": "Bob", "team_name": "Apollo"}),
+    ("delete team Apollo", "delete_team", {"team_name": "Apollo"}),
+    ("delete task mock_12", "delete_task", {"task_id": "mock_12"}),
+    ("progress of Apollo", "check_progress", {"team_name": "Apollo"}),
+    ("What's the progress on team Apollo?", "check_progress", {"team_name": "Apollo"}),
+    ("how is Apollo doing?", "check_progress", {"team_name": "Apollo"}),
+    ("performance of Alice", "get_performance_insights", {"user_id": "Alice"}),
+])
+def test_simple_commands_are_routed(text, tool, args):
+    matched_tool, matched_args = match_route(text)
+    assert (matched_tool.name, matched_args) == (tool, args)
+
+
+@pytest.mark.parametrize("text", [
+    "create team Apollo and add Bob to it",
+    "assign the report to Alice by Friday",
+    "what should Apollo work on next?",
+    "add Bob and Carol to Apollo",
+    "add him to Apollo",
+    "remove me from the team",
+    "delete task it",
+    "how is the team doing?",
+    "mark task this as completed",
+    "performance of everyone",
+])
+def test_ambiguous_requests_fall_through(text):
+    assert match_route(text) is None
+
+
+@pytest.mark.parametrize("text", [
+    "add Bob to Zeus",          # no such team
+    "add Alice to Apollo",      # already a member
+    "remove Bob from Apollo",   # not a member
+    "delete team Zeus",
+    "delete task mock_99",
+    "mark task mock_99 as completed",
+    "how is Alice doing?",      # a person, not a team
+])
+def test_commands_about_unknown_names_go_to_the_llm(text, mock_store):
+    firebase_service.create_team("Apollo")
+    firebase_service.add_member("Apollo", "Alice")
+    assert match_route(text) is not None
+    assert asyncio.run(confident_route(text)) is None
+    assert asyncio.run(confident_route("add Bob to Apollo"))[1] == {"user_name": "Bob", "team_name": "Apollo"}
+
+
+def _chat(query, user_id):
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.post("/chat", json={"query": query, "user_id": user_id})).json()
+    return asyncio.run(post())
+
+
+def test_routed_turn_skips_llm_and_is_recorded_in_history(fake_llm, mock_store):
+    model = fake_llm(lambda messages: AIMessage(content=f"saw {len(messages)} messages"))
+    hits_before = router_metrics.snapshot()["hits"]
+
+    assert _chat("create team Apollo", "router-user")["response"] == "Team 'Apollo' created successfully."
+    assert model.calls == 0
+    assert firebase_service.get_team_members("Apollo") == []
+    assert router_metrics.snapshot()["hits"] == hits_before + 1
+
+    # The next LLM turn sees the routed exchange as a normal tool call
+    _chat("thanks, what did you just do?", "router-user")
+    assert model.calls == 1
+    state = asyncio.run(graph_new.app_graph.aget_state({"configurable": {"thread_id": "router-user"}}))
+    kinds = [type(m) for m in state.values["messages"]]
+    assert kinds == [HumanMessage, AIMessage, ToolMessage, AIMessage, HumanMessage, AIMessage]
+    assert state.values["messages"][1].tool_calls[0]["name"] == "create_team"
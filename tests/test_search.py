@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.agents.tools import research_technical_question
+from app.services.search import SearchBackend, SearchService, SerpAPIBackend, format_serpapi_results, normalize_query, search_service
+
+
+class StubBackend(SearchBackend):
+    def __init__(self, delay=0.0, fail=False):
+        self.queries = []
+        self.delay = delay
+        self.fail = fail
+
+    async def search(self, query):
+        self.queries.append(query)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return f"result for {query}"
+
+
+def test_normalized_queries_share_a_cache_entry():
+    backend = StubBackend()
+    service = SearchService(backend)
+
+    async def run():
+        first = await service.search("Best Python ORM?")
+        second = await service.search("  best   python orm ")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert backend.queries == ["Best Python ORM?"]
+    assert normalize_query("How to use FastAPI background tasks?!") == "how to use fastapi background tasks"
+    assert service.stats["hits"] == 1
+
+
+def test_concurrent_identical_queries_are_coalesced():
+    backend = StubBackend(delay=0.05)
+    service = SearchService(backend)
+
+    async def run():
+        return await asyncio.gather(*[service.search("fastapi background tasks") for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(set(results)) == 1
+    assert len(backend.queries) == 1
+    assert service.stats["coalesced"] == 4
+
+
+def test_cancelling_the_first_caller_leaves_the_others_waiting():
+    backend = StubBackend(delay=0.05)
+    service = SearchService(backend)
+
+    async def run():
+        first = asyncio.ensure_future(service.search("fastapi background tasks"))
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(service.search("fastapi background tasks")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return first, await asyncio.gather(*others)
+
+    first, results = asyncio.run(run())
+    assert first.cancelled()
+    assert results == ["result for fastapi background tasks"] * 2
+    assert len(backend.queries) == 1
+
+
+def test_ttl_lru_and_errors_are_not_cached():
+    backend = StubBackend()
+    service = SearchService(backend, max_entries=2)
+    asyncio.run(service.search("a"))
+    asyncio.run(service.search("b"))
+    asyncio.run(service.search("c"))  # evicts "a"
+    asyncio.run(service.search("a"))
+    assert backend.queries == ["a", "b", "c", "a"]
+
+    service.ttl = -1
+    asyncio.run(service.search("d"))
+    asyncio.run(service.search("d"))
+    assert backend.queries[-2:] == ["d", "d"]
+
+    failing = SearchService(StubBackend(fail=True))
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(failing.search("x"))
+    assert len(failing.backend.queries) == 2
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "search.sqlite")
+    asyncio.run(SearchService(StubBackend(), db_path=db_path).search("python orm"))
+
+    backend = StubBackend()
+    restarted = SearchService(backend, db_path=db_path)
+    assert asyncio.run(restarted.search("Python ORM")) == "result for python orm"
+    assert backend.queries == []
+    assert restarted.stats["disk_hits"] == 1
+
+
+def test_client_is_closed_when_replaced_and_on_shutdown():
+    backend = SerpAPIBackend("key")
+    first = asyncio.run(backend._get_client())
+    assert asyncio.run(backend._get_client()) is not first  # a new event loop
+    assert first.is_closed
+
+    async def reuse_then_close():
+        client = await backend._get_client()
+        assert await backend._get_client() is client
+        await SearchService(backend).aclose()
+        return client
+
+    assert asyncio.run(reuse_then_close()).is_closed
+
+
+def test_format_serpapi_results():
+    assert format_serpapi_results({"answer_box": {"answer": "42"}}) == "42"
+    assert format_serpapi_results({"organic_results": [{"snippet": "x"}, {"title": "no snippet"}]}) == "['x']"
+    with pytest.raises(ValueError):
+        format_serpapi_results({"error": "Invalid API key"})
+
+
+def test_tool_uses_pluggable_backend(monkeypatch):
+    backend = StubBackend()
+    monkeypatch.setattr(search_service, "backend", backend)
+    search_service.clear()
+
+    result = asyncio.run(research_technical_question.ainvoke({"query": "sqlalchemy vs peewee"}))
+
+    assert result == "result for sqlalchemy vs peewee"
+    search_service.clear()
@@ -0,0 +1,148 @@
+import datetime
+import time
+
+from app.agents.checkpoint import BoundedCheckpointSaver
+from app.core.config import settings
+from app.services import scheduler
+from app.services.firebase import FirebaseService
+from app.services.lease import LeaderLease
+from app.services.reminders import ReminderEngine
+from app.services.shared_store import SharedStore
+
+from tests.test_checkpoint import _graph, _turn
+
+
+def _open(path, **kwargs):
+    # A long poll interval: the tests decide when each worker catches up
+    return SharedStore(str(path / "shared.sqlite"), poll_interval=60, **kwargs)
+
+
+def test_workers_see_each_others_writes(tmp_path):
+    a, b = _open(tmp_path), _open(tmp_path)
+    seen = []
+    b.on_change = lambda op, args, result: seen.append(op)
+
+    assert a.create_team("Apollo")
+    assert a.add_member("Apollo", "Alice")
+    first = a.add_task({"title": "Spec", "assignee": "Alice", "status": "pending"})["id"]
+    # B's write catches up first, so its ID cannot collide with A's
+    second = b.add_task({"title": "Build", "assignee": "Alice", "status": "pending"})["id"]
+    assert first != second
+    assert not b.create_team("Apollo")
+    assert seen == ["create_team", "add_member", "add_task"]
+
+    a.update_task(first, {"status": "completed"})
+    b.delete_task(second)
+    with b.synced() as store:
+        assert [t["title"] for t in store.tasks_with_status("completed")] == ["Spec"]
+    with a.synced() as store:
+        assert store.get_task(second) is None
+        assert store.get_teams() == {"Apollo": ["Alice"]}
+
+    # A worker started later loads the current state from the tables
+    c = _open(tmp_path)
+    assert [t["id"] for t in c.all_tasks()] == [first]
+    assert c.add_task({"title": "Docs"})["id"] not in (first, second)
+    for store in (a, b, c):
+        store.close()
+
+
+def test_lagging_worker_reloads_after_log_is_pruned(tmp_path):
+    a, b = _open(tmp_path, change_retention=10), _open(tmp_path)
+    events = []
+    b.on_change = lambda op, args, result: events.append(op)
+    for i in range(1000):
+        a.add_task({"title": f"t{i}"})
+
+    b.catch_up()
+    assert events == ["reload"]
+    assert len(b.tasks) == 1000
+    a.close()
+    b.close()
+
+
+def test_lease_has_one_holder_and_claims_succeed_once(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    first, second = LeaderLease(path, "scheduler", ttl=0.2), LeaderLease(path, "scheduler", ttl=0.2)
+    assert first.acquire()
+    assert not second.acquire()
+    assert first.acquire()  # renewal
+
+    time.sleep(0.25)  # the leader stopped renewing
+    assert not first.held
+    assert second.acquire()
+    second.release()
+    assert first.acquire()
+
+    assert first.claim("reminder:t1:1h before")
+    assert not second.claim("reminder:t1:1h before")
+    first.close()
+    second.close()
+
+
+def test_leader_claims_each_reminder_fire_time_once(tmp_path, monkeypatch):
+    sent = []
+    monkeypatch.setattr(settings, "SHARED_STATE_PATH", str(tmp_path / "shared.sqlite"))
+    monkeypatch.setattr(scheduler.reminder_engine, "notify", sent.append)
+    monkeypatch.setattr(scheduler, "lease", None)
+    scheduler._start_lease()
+    try:
+        first = {"task_id": "t1", "label": "24h before", "fire_at": datetime.datetime(2026, 1, 2)}
+        moved = {**first, "fire_at": datetime.datetime(2026, 1, 9)}
+        for reminder in (first, first, moved):
+            scheduler.reminder_engine.notify(reminder)
+        assert sent == [first, moved]
+    finally:
+        scheduler.scheduler.remove_job(scheduler.LEASE_JOB_ID)
+        scheduler.lease.close()
+
+
+def _worker(path):
+    worker = FirebaseService()
+    worker.store = SharedStore(path, poll_interval=60)
+    worker.store.on_change = worker._on_shared_change
+    return worker
+
+
+def test_reminder_set_on_a_follower_is_sent_by_the_leader(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    leader, follower = _worker(path), _worker(path)
+    sent = []
+    engine = ReminderEngine([], notify=sent.append)
+    leader.add_listener(lambda event, task: engine.reschedule_task(task))
+    restarted = None
+    try:
+        follower.add_task({"title": "Ship", "assignee": "Alice", "status": "pending"})
+        task_id = follower.get_tasks("Alice")[0]["id"]
+        when = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+        assert follower.add_reminder(task_id, when.isoformat()) \
+            == f"Reminder set for task {task_id} at {when.isoformat()}."
+        assert "already set" in follower.add_reminder(task_id, when.isoformat())
+
+        # The leader hears of it through the shared store and sends it
+        leader.store.catch_up()
+        assert [r["label"] for r in engine.run_due(when)] == [f"at {when.isoformat()}"]
+        assert len(sent) == 1
+
+        # A restarted worker queues it again from the stored task
+        restarted = _worker(path)
+        fresh = ReminderEngine([])
+        for task in restarted.iter_tasks():
+            fresh.schedule_task(task)
+        assert fresh.next_due() == when
+    finally:
+        for worker in (leader, follower, restarted):
+            if worker is not None:
+                worker.store.close()
+
+
+def test_shared_checkpointer_reads_other_workers_turns(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    a = BoundedCheckpointSaver(db_path=path, max_threads=0)
+    b = BoundedCheckpointSaver(db_path=path, max_threads=0)
+    graph_a, graph_b = _graph(a), _graph(b)
+
+    _turn(graph_a, "t1", "a")
+    assert _turn(graph_b, "t1", "b") == ["a", "echo", "b", "echo"]
+    assert _turn(graph_a, "t1", "c") == ["a", "echo", "b", "echo", "c", "echo"]
+    assert a.stats()["resident_threads"] == 0
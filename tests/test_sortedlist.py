@@ -0,0 +1,37 @@
+import bisect
+import random
+
+from app.core.sortedlist import SortedList
+
+
+def test_matches_a_sorted_list_across_bucket_splits_and_merges():
+    rng = random.Random(7)
+    # A tiny load splits and empties buckets constantly
+    items, expected = SortedList(load=2), []
+    for _ in range(2000):
+        value = rng.randrange(100)
+        if rng.random() < 0.6:
+            items.add(value)
+            bisect.insort(expected, value)
+        else:
+            assert items.discard(value) == (value in expected)
+            if value in expected:
+                expected.remove(value)
+        assert list(items) == expected and len(items) == len(expected)
+
+    for lo, hi in [(10, 60), (0, 100), (50, 50), (None, 30), (70, None)]:
+        assert list(items.irange(lo, hi)) == [v for v in expected if (lo is None or v >= lo) and (hi is None or v < hi)]
+        assert list(items.irange(lo, hi, inclusive=(False, True))) \
+            == [v for v in expected if (lo is None or v > lo) and (hi is None or v <= hi)]
+    for value in (-1, 0, 42, 99, 100):
+        assert items.bisect_left(value) == bisect.bisect_left(expected, value)
+        assert items.bisect_right(value) == bisect.bisect_right(expected, value)
+
+
+def test_update_merges_into_existing_items():
+    items = SortedList([5, 1], load=2)
+    items.update([3, 9, 1])
+    assert list(items) == [1, 1, 3, 5, 9]
+    items.add(4)
+    assert list(items.irange(3, 9)) == [3, 4, 5]
+    assert not SortedList().discard(1)
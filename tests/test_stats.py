@@ -0,0 +1,119 @@
+import asyncio
+import datetime
+
+from app.agents.router import match_route
+from app.agents.tools import check_progress, get_performance_insights
+from app.services.firebase import firebase_service
+from app.services.stats import StatsStore
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2026, 5, 10, 12, tzinfo=UTC)
+
+
+def _task(task_id, assignee, status="pending", deadline=None, created=None, completed=None):
+    return {"id": task_id, "title": task_id, "assignee": assignee, "status": status, "deadline": deadline,
+            "created_at": created, "completed_at": completed}
+
+
+def test_counters_follow_task_writes():
+    stats = StatsStore()
+    stats.upsert_task(_task("t1", "Alice", deadline="2026-05-01"), now=NOW)
+    stats.upsert_task(_task("t2", "alice", deadline="2026-06-01"), now=NOW)
+    stats.upsert_task(_task("t1", "Alice", deadline="2026-05-01"), now=NOW)  # replayed: no double count
+
+    alice = stats.member("ALICE", now=NOW)
+    assert (alice["total"], alice["completed"], alice["overdue"]) == (2, 0, 1)
+
+    stats.upsert_task(_task("t1", "Alice", "completed", "2026-05-01", created="2026-05-07T12:00:00",
+                            completed="2026-05-09T12:00:00"), now=NOW)
+    alice = stats.member("Alice", now=NOW)
+    assert (alice["completed"], alice["overdue"], alice["completed_last_7_days"]) == (1, 0, 1)
+    assert alice["avg_lead_time_hours"] == 48.0
+    assert alice["by_status"] == {"pending": 1, "completed": 1}
+
+    stats.remove_task("t1", now=NOW)
+    alice = stats.member("Alice", now=NOW)
+    assert (alice["total"], alice["completed"], alice["avg_lead_time_hours"]) == (1, 0, None)
+
+
+def test_velocity_window():
+    stats = StatsStore()
+    stats.upsert_task(_task("recent", "Bob", "completed", completed="2026-05-05T09:00:00"), now=NOW)
+    stats.upsert_task(_task("older", "Bob", "completed", completed="2026-04-20T09:00:00"), now=NOW)
+    stats.upsert_task(_task("ancient", "Bob", "completed", completed="2025-01-01T09:00:00"), now=NOW)
+
+    bob = stats.member("Bob", now=NOW)
+    assert (bob["completed"], bob["completed_last_7_days"], bob["completed_last_30_days"]) == (3, 1, 2)
+
+
+def test_team_counters_track_membership():
+    stats = StatsStore()
+    stats.add_team("Apollo")
+    stats.upsert_task(_task("t1", "Alice", deadline="2026-05-01"), now=NOW)
+    stats.add_member("Apollo", "Alice")
+    stats.add_member("Apollo", "Bob")
+    stats.upsert_task(_task("t2", "Bob", "completed"), now=NOW)
+
+    team = stats.team("Apollo", now=NOW)
+    assert (team["total"], team["completed"], team["overdue"]) == (2, 1, 1)
+
+    stats.remove_member("Apollo", "Alice")
+    team = stats.team("Apollo", now=NOW)
+    assert (team["total"], team["completed"], team["overdue"]) == (1, 1, 0)
+    assert stats.team("Nope") is None
+
+
+def test_status_updates_feed_insights(mock_store):
+    firebase_service.add_task({"title": "Spec", "assignee": "Alice", "status": "pending"})
+    spec_id = mock_store.tasks_for("Alice")[-1]["id"]
+
+    assert firebase_service.update_task_status(spec_id, "completed") == f"Task {spec_id} marked as completed."
+    assert firebase_service.update_task_status(spec_id, "completed") == f"Task {spec_id} is already completed."
+    assert firebase_service.update_task_status("missing", "completed") == "Task missing not found."
+    assert mock_store.get_task(spec_id)["completed_at"]
+
+    insights = asyncio.run(get_performance_insights.ainvoke({"user_id": "alice"}))
+    assert insights.startswith("User alice has completed 1 out of 1 tasks.")
+    assert "last 7 days: 1" in insights
+    assert "Average lead time: 0.0 hours." in insights
+
+
+def test_firestore_stats_replay_existing_tasks(fake_firestore):
+    tasks = fake_firestore.collection("tasks")
+    tasks.document("a").set({"title": "a", "assignee": "Alice", "status": "completed"})
+    tasks.document("b").set({"title": "b", "assignee": "Alice", "status": "pending"})
+    # Written without the app: assignee queries need the key added
+    firebase_service.backfill_assignee_keys()
+
+    assert firebase_service.get_member_stats("Alice")["total"] == 2
+    assert firebase_service.update_task_status("b", "completed") == "Task b marked as completed."
+    assert tasks.docs["b"]["status"] == "completed"
+    assert firebase_service.get_member_stats("Alice")["completed"] == 2
+
+
+def test_firestore_stats_see_writes_made_around_the_service(fake_firestore):
+    firebase_service.create_team("Apollo")
+    firebase_service.add_member("Apollo", "Alice")
+    firebase_service.add_task({"title": "a", "assignee": "Alice", "status": "pending"})
+    assert firebase_service.get_team_stats("Apollo")["total"] == 1
+
+    # Another pod or the console: no replica, so this process never hears of it
+    fake_firestore.collection("tasks").document("b").set(
+        {"title": "b", "assignee": "Alice", "assignee_key": "alice", "status": "completed"})
+    fake_firestore.collection("teams").document("Apollo").update({"members": ["Alice", "Bob"]})
+    fake_firestore.collection("tasks").document("c").set(
+        {"title": "c", "assignee": "Bob", "assignee_key": "bob", "status": "pending"})
+
+    alice = firebase_service.get_member_stats("alice")
+    assert (alice["total"], alice["completed"]) == (2, 1)
+    team = firebase_service.get_team_stats("Apollo")
+    assert (team["total"], team["completed"]) == (3, 1)
+    progress = asyncio.run(check_progress.ainvoke({"team_name": "Apollo"}))
+    assert "**Alice**: 1/2 tasks completed" in progress
+    assert "**Team total**: 1/3 tasks completed" in progress
+
+
+def test_mark_task_route():
+    tool, args = match_route("Mark task mock_3 as completed")
+    assert tool.name == "update_task_status"
+    assert args == {"task_id": "mock_3", "status": "completed"}
@@ -0,0 +1,94 @@
+import datetime
+
+from app.services.store import MemoryStore
+
+UTC = datetime.timezone.utc
+
+
+def _task(title, assignee, status="pending", deadline=None):
+    return {"title": title, "assignee": assignee, "status": status, "deadline": deadline}
+
+
+def test_task_ids_are_never_reused():
+    store = MemoryStore()
+    first = store.add_task(_task("a", "Alice"))["id"]
+    second = store.add_task(_task("b", "Alice"))["id"]
+    store.delete_task(second)
+    third = store.add_task(_task("c", "Alice"))["id"]
+
+    assert len({first, second, third}) == 3
+    assert store.get_task(second) is None
+
+
+def test_assignee_index_is_case_insensitive_and_tracks_updates():
+    store = MemoryStore()
+    task = store.add_task(_task("a", "Alice"))
+    store.add_task(_task("b", "bob"))
+
+    assert [t["title"] for t in store.tasks_for("ALICE")] == ["a"]
+
+    store.update_task(task["id"], {"assignee": "Bob", "status": "completed"})
+    assert store.tasks_for("alice") == []
+    assert [t["title"] for t in store.tasks_for("Bob")] == ["b", "a"]
+    assert [t["title"] for t in store.tasks_with_status("completed")] == ["a"]
+
+
+def test_deadline_index_orders_and_ranges():
+    store = MemoryStore()
+    store.add_task(_task("late", "A", deadline="2026-03-01"))
+    store.add_task(_task("vague", "A", deadline="next Friday"))
+    store.add_task(_task("early", "A", deadline="2026-01-01T09:00:00"))
+    mid = store.add_task(_task("mid", "A", deadline="2026-02-01T00:00:00+02:00"))
+
+    assert [t["title"] for t in store.tasks_due_between()] == ["early", "mid", "late"]
+    start = datetime.datetime(2026, 1, 15, tzinfo=UTC)
+    end = datetime.datetime(2026, 3, 1, tzinfo=UTC)
+    assert [t["title"] for t in store.tasks_due_between(start, end)] == ["mid"]
+
+    store.delete_task(mid["id"])
+    assert [t["title"] for t in store.tasks_due_between(start, end)] == []
+
+
+def test_team_membership():
+    store = MemoryStore()
+    assert store.create_team("Apollo")
+    assert not store.create_team("Apollo")
+    assert store.add_member("Apollo", "Alice")
+    assert store.add_member("Apollo", "Bob")
+    assert not store.add_member("Apollo", "Alice")
+    assert store.remove_member("Apollo", "Alice")
+    assert not store.remove_member("Apollo", "Alice")
+    assert store.get_teams() == {"Apollo": ["Bob"]}
+
+
+def test_id_pages_follow_the_cursor_with_and_without_filters():
+    store = MemoryStore()
+    store.load_tasks({"id": f"t{i:03d}", **_task(str(i), "Alice" if i % 4 else "Bob")} for i in range(100))
+    store.delete_task("t001")
+    store.add_task({"id": "t100", **_task("new", "Bob")})
+
+    # Unfiltered pages walk the ID index from the cursor
+    ids = [t["id"] for t in store.query_tasks(after=("t010",), limit=3)]
+    assert ids == ["t011", "t012", "t013"]
+    assert [t["id"] for t in store.query_tasks(limit=2)] == ["t000", "t002"]
+    assert [t["id"] for t in store.query_tasks(after=("t098",))] == ["t099", "t100"]
+
+    # A broad filter walks the index too; a narrow one scans its candidates
+    assert [t["id"] for t in store.query_tasks(assignee="alice", after=("t048",), limit=3)] \
+        == ["t049", "t050", "t051"]
+    assert [t["id"] for t in store.query_tasks(assignee="bob", after=("t040",), limit=3)] \
+        == ["t044", "t048", "t052"]
+
+
+def test_re_adding_an_id_replaces_the_indexed_task():
+    store = MemoryStore()
+    store.add_task({"id": "t1", **_task("a", "Bob", deadline="2026-01-01")})
+    store.add_task({"id": "t1", **_task("b", "Ann", status="completed", deadline="2026-02-01")})
+    store.load_tasks([{"id": "t2", **_task("c", "Bob", deadline="2026-03-01")},
+                      {"id": "t2", **_task("d", "Ann")}])
+
+    assert store.tasks_for("bob") == []
+    assert [t["title"] for t in store.tasks_for("ann")] == ["b", "d"]
+    assert store.tasks_with_status("pending") == [store.get_task("t2")]
+    assert [t["title"] for t in store.tasks_due_between()] == ["b"]
+    assert [t["id"] for t in store.query_tasks()] == ["t1", "t2"]
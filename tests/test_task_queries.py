@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.firebase import firebase_service
+
+client = TestClient(app)
+
+TASKS = [
+    {"id": f"t{i:02d}", "title": f"Task {i}", "description": "x" * 200, "assignee": "Alice" if i % 3 else "Bob",
+     "status": "completed" if i % 2 else "pending",
+     "deadline": f"2026-0{1 + i % 6}-{10 + i % 18:02d}" if i % 5 else "soon"}
+    for i in range(30)
+]
+
+
+@pytest.fixture(params=["mock", "firestore"])
+def tasks_backend(request, mock_store):
+    """The same tasks, in the mock store or in (fake) Firestore."""
+    if request.param == "mock":
+        for task in TASKS:
+            mock_store.add_task(dict(task))
+    else:
+        db = request.getfixturevalue("fake_firestore")
+        for task in TASKS:
+            db.collection("tasks").document(task["id"]).set({k: v for k, v in task.items() if k != "id"})
+        # Written without the app: assignee queries need the key added
+        firebase_service.backfill_assignee_keys()
+    return request.param
+
+
+def _pages(**params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/api/tasks", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        ids += [task["id"] for task in body["tasks"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_pages_match_the_filters(tasks_backend):
+    alice = sorted(t["id"] for t in TASKS if t["assignee"] == "Alice")
+    assert _pages(assignee="Alice", limit=4) == (alice, 5)
+    pending = sorted(t["id"] for t in TASKS if t["assignee"] == "Alice" and t["status"] == "pending")
+    assert _pages(assignee="Alice", status="pending", limit=3)[0] == pending
+
+    # Deadline ranges come back in deadline order; free-text deadlines are left out
+    due = sorted((t["deadline"], t["id"]) for t in TASKS if "2026-02-01" <= t["deadline"] < "2026-05-01")
+    assert _pages(due_after="2026-02-01", due_before="2026-05-01", limit=2)[0] == [task_id for _, task_id in due]
+    assert client.get("/api/tasks/count", params={"due_after": "2026-02-01", "due_before": "2026-05-01"}).json() \
+        == {"count": len(due)}
+    assert client.get("/api/tasks/count", params={"assignee": "Bob", "status": "completed"}).json()["count"] \
+        == sum(1 for t in TASKS if t["assignee"] == "Bob" and t["status"] == "completed")
+
+
+def test_projection_and_totals(tasks_backend):
+    body = client.get("/api/tasks", params={"fields": "title,status", "limit": 2, "include_total": "true"}).json()
+    assert body["tasks"] == [{"id": "t00", "title": "Task 0", "status": "pending"},
+                             {"id": "t01", "title": "Task 1", "status": "completed"}]
+    assert body["total"] == len(TASKS)
+
+    member = client.get("/api/member/Bob", params={"fields": "title,status", "limit": 3}).json()
+    assert [t["id"] for t in member["tasks"]] == ["t00", "t03", "t06"]
+    assert member["next_cursor"]
+    following = client.get("/api/member/Bob", params={"fields": "title,status", "limit": 3,
+                                                      "cursor": member["next_cursor"]}).json()
+    assert [t["id"] for t in following["tasks"]] == ["t09", "t12", "t15"]
+
+
+def test_bad_queries_are_rejected(mock_store):
+    assert client.get("/api/tasks", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/tasks", params={"due_after": "next week"}).status_code == 400
+    assert client.get("/api/tasks", params={"limit": 0}).status_code == 422
+    # A cursor from an ID-ordered page does not fit a deadline-ordered query
+    firebase_service.add_task({"title": "A", "deadline": "2026-01-01"})
+    firebase_service.add_task({"title": "B", "deadline": "2026-01-02"})
+    cursor = client.get("/api/tasks", params={"limit": 1}).json()["next_cursor"]
+    assert client.get("/api/tasks", params={"cursor": cursor, "due_after": "2026-01-01"}).status_code == 400
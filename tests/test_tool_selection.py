@@ -0,0 +1,46 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.agents import graph_new
+from app.agents.tool_selection import ToolSelector
+
+from tests.test_admission import _chat, _fake_openai
+
+selector = ToolSelector(graph_new.tools)
+
+
+def _names(tools):
+    return [tool.name for tool in tools] if tools is not None else None
+
+
+def test_selects_relevant_tools_and_falls_back_when_unsure():
+    assert _names(selector.select([HumanMessage(content="Disband the Apollo group")])) == ["delete_team"]
+    assert _names(selector.select([HumanMessage(content="What's the best Python library for parsing PDFs?")])) \
+        == ["research_technical_question"]
+    assert "assign_task" in _names(selector.select([HumanMessage(content="Assign the report to Alice by Friday")]))
+    # Nothing to go on: every tool is offered
+    assert selector.select([HumanMessage(content="yes, go ahead")]) is None
+
+
+def test_tools_called_this_turn_stay_available():
+    messages = [
+        HumanMessage(content="Set up a new squad called Zeus"),
+        AIMessage(content="", tool_calls=[{"name": "assign_task", "args": {}, "id": "c1"}]),
+        ToolMessage(content="done", tool_call_id="c1"),
+    ]
+    names = _names(selector.select(messages))
+    assert names[0] == "create_team"
+    assert "assign_task" in names
+    assert selector.schema_tokens(selector.select(messages)) < selector.schema_tokens()
+
+
+def test_only_selected_schemas_are_sent_upstream(monkeypatch):
+    model, calls = _fake_openai([])
+    monkeypatch.setattr(graph_new, "llm_with_tools", model.bind_tools(graph_new.tools))
+
+    asyncio.run(_chat("selection-1", "Disband the Apollo group, please"))
+    asyncio.run(_chat("selection-2", "hello there"))
+    sent = [[tool["function"]["name"] for tool in call["body"]["tools"]] for call in calls]
+    assert sent[0] == ["delete_team"]
+    assert len(sent[1]) == len(graph_new.tools)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.agents.tools import check_progress
+from app.services.firebase import FIRESTORE_IN_LIMIT, FirebaseService, firebase_service
+
+
+@pytest.mark.parametrize("backend", ["mock_store", "fake_firestore"])
+def test_check_progress_groups_team_tasks(backend, request):
+    # Assignees match case-insensitively on both backends
+    request.getfixturevalue(backend)
+    firebase_service.create_team("Apollo")
+    firebase_service.add_member("Apollo", "Alice")
+    firebase_service.add_member("Apollo", "Bob")
+    firebase_service.add_task({"title": "Spec", "assignee": "Alice", "status": "completed"})
+    firebase_service.add_task({"title": "Build", "assignee": "alice", "status": "pending"})
+    firebase_service.add_task({"title": "Other team", "assignee": "Carol", "status": "pending"})
+
+    report = asyncio.run(check_progress.ainvoke({"team_name": "Apollo"}))
+
+    assert report.splitlines() == [
+        "**Alice**: 1/2 tasks completed",
+        "- Spec (✅ completed)",
+        "- Build (⏳ pending)",
+        "**Bob**: No tasks assigned (0/0)",
+        "**Team total**: 1/2 tasks completed, 0 overdue, 0 completed in the last 7 days",
+    ]
+
+
+def test_check_progress_unknown_and_empty_team(mock_store):
+    firebase_service.create_team("Empty")
+    assert asyncio.run(check_progress.ainvoke({"team_name": "Nope"})) == "Team 'Nope' not found."
+    assert asyncio.run(check_progress.ainvoke({"team_name": "Empty"})) == "Team 'Empty' has no members."
+
+
+def test_firestore_team_tasks_use_chunked_in_queries(fake_firestore):
+    members = [f"user{i}" for i in range(FIRESTORE_IN_LIMIT + 5)]
+    tasks = fake_firestore.collection("tasks")
+    firebase_service.add_task({"title": "first", "assignee": "user0", "status": "pending"})
+    firebase_service.add_task({"title": "last", "assignee": members[-1].upper(), "status": "completed"})
+    firebase_service.add_task({"title": "outsider", "assignee": "stranger", "status": "pending"})
+
+    grouped = firebase_service.get_tasks_for_members(members)
+
+    assert [[f.op_string for f in q] for q in tasks.queries] == [["in"], ["in"]]
+    assert [len(q[0].value) for q in tasks.queries] == [FIRESTORE_IN_LIMIT, 5]
+    assert [t["title"] for t in grouped["user0"]] == ["first"]
+    assert [t["title"] for t in grouped[members[-1]]] == ["last"]
+    assert "stranger" not in grouped
+
+
+def test_backfill_keys_tasks_written_without_them(fake_firestore):
+    tasks = fake_firestore.collection("tasks")
+    tasks.document("legacy").set({"title": "Old", "assignee": "Alice", "status": "pending"})
+    firebase_service.add_task({"title": "New", "assignee": "ALICE", "status": "pending"})
+    assert [t["title"] for t in firebase_service.get_tasks("alice")] == ["New"]
+
+    assert firebase_service.backfill_assignee_keys() == 1
+    assert firebase_service.backfill_assignee_keys() == 0
+    assert sorted(t["title"] for t in firebase_service.get_tasks("alice")) == ["New", "Old"]
+    assert "assignee_key" not in firebase_service.get_task("legacy")
+
+
+def test_startup_backfills_keys_of_existing_tasks(fake_firestore, monkeypatch, tmp_path):
+    import firebase_admin
+    from firebase_admin import credentials, firestore, storage
+
+    fake_firestore.collection("tasks").document("legacy").set({"title": "Old", "assignee": "Alice"})
+    key = tmp_path / "serviceAccountKey.json"
+    key.write_text("{}")
+    monkeypatch.setenv("FIREBASE_CREDENTIALS_PATH", str(key))
+    monkeypatch.setattr(credentials, "Certificate", lambda path: None)
+    monkeypatch.setattr(firebase_admin, "initialize_app", lambda *args, **kwargs: None)
+    monkeypatch.setattr(firestore, "client", lambda: fake_firestore)
+    monkeypatch.setattr(storage, "bucket", lambda: None)
+
+    service = FirebaseService()
+    assert service.initialized
+    assert [t["title"] for t in service.get_tasks("alice")] == ["Old"]